@@ -2,7 +2,7 @@
 REST API Module - Forensic Chain
 Provides API endpoints for interacting with the system via HTTP.
 """
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 import os
 import sys
@@ -11,13 +11,23 @@ import hashlib
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from api.runtime import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, blockchain_info, commit, contract,
+    evidence_store, parse_verify_request, upload_sessions, validate_batch_items,
+    validate_required_fields, validate_transfer_batch, validate_upload_session
+)
+from src.evidence_store import CHUNK_SIZE
+from src.export import iter_blocks_ndjson, iter_evidence_ndjson, iter_ledger_ndjson
 from src.smart_contract import ForensicContract
-from src.evidence_store import EvidenceStore
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
-contract = ForensicContract()
-evidence_store = EvidenceStore()
+
+
+@app.before_request
+def refresh_replica():
+    """Pick up blocks sealed by the owner process (multi-process mode only)."""
+    contract.refresh()
 
 
 # ============== WEB UI ENDPOINTS ==============
@@ -28,22 +38,20 @@ def index():
     return render_template('index.html')
 
 
-def api_response(success: bool, message: str, data=None):
-    """Standard response format."""
+def api_response(success: bool, message: str, data=None, **extra):
+    """Standard response format (extra keys, e.g. next_cursor, are added alongside)."""
     return jsonify({
         "success": success,
         "message": message,
-        "data": data
+        "data": data,
+        **extra
     })
 
-def validate_required_fields(data, required):
-    """Validate required fields in request data."""
-    if not data:
-        return False, "No data provided"
-    missing = [field for field in required if field not in data]
-    if missing:
-        return False, f"Missing required fields: {missing}"
-    return True, "Valid"
+
+def get_page_limit():
+    """Read the `limit` query parameter, clamped to [1, MAX_PAGE_SIZE]."""
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
 
 
 # ============== PARTICIPANT ENDPOINTS ==============
@@ -56,9 +64,10 @@ def register_participant():
     if not valid:
         return api_response(False, msg), 400
     
-    success, msg = contract.register_participant(
-        data['participant_id'], data['name'], 
-        data['role'], data['organization']
+    success, msg = commit(
+        'register_participant',
+        participant_id=data['participant_id'], name=data['name'],
+        role=data['role'], organization=data['organization']
     )
     return api_response(success, msg), 200 if success else 400
 
@@ -75,7 +84,7 @@ def get_participant(participant_id):
 @app.route('/api/participants', methods=['GET'])
 def list_participants():
     """List all participants."""
-    participants = [p.to_dict() for p in contract.participant_registry.values()]
+    participants = [p.to_dict() for p in contract.list_participants()]
     return api_response(True, f"Found {len(participants)} participants", participants)
 
 
@@ -85,12 +94,12 @@ def list_participants():
 def create_evidence():
     """Create new evidence."""
     data = request.json
-    valid, msg = validate_required_fields(data, 
-        ['evidence_id', 'description', 'creator_id', 'file_hash', 'file_location', 'case_id'])
+    valid, msg = validate_required_fields(data, ForensicContract.CREATE_FIELDS)
     if not valid:
         return api_response(False, msg), 400
     
-    success, msg = contract.create_evidence(
+    success, msg = commit(
+        'create_evidence',
         evidence_id=data['evidence_id'],
         description=data['description'],
         creator_id=data['creator_id'],
@@ -102,6 +111,20 @@ def create_evidence():
     return api_response(success, msg), 200 if success else 400
 
 
+@app.route('/api/evidence/batch', methods=['POST'])
+def create_evidence_batch():
+    """Create many evidence items in one request ({"items": [...], "atomic": true})."""
+    data = request.json
+    valid, msg = validate_batch_items(data)
+    if not valid:
+        return api_response(False, msg), 400
+    
+    success, msg, results = contract.create_evidence_batch(
+        data['items'], atomic=data.get('atomic', True)
+    )
+    return api_response(success, msg, results), 200 if success else 400
+
+
 @app.route('/api/evidence/<evidence_id>', methods=['GET'])
 def get_evidence(evidence_id):
     """Get evidence information."""
@@ -113,10 +136,18 @@ def get_evidence(evidence_id):
 
 @app.route('/api/evidence', methods=['GET'])
 def list_evidence():
-    """List all evidence."""
+    """List evidence, paginated with ?limit=&after=<evidence_id>."""
     active_only = request.args.get('active_only', 'true').lower() == 'true'
-    evidence_list = contract.list_all_evidence(active_only=active_only)
-    return api_response(True, f"Found {len(evidence_list)} evidence items", evidence_list)
+    try:
+        evidence_list, next_cursor = contract.list_evidence_page(
+            limit=get_page_limit(),
+            after=request.args.get('after'),
+            active_only=active_only
+        )
+    except ValueError as e:
+        return api_response(False, str(e)), 400
+    return api_response(True, f"Found {len(evidence_list)} evidence items", evidence_list,
+                        next_cursor=next_cursor)
 
 
 @app.route('/api/evidence/<evidence_id>/history', methods=['GET'])
@@ -126,6 +157,13 @@ def get_evidence_history(evidence_id):
     return api_response(True, f"Found {len(history)} transactions", history)
 
 
+@app.route('/api/evidence/<evidence_id>/proof', methods=['GET'])
+def get_evidence_proof(evidence_id):
+    """Get Merkle inclusion proofs for each sealed history entry."""
+    proofs = contract.get_evidence_proofs(evidence_id)
+    return api_response(True, f"Found {len(proofs)} inclusion proofs", proofs)
+
+
 @app.route('/api/evidence/transfer', methods=['POST'])
 def transfer_evidence():
     """Transfer evidence ownership."""
@@ -134,13 +172,36 @@ def transfer_evidence():
     if not valid:
         return api_response(False, msg), 400
     
-    success, msg = contract.transfer_evidence(
-        data['evidence_id'], data['from_owner_id'],
-        data['to_owner_id'], data['reason']
+    success, msg = commit(
+        'transfer_evidence',
+        evidence_id=data['evidence_id'], from_owner_id=data['from_owner_id'],
+        to_owner_id=data['to_owner_id'], reason=data['reason']
     )
     return api_response(success, msg), 200 if success else 400
 
 
+@app.route('/api/evidence/transfer/batch', methods=['POST'])
+def transfer_evidence_batch():
+    """
+    Transfer many evidence items in one request.
+    
+    Body: from_owner_id, to_owner_id, reason and either case_id (all active
+    evidence of the case held by from_owner_id) or evidence_ids; optional atomic.
+    """
+    data = request.json
+    valid, msg = validate_transfer_batch(data)
+    if not valid:
+        return api_response(False, msg), 400
+    
+    success, msg, results = contract.transfer_evidence_batch(
+        data['from_owner_id'], data['to_owner_id'], data['reason'],
+        case_id=data.get('case_id'),
+        evidence_ids=data.get('evidence_ids'),
+        atomic=data.get('atomic', True)
+    )
+    return api_response(success, msg, results), 200 if success else 400
+
+
 @app.route('/api/evidence/<evidence_id>', methods=['DELETE'])
 def delete_evidence(evidence_id):
     """Delete (deactivate) evidence."""
@@ -151,7 +212,8 @@ def delete_evidence(evidence_id):
     if not requester_id:
         return api_response(False, "Missing requester_id"), 400
     
-    success, msg = contract.delete_evidence(evidence_id, requester_id, reason)
+    success, msg = commit('delete_evidence', evidence_id=evidence_id,
+                          requester_id=requester_id, reason=reason)
     return api_response(success, msg), 200 if success else 400
 
 
@@ -172,29 +234,109 @@ def verify_evidence(evidence_id):
 
 @app.route('/api/store/upload', methods=['POST'])
 def store_evidence_file():
-    """Upload and store evidence file."""
-    if 'file' not in request.files:
-        return api_response(False, "No file provided"), 400
+    """
+    Upload and store evidence file.
     
-    file = request.files['file']
-    evidence_id = request.form.get('evidence_id')
-    case_id = request.form.get('case_id')
+    Accepts a multipart form (file, evidence_id, case_id) or, for large disk
+    images, the raw file as the request body with
+    ?evidence_id=&case_id=&filename=. The raw body is hashed while it is
+    written into the store and moved into place atomically; it is read
+    until it ends, so chunked transfer encoding works too. A multipart file
+    is first spooled to a temporary file by the form parser, so it is
+    written twice - send large files as a raw body.
+    """
+    if request.mimetype == 'multipart/form-data':
+        if 'file' not in request.files:
+            return api_response(False, "No file provided"), 400
+        file = request.files['file']
+        stream, filename = file.stream, file.filename or ""
+        evidence_id = request.form.get('evidence_id')
+        case_id = request.form.get('case_id')
+    else:
+        stream, filename = request.stream, request.args.get('filename', '')
+        evidence_id = request.args.get('evidence_id')
+        case_id = request.args.get('case_id')
     
     if not evidence_id or not case_id:
         return api_response(False, "Missing evidence_id or case_id"), 400
     
-    # Save temporary file
-    temp_path = f"./temp_{evidence_id}"
-    file.save(temp_path)
+    success, storage_path, file_hash = evidence_store.store_evidence_stream(
+        stream, evidence_id, case_id, filename=filename,
+        allow_empty=request.mimetype == 'multipart/form-data'
+    )
+    
+    if success:
+        return api_response(True, "File stored successfully", {
+            "storage_path": storage_path,
+            "file_hash": file_hash
+        })
+    else:
+        return api_response(False, file_hash), 400
+
+
+@app.route('/api/store/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable chunked upload.
+    
+    Send the file with PUT /api/store/uploads/<upload_id>?offset=N (raw
+    chunk as the body, optional X-Chunk-SHA256 header), check where to
+    resume with GET, and store it with POST .../finalize.
+    """
+    data = request.json
+    valid, msg = validate_upload_session(data)
+    if not valid:
+        return api_response(False, msg), 400
     
-    # Store in evidence store
-    success, storage_path, file_hash = evidence_store.store_evidence(
-        temp_path, evidence_id, case_id
+    session = upload_sessions.create(
+        data['evidence_id'], data['case_id'],
+        filename=data.get('filename', ''), total_size=data.get('total_size')
     )
+    return api_response(True, "Upload started", session.to_dict()), 201
+
+
+@app.route('/api/store/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Get upload status (offset = where the next chunk starts)."""
+    session = upload_sessions.get(upload_id)
+    if not session:
+        return api_response(False, "Upload not found"), 404
+    return api_response(True, "Upload status", session.to_dict())
+
+
+@app.route('/api/store/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    """Append one chunk at ?offset= (409 with the current offset if it is not where the upload stands)."""
+    session = upload_sessions.get(upload_id)
+    if not session:
+        return api_response(False, "Upload not found"), 404
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return api_response(False, "Missing offset"), 400
+    if offset != session.offset:
+        return api_response(False, "Offset mismatch - resume from the upload offset",
+                            session.to_dict()), 409
     
-    # Clean up temp file
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
+    success, msg = session.write_chunk(
+        offset, iter(lambda: request.stream.read(CHUNK_SIZE), b""),
+        chunk_sha256=request.headers.get('X-Chunk-SHA256'), size=request.content_length
+    )
+    return api_response(success, msg, session.to_dict()), 200 if success else 400
+
+
+@app.route('/api/store/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    """Cancel an upload and discard its data."""
+    if not upload_sessions.abort(upload_id):
+        return api_response(False, "Upload not found"), 404
+    return api_response(True, "Upload cancelled")
+
+
+@app.route('/api/store/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Store the uploaded file (optional file_hash is checked against the received data)."""
+    data = request.get_json(silent=True) or {}
+    success, storage_path, file_hash = upload_sessions.finalize(upload_id, data.get('file_hash'))
     
     if success:
         return api_response(True, "File stored successfully", {
@@ -202,21 +344,63 @@ def store_evidence_file():
             "file_hash": file_hash
         })
     else:
-        return api_response(False, file_hash), 400
+        return api_response(False, file_hash), 404 if file_hash == "Upload not found" else 400
+
+
+@app.route('/api/store/attach', methods=['POST'])
+def attach_stored_file():
+    """
+    Attach content already in the store to a case by its SHA-256.
+    
+    The repeat intake of a known file (the same image in another case) then
+    needs no upload; a 404 means the file must be uploaded.
+    """
+    data = request.json
+    valid, msg = validate_required_fields(data, ['evidence_id', 'case_id', 'file_hash'])
+    if not valid:
+        return api_response(False, msg), 400
+    
+    success, storage_path, file_hash = evidence_store.attach_existing(
+        data['file_hash'], data['evidence_id'], data['case_id'],
+        filename=data.get('filename', '')
+    )
+    
+    if success:
+        return api_response(True, "File attached from store", {
+            "storage_path": storage_path,
+            "file_hash": file_hash
+        })
+    else:
+        return api_response(False, file_hash), 404
 
 
 @app.route('/api/store/verify/<evidence_id>', methods=['POST'])
 def verify_stored_file(evidence_id):
-    """Verify stored file integrity."""
-    data = request.json
+    """
+    Verify stored file integrity.
+    
+    mode "hash" (default) re-hashes the whole file against expected_hash.
+    Against the file's chunk digest: "full" checks every chunk, "ranges"
+    the chunks covering [[start, end], ...] byte ranges and "sample" a
+    random sample_size chunks; the response lists the modified chunks.
+    """
+    data = request.json or {}
     storage_path = data.get('storage_path')
     expected_hash = data.get('expected_hash')
     
-    if not storage_path or not expected_hash:
+    if not storage_path:
         return api_response(False, "Missing storage_path or expected_hash"), 400
+    error, chunk_check = parse_verify_request(data)
+    if error:
+        return api_response(False, error), 400
     
-    is_valid, msg = evidence_store.verify_file_integrity(storage_path, expected_hash)
-    return api_response(is_valid, msg)
+    if chunk_check is None:
+        is_valid, msg = evidence_store.verify_file_integrity(storage_path, expected_hash)
+        return api_response(is_valid, msg)
+    is_valid, msg, report = evidence_store.verify_tree_integrity(
+        storage_path, expected_hash=expected_hash, **chunk_check
+    )
+    return api_response(is_valid, msg, report)
 
 
 @app.route('/api/store/stats', methods=['GET'])
@@ -246,25 +430,99 @@ def get_case_evidence(case_id):
 
 @app.route('/api/blockchain', methods=['GET'])
 def get_blockchain():
-    """Get entire blockchain."""
-    chain = contract.blockchain.to_dict()
-    return api_response(True, f"Blockchain has {len(chain)} blocks", chain)
+    """Get blockchain blocks, paginated with ?limit=&after=<block height>."""
+    blocks, next_cursor = contract.blockchain.get_blocks_page(
+        limit=get_page_limit(),
+        after=request.args.get('after', type=int)
+    )
+    return api_response(True, f"Blockchain has {len(contract.blockchain.chain)} blocks", blocks,
+                        next_cursor=next_cursor)
+
+
+@app.route('/api/blockchain/blocks', methods=['GET'])
+def get_block_range():
+    """Get blocks with heights in [start, end) (at most MAX_PAGE_SIZE blocks)."""
+    start = request.args.get('start', 0, type=int)
+    end = request.args.get('end', start + DEFAULT_PAGE_SIZE, type=int)
+    end = min(end, start + MAX_PAGE_SIZE)
+    blocks = contract.blockchain.get_blocks(start, end)
+    return api_response(True, f"Found {len(blocks)} blocks", blocks)
 
 
 @app.route('/api/blockchain/info', methods=['GET'])
 def get_blockchain_info():
     """Get blockchain overview information."""
-    info = contract.get_blockchain_info()
-    return api_response(True, "Success", info)
+    return api_response(True, "Success", blockchain_info())
 
 
 @app.route('/api/blockchain/verify', methods=['GET'])
 def verify_blockchain():
-    """Verify blockchain integrity."""
-    is_valid, msg = contract.verify_blockchain()
+    """
+    Verify blockchain integrity.
+    
+    ?mode=full re-hashes the whole chain; adding &workers=N runs the full
+    audit in parallel and returns its report.
+    """
+    full_audit = request.args.get('mode', 'incremental').lower() == 'full'
+    workers = request.args.get('workers', type=int)
+    if full_audit and workers:
+        report = contract.audit_blockchain(workers=workers)
+        msg = ("✓ Blockchain valid - No signs of tampering" if report.is_valid
+               else f"✗ WARNING: Blockchain has been modified at block #{report.first_bad_height}!")
+        return api_response(report.is_valid, msg, report.to_dict())
+    
+    is_valid, msg = contract.verify_blockchain(full_audit=full_audit)
     return api_response(is_valid, msg)
 
 
+@app.route('/api/blockchain/audit', methods=['POST'])
+def start_blockchain_audit():
+    """Start a background parallel full audit."""
+    data = request.json or {}
+    success, msg = contract.start_audit(workers=data.get('workers'))
+    return api_response(success, msg, contract.get_audit_status()), 202 if success else 409
+
+
+@app.route('/api/blockchain/audit', methods=['GET'])
+def get_blockchain_audit():
+    """Get progress and result of the background audit."""
+    return api_response(True, "Audit status", contract.get_audit_status())
+
+
+@app.route('/api/blockchain/flush', methods=['POST'])
+def flush_blockchain():
+    """Seal all pending transactions into a block."""
+    success, msg = contract.flush()
+    return api_response(success, msg, {"total_blocks": len(contract.blockchain.chain)})
+
+
+# ============== EXPORT ENDPOINTS ==============
+
+def ndjson_response(lines):
+    """Stream NDJSON lines with chunked transfer encoding."""
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+
+@app.route('/api/export/ledger', methods=['GET'])
+def export_ledger():
+    """Stream blocks (from ?from_height=N), participants and evidence as NDJSON."""
+    start_height = request.args.get('from_height', 0, type=int)
+    return ndjson_response(iter_ledger_ndjson(contract, start_height))
+
+
+@app.route('/api/export/blockchain', methods=['GET'])
+def export_blockchain():
+    """Stream blocks from ?from_height=N as NDJSON."""
+    start_height = request.args.get('from_height', 0, type=int)
+    return ndjson_response(iter_blocks_ndjson(contract, start_height))
+
+
+@app.route('/api/export/evidence', methods=['GET'])
+def export_evidence():
+    """Stream the evidence registry as NDJSON."""
+    return ndjson_response(iter_evidence_ndjson(contract))
+
+
 # ============== UTILITY ENDPOINTS ==============
 
 @app.route('/api/hash', methods=['POST'])
@@ -283,7 +541,7 @@ def health_check():
         "status": "healthy",
         "blockchain_valid": contract.blockchain.is_chain_valid(),
         "total_evidence": len(contract.evidence_registry),
-        "total_participants": len(contract.participant_registry),
+        "total_participants": contract.participant_count(),
         "storage_stats": evidence_store.get_storage_stats()
     })
 
@@ -312,4 +570,4 @@ if __name__ == '__main__':
     print("\n  Server starting at: http://localhost:5000")
     print("  Press CTRL+C to stop\n")
     print("=" * 60)
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
@@ -0,0 +1,706 @@
+"""
+ASGI API Module - Forensic Chain
+Async variant of the REST API (same routes and response format as app.py).
+
+Contract calls, file I/O and hashing run in a thread pool through
+AsyncContract, so a slow upload or a long verification never blocks the
+event loop. One process can then hold thousands of concurrent connections.
+
+Run with any ASGI server, e.g.:
+    uvicorn --app-dir api asgi:app --port 5000
+"""
+import contextlib
+import hashlib
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+# Add src directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.runtime import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, blockchain_info, commit, contract,
+    evidence_store, ledger_socket, parse_verify_request, upload_sessions,
+    validate_batch_items, validate_required_fields, validate_transfer_batch,
+    validate_upload_session
+)
+from src.async_contract import AsyncContract
+from src.evidence_store import CHUNK_SIZE
+from src.export import iter_blocks_ndjson, iter_evidence_ndjson, iter_ledger_ndjson
+from src.smart_contract import ForensicContract
+from src.upload_sessions import ChunkRejected
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+async_contract = AsyncContract(contract)
+templates = Jinja2Templates(directory=os.path.join(API_DIR, 'templates'))
+
+
+def url_for(endpoint: str, filename: str) -> str:
+    """Flask-style url_for used by the shared template (static files only)."""
+    return f"/{endpoint}/{filename}"
+
+
+templates.env.globals['url_for'] = url_for
+
+
+def api_response(success: bool, message: str, data=None, status_code: int = 200, **extra):
+    """Standard response format (extra keys, e.g. next_cursor, are added alongside)."""
+    return JSONResponse({
+        "success": success,
+        "message": message,
+        "data": data,
+        **extra
+    }, status_code=status_code)
+
+
+async def get_json(request: Request):
+    """Request body as JSON, or None if it is missing or invalid."""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def query_int(request: Request, name: str, default: int = None):
+    """Integer query parameter (invalid values fall back to the default)."""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def get_page_limit(request: Request):
+    """Read the `limit` query parameter, clamped to [1, MAX_PAGE_SIZE]."""
+    limit = query_int(request, 'limit', DEFAULT_PAGE_SIZE)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+# ============== WEB UI ENDPOINTS ==============
+
+async def index(request: Request):
+    """Serve the web UI."""
+    return templates.TemplateResponse(request, 'index.html')
+
+
+# ============== PARTICIPANT ENDPOINTS ==============
+
+async def register_participant(request: Request):
+    """Register new participant."""
+    data = await get_json(request)
+    valid, msg = validate_required_fields(data, ['participant_id', 'name', 'role', 'organization'])
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, msg = await async_contract.run(
+        commit, 'register_participant',
+        participant_id=data['participant_id'], name=data['name'],
+        role=data['role'], organization=data['organization']
+    )
+    return api_response(success, msg, status_code=200 if success else 400)
+
+
+async def get_participant(request: Request):
+    """Get participant information."""
+    participant = await async_contract.get_participant(request.path_params['participant_id'])
+    if participant:
+        return api_response(True, "Success", participant.to_dict())
+    return api_response(False, "Participant not found", status_code=404)
+
+
+async def list_participants(request: Request):
+    """List all participants."""
+    participants = [p.to_dict() for p in await async_contract.list_participants()]
+    return api_response(True, f"Found {len(participants)} participants", participants)
+
+
+# ============== EVIDENCE ENDPOINTS ==============
+
+async def create_evidence(request: Request):
+    """Create new evidence."""
+    data = await get_json(request)
+    valid, msg = validate_required_fields(data, ForensicContract.CREATE_FIELDS)
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, msg = await async_contract.run(
+        commit, 'create_evidence',
+        evidence_id=data['evidence_id'],
+        description=data['description'],
+        creator_id=data['creator_id'],
+        file_hash=data['file_hash'],
+        file_location=data['file_location'],
+        case_id=data['case_id'],
+        metadata=data.get('metadata', {})
+    )
+    return api_response(success, msg, status_code=200 if success else 400)
+
+
+async def create_evidence_batch(request: Request):
+    """Create many evidence items in one request ({"items": [...], "atomic": true})."""
+    data = await get_json(request)
+    valid, msg = validate_batch_items(data)
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, msg, results = await async_contract.create_evidence_batch(
+        data['items'], atomic=data.get('atomic', True)
+    )
+    return api_response(success, msg, results, status_code=200 if success else 400)
+
+
+async def get_evidence(request: Request):
+    """Get evidence information."""
+    evidence = await async_contract.get_evidence(request.path_params['evidence_id'])
+    if evidence:
+        return api_response(True, "Success", evidence)
+    return api_response(False, "Evidence not found", status_code=404)
+
+
+async def list_evidence(request: Request):
+    """List evidence, paginated with ?limit=&after=<evidence_id>."""
+    active_only = request.query_params.get('active_only', 'true').lower() == 'true'
+    try:
+        evidence_list, next_cursor = await async_contract.list_evidence_page(
+            limit=get_page_limit(request),
+            after=request.query_params.get('after'),
+            active_only=active_only
+        )
+    except ValueError as e:
+        return api_response(False, str(e), status_code=400)
+    return api_response(True, f"Found {len(evidence_list)} evidence items", evidence_list,
+                        next_cursor=next_cursor)
+
+
+async def get_evidence_history(request: Request):
+    """Get evidence transaction history."""
+    history = await async_contract.get_evidence_history(request.path_params['evidence_id'])
+    return api_response(True, f"Found {len(history)} transactions", history)
+
+
+async def get_evidence_proof(request: Request):
+    """Get Merkle inclusion proofs for each sealed history entry."""
+    proofs = await async_contract.get_evidence_proofs(request.path_params['evidence_id'])
+    return api_response(True, f"Found {len(proofs)} inclusion proofs", proofs)
+
+
+async def transfer_evidence(request: Request):
+    """Transfer evidence ownership."""
+    data = await get_json(request)
+    valid, msg = validate_required_fields(data, ['evidence_id', 'from_owner_id', 'to_owner_id', 'reason'])
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, msg = await async_contract.run(
+        commit, 'transfer_evidence',
+        evidence_id=data['evidence_id'], from_owner_id=data['from_owner_id'],
+        to_owner_id=data['to_owner_id'], reason=data['reason']
+    )
+    return api_response(success, msg, status_code=200 if success else 400)
+
+
+async def transfer_evidence_batch(request: Request):
+    """
+    Transfer many evidence items in one request.
+    
+    Body: from_owner_id, to_owner_id, reason and either case_id (all active
+    evidence of the case held by from_owner_id) or evidence_ids; optional atomic.
+    """
+    data = await get_json(request)
+    valid, msg = validate_transfer_batch(data)
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, msg, results = await async_contract.transfer_evidence_batch(
+        data['from_owner_id'], data['to_owner_id'], data['reason'],
+        case_id=data.get('case_id'),
+        evidence_ids=data.get('evidence_ids'),
+        atomic=data.get('atomic', True)
+    )
+    return api_response(success, msg, results, status_code=200 if success else 400)
+
+
+async def delete_evidence(request: Request):
+    """Delete (deactivate) evidence."""
+    data = await get_json(request) or {}
+    requester_id = data.get('requester_id')
+    reason = data.get('reason', 'No reason provided')
+    
+    if not requester_id:
+        return api_response(False, "Missing requester_id", status_code=400)
+    
+    success, msg = await async_contract.run(
+        commit, 'delete_evidence', evidence_id=request.path_params['evidence_id'],
+        requester_id=requester_id, reason=reason
+    )
+    return api_response(success, msg, status_code=200 if success else 400)
+
+
+async def verify_evidence(request: Request):
+    """Verify evidence integrity."""
+    data = await get_json(request) or {}
+    file_hash = data.get('file_hash')
+    
+    if not file_hash:
+        return api_response(False, "Missing file_hash", status_code=400)
+    
+    is_valid, msg = await async_contract.verify_evidence_integrity(
+        request.path_params['evidence_id'], file_hash
+    )
+    return api_response(is_valid, msg)
+
+
+# ============== EVIDENCE STORE ENDPOINTS ==============
+
+async def store_evidence_file(request: Request):
+    """
+    Upload and store evidence file.
+    
+    Accepts a multipart form (file, evidence_id, case_id) or, for large disk
+    images, the raw file as the request body with
+    ?evidence_id=&case_id=&filename=. The raw body is hashed while it is
+    written into the store and moved into place atomically; it is read
+    until it ends, so chunked transfer encoding works too. A multipart file
+    is first spooled to a temporary file by the form parser, so it is
+    written twice - send large files as a raw body.
+    """
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        form = await request.form()
+        file = form.get('file')
+        if file is None or isinstance(file, str):
+            return api_response(False, "No file provided", status_code=400)
+        evidence_id = form.get('evidence_id')
+        case_id = form.get('case_id')
+        if not evidence_id or not case_id:
+            return api_response(False, "Missing evidence_id or case_id", status_code=400)
+        
+        success, storage_path, file_hash = await async_contract.run(
+            evidence_store.store_evidence_stream, file.file, evidence_id, case_id,
+            filename=file.filename or ""
+        )
+        await file.close()
+    else:
+        # The body is read until it ends, so Content-Length is not needed
+        # (chunked transfer encoding works too)
+        evidence_id = request.query_params.get('evidence_id')
+        case_id = request.query_params.get('case_id')
+        if not evidence_id or not case_id:
+            return api_response(False, "Missing evidence_id or case_id", status_code=400)
+        
+        success, storage_path, file_hash = await receive_evidence(
+            request, evidence_id, case_id, request.query_params.get('filename', '')
+        )
+    
+    if success:
+        return api_response(True, "File stored successfully", {
+            "storage_path": storage_path,
+            "file_hash": file_hash
+        })
+    else:
+        return api_response(False, file_hash, status_code=400)
+
+
+async def write_body(request: Request, write):
+    """Read a request body on the event loop and run `write` on it in the thread pool."""
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer += chunk
+        # Hand the thread pool sizeable writes instead of one per network read
+        if len(buffer) >= CHUNK_SIZE:
+            await async_contract.run(write, bytes(buffer))
+            buffer.clear()
+    if buffer:
+        await async_contract.run(write, bytes(buffer))
+
+
+async def receive_evidence(request: Request, evidence_id: str, case_id: str, filename: str):
+    """Write a raw request body into the evidence store, hashing as it arrives."""
+    writer = await async_contract.run(evidence_store.open_evidence_writer,
+                                      evidence_id, case_id, filename)
+    try:
+        await write_body(request, writer.write)
+    except Exception as e:
+        await async_contract.run(writer.abort)
+        return False, "", f"Error receiving evidence: {str(e)}"
+    except BaseException:
+        # Cancelled (e.g. server shutdown): drop the partial file, then propagate
+        writer.abort()
+        raise
+    if not writer.bytes_written:
+        await async_contract.run(writer.abort)
+        return False, "", "No file provided"
+    return await async_contract.run(writer.finish)
+
+
+async def create_upload(request: Request):
+    """
+    Start a resumable chunked upload.
+    
+    Send the file with PUT /api/store/uploads/<upload_id>?offset=N (raw
+    chunk as the body, optional X-Chunk-SHA256 header), check where to
+    resume with GET, and store it with POST .../finalize.
+    """
+    data = await get_json(request)
+    valid, msg = validate_upload_session(data)
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    session = await async_contract.run(
+        upload_sessions.create, data['evidence_id'], data['case_id'],
+        filename=data.get('filename', ''), total_size=data.get('total_size')
+    )
+    return api_response(True, "Upload started", session.to_dict(), status_code=201)
+
+
+async def get_upload(request: Request):
+    """Get upload status (offset = where the next chunk starts)."""
+    session = await async_contract.run(upload_sessions.get, request.path_params['upload_id'])
+    if not session:
+        return api_response(False, "Upload not found", status_code=404)
+    return api_response(True, "Upload status", session.to_dict())
+
+
+async def upload_chunk(request: Request):
+    """Append one chunk at ?offset= (409 with the current offset if it is not where the upload stands)."""
+    session = await async_contract.run(upload_sessions.get, request.path_params['upload_id'])
+    if not session:
+        return api_response(False, "Upload not found", status_code=404)
+    offset = query_int(request, 'offset', None)
+    if offset is None:
+        return api_response(False, "Missing offset", status_code=400)
+    if offset != session.offset:
+        return api_response(False, "Offset mismatch - resume from the upload offset",
+                            session.to_dict(), status_code=409)
+    
+    size = request.headers.get('content-length')
+    try:
+        receiver = session.begin_chunk(offset, request.headers.get('x-chunk-sha256'),
+                                       size=int(size) if size and size.isdigit() else None)
+    except ChunkRejected as e:
+        return api_response(False, str(e), session.to_dict(), status_code=400)
+    
+    # The body is read here on the event loop; only the writes use the pool
+    try:
+        await write_body(request, receiver.write)
+        success, msg = True, await async_contract.run(receiver.commit)
+    except ChunkRejected as e:
+        success, msg = False, str(e)
+    except Exception as e:
+        await async_contract.run(receiver.abort)
+        success, msg = False, f"Error receiving chunk: {str(e)}"
+    except BaseException:
+        # Cancelled (e.g. server shutdown): resume from the last whole chunk
+        receiver.abort()
+        raise
+    return api_response(success, msg, session.to_dict(), status_code=200 if success else 400)
+
+
+async def abort_upload(request: Request):
+    """Cancel an upload and discard its data."""
+    if not await async_contract.run(upload_sessions.abort, request.path_params['upload_id']):
+        return api_response(False, "Upload not found", status_code=404)
+    return api_response(True, "Upload cancelled")
+
+
+async def finalize_upload(request: Request):
+    """Store the uploaded file (optional file_hash is checked against the received data)."""
+    data = await get_json(request) or {}
+    success, storage_path, file_hash = await async_contract.run(
+        upload_sessions.finalize, request.path_params['upload_id'], data.get('file_hash')
+    )
+    
+    if success:
+        return api_response(True, "File stored successfully", {
+            "storage_path": storage_path,
+            "file_hash": file_hash
+        })
+    else:
+        return api_response(False, file_hash,
+                            status_code=404 if file_hash == "Upload not found" else 400)
+
+
+async def attach_stored_file(request: Request):
+    """
+    Attach content already in the store to a case by its SHA-256.
+    
+    The repeat intake of a known file (the same image in another case) then
+    needs no upload; a 404 means the file must be uploaded.
+    """
+    data = await get_json(request)
+    valid, msg = validate_required_fields(data, ['evidence_id', 'case_id', 'file_hash'])
+    if not valid:
+        return api_response(False, msg, status_code=400)
+    
+    success, storage_path, file_hash = await async_contract.run(
+        evidence_store.attach_existing, data['file_hash'], data['evidence_id'],
+        data['case_id'], filename=data.get('filename', '')
+    )
+    
+    if success:
+        return api_response(True, "File attached from store", {
+            "storage_path": storage_path,
+            "file_hash": file_hash
+        })
+    else:
+        return api_response(False, file_hash, status_code=404)
+
+
+async def verify_stored_file(request: Request):
+    """
+    Verify stored file integrity.
+    
+    mode "hash" (default) re-hashes the whole file against expected_hash.
+    Against the file's chunk digest: "full" checks every chunk, "ranges"
+    the chunks covering [[start, end], ...] byte ranges and "sample" a
+    random sample_size chunks; the response lists the modified chunks.
+    """
+    data = await get_json(request) or {}
+    storage_path = data.get('storage_path')
+    expected_hash = data.get('expected_hash')
+    
+    if not storage_path:
+        return api_response(False, "Missing storage_path or expected_hash", status_code=400)
+    error, chunk_check = parse_verify_request(data)
+    if error:
+        return api_response(False, error, status_code=400)
+    
+    if chunk_check is None:
+        is_valid, msg = await async_contract.run(
+            evidence_store.verify_file_integrity, storage_path, expected_hash
+        )
+        return api_response(is_valid, msg)
+    is_valid, msg, report = await async_contract.run(
+        evidence_store.verify_tree_integrity, storage_path,
+        expected_hash=expected_hash, **chunk_check
+    )
+    return api_response(is_valid, msg, report)
+
+
+async def get_storage_stats(request: Request):
+    """Get storage statistics."""
+    stats = await async_contract.run(evidence_store.get_storage_stats)
+    return api_response(True, "Storage statistics", stats)
+
+
+async def list_case_evidence_files(request: Request):
+    """List all evidence files for a case."""
+    files = await async_contract.run(evidence_store.list_evidence_by_case,
+                                     request.path_params['case_id'])
+    return api_response(True, f"Found {len(files)} files", files)
+
+
+# ============== CASE ENDPOINTS ==============
+
+async def get_case_evidence(request: Request):
+    """Get all evidence for a case."""
+    case_id = request.path_params['case_id']
+    evidence_list = await async_contract.get_evidence_by_case(case_id)
+    return api_response(True, f"Found {len(evidence_list)} evidence items for case {case_id}", evidence_list)
+
+
+# ============== BLOCKCHAIN ENDPOINTS ==============
+
+async def get_blockchain(request: Request):
+    """Get blockchain blocks, paginated with ?limit=&after=<block height>."""
+    blocks, next_cursor = await async_contract.run(
+        contract.blockchain.get_blocks_page,
+        limit=get_page_limit(request),
+        after=query_int(request, 'after')
+    )
+    return api_response(True, f"Blockchain has {len(contract.blockchain.chain)} blocks", blocks,
+                        next_cursor=next_cursor)
+
+
+async def get_block_range(request: Request):
+    """Get blocks with heights in [start, end) (at most MAX_PAGE_SIZE blocks)."""
+    start = query_int(request, 'start', 0)
+    end = query_int(request, 'end', start + DEFAULT_PAGE_SIZE)
+    end = min(end, start + MAX_PAGE_SIZE)
+    blocks = await async_contract.run(contract.blockchain.get_blocks, start, end)
+    return api_response(True, f"Found {len(blocks)} blocks", blocks)
+
+
+async def get_blockchain_info(request: Request):
+    """Get blockchain overview information."""
+    return api_response(True, "Success", await async_contract.run(blockchain_info))
+
+
+async def verify_blockchain(request: Request):
+    """
+    Verify blockchain integrity.
+    
+    ?mode=full re-hashes the whole chain; adding &workers=N runs the full
+    audit in parallel and returns its report.
+    """
+    full_audit = request.query_params.get('mode', 'incremental').lower() == 'full'
+    workers = query_int(request, 'workers')
+    if full_audit and workers:
+        report = await async_contract.audit_blockchain(workers=workers)
+        msg = ("✓ Blockchain valid - No signs of tampering" if report.is_valid
+               else f"✗ WARNING: Blockchain has been modified at block #{report.first_bad_height}!")
+        return api_response(report.is_valid, msg, report.to_dict())
+    
+    is_valid, msg = await async_contract.verify_blockchain(full_audit=full_audit)
+    return api_response(is_valid, msg)
+
+
+async def start_blockchain_audit(request: Request):
+    """Start a background parallel full audit."""
+    data = await get_json(request) or {}
+    success, msg = await async_contract.start_audit(workers=data.get('workers'))
+    return api_response(success, msg, contract.get_audit_status(),
+                        status_code=202 if success else 409)
+
+
+async def get_blockchain_audit(request: Request):
+    """Get progress and result of the background audit."""
+    return api_response(True, "Audit status", contract.get_audit_status())
+
+
+async def flush_blockchain(request: Request):
+    """Seal all pending transactions into a block."""
+    success, msg = await async_contract.flush()
+    return api_response(success, msg, {"total_blocks": len(contract.blockchain.chain)})
+
+
+# ============== EXPORT ENDPOINTS ==============
+
+def ndjson_response(lines):
+    """Stream NDJSON lines, produced in the thread pool a batch at a time."""
+    async def body():
+        async for batch in async_contract.iterate(lines):
+            yield "".join(batch)
+    return StreamingResponse(body(), media_type='application/x-ndjson')
+
+
+async def export_ledger(request: Request):
+    """Stream blocks (from ?from_height=N), participants and evidence as NDJSON."""
+    start_height = query_int(request, 'from_height', 0)
+    return ndjson_response(iter_ledger_ndjson(contract, start_height))
+
+
+async def export_blockchain(request: Request):
+    """Stream blocks from ?from_height=N as NDJSON."""
+    start_height = query_int(request, 'from_height', 0)
+    return ndjson_response(iter_blocks_ndjson(contract, start_height))
+
+
+async def export_evidence(request: Request):
+    """Stream the evidence registry as NDJSON."""
+    return ndjson_response(iter_evidence_ndjson(contract))
+
+
+# ============== UTILITY ENDPOINTS ==============
+
+async def calculate_hash(request: Request):
+    """Calculate SHA256 hash for data."""
+    data = await get_json(request) or {}
+    content = data.get('content', '')
+    hash_value = await async_contract.run(lambda: hashlib.sha256(content.encode()).hexdigest())
+    return api_response(True, "Success", {"hash": hash_value})
+
+
+async def health_check(request: Request):
+    """Check system status."""
+    return api_response(True, "System is running normally", {
+        "status": "healthy",
+        "blockchain_valid": await async_contract.run(contract.blockchain.is_chain_valid),
+        "total_evidence": len(contract.evidence_registry),
+        "total_participants": await async_contract.participant_count(),
+        "storage_stats": await async_contract.run(evidence_store.get_storage_stats)
+    })
+
+
+async def api_info(request: Request):
+    """API information endpoint."""
+    return api_response(True, "Forensic-Chain API", {
+        "version": "1.0.0",
+        "description": "Digital Forensics Chain of Custody Management System",
+        "endpoints": {
+            "participants": "/api/participants",
+            "evidence": "/api/evidence",
+            "blockchain": "/api/blockchain",
+            "storage": "/api/store",
+            "health": "/api/health"
+        }
+    })
+
+
+class RefreshReplicaMiddleware:
+    """Pick up blocks sealed by the owner process before each request (multi-process mode)."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await async_contract.refresh()
+        await self.app(scope, receive, send)
+
+
+routes = [
+    Route('/', index),
+    Route('/api/participants', register_participant, methods=['POST']),
+    Route('/api/participants', list_participants, methods=['GET']),
+    Route('/api/participants/{participant_id}', get_participant, methods=['GET']),
+    Route('/api/evidence', create_evidence, methods=['POST']),
+    Route('/api/evidence', list_evidence, methods=['GET']),
+    Route('/api/evidence/batch', create_evidence_batch, methods=['POST']),
+    Route('/api/evidence/transfer', transfer_evidence, methods=['POST']),
+    Route('/api/evidence/transfer/batch', transfer_evidence_batch, methods=['POST']),
+    Route('/api/evidence/{evidence_id}', get_evidence, methods=['GET']),
+    Route('/api/evidence/{evidence_id}', delete_evidence, methods=['DELETE']),
+    Route('/api/evidence/{evidence_id}/history', get_evidence_history, methods=['GET']),
+    Route('/api/evidence/{evidence_id}/proof', get_evidence_proof, methods=['GET']),
+    Route('/api/evidence/{evidence_id}/verify', verify_evidence, methods=['POST']),
+    Route('/api/store/upload', store_evidence_file, methods=['POST']),
+    Route('/api/store/uploads', create_upload, methods=['POST']),
+    Route('/api/store/uploads/{upload_id}', get_upload, methods=['GET']),
+    Route('/api/store/uploads/{upload_id}', upload_chunk, methods=['PUT']),
+    Route('/api/store/uploads/{upload_id}', abort_upload, methods=['DELETE']),
+    Route('/api/store/uploads/{upload_id}/finalize', finalize_upload, methods=['POST']),
+    Route('/api/store/attach', attach_stored_file, methods=['POST']),
+    Route('/api/store/verify/{evidence_id}', verify_stored_file, methods=['POST']),
+    Route('/api/store/stats', get_storage_stats, methods=['GET']),
+    Route('/api/store/case/{case_id}', list_case_evidence_files, methods=['GET']),
+    Route('/api/cases/{case_id}/evidence', get_case_evidence, methods=['GET']),
+    Route('/api/blockchain', get_blockchain, methods=['GET']),
+    Route('/api/blockchain/blocks', get_block_range, methods=['GET']),
+    Route('/api/blockchain/info', get_blockchain_info, methods=['GET']),
+    Route('/api/blockchain/verify', verify_blockchain, methods=['GET']),
+    Route('/api/blockchain/audit', start_blockchain_audit, methods=['POST']),
+    Route('/api/blockchain/audit', get_blockchain_audit, methods=['GET']),
+    Route('/api/blockchain/flush', flush_blockchain, methods=['POST']),
+    Route('/api/export/ledger', export_ledger, methods=['GET']),
+    Route('/api/export/blockchain', export_blockchain, methods=['GET']),
+    Route('/api/export/evidence', export_evidence, methods=['GET']),
+    Route('/api/hash', calculate_hash, methods=['POST']),
+    Route('/api/health', health_check, methods=['GET']),
+    Route('/api', api_info, methods=['GET']),
+    Mount('/static', StaticFiles(directory=os.path.join(API_DIR, 'static')), name='static'),
+]
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    async_contract.close()
+
+
+middleware = [Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+if ledger_socket:
+    middleware.append(Middleware(RefreshReplicaMiddleware))
+
+app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
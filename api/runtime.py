@@ -0,0 +1,161 @@
+"""
+Runtime Module - Forensic Chain
+Builds the contract, commit queue, evidence store and upload sessions
+shared by the WSGI (app.py) and ASGI (asgi.py) APIs from FORENSIC_CHAIN_*
+environment variables.
+"""
+import atexit
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.blockchain import SealPolicy
+from src.commit_queue import CommitQueue
+from src.evidence_store import EvidenceStore
+from src.ledger_server import RemoteContract
+from src.smart_contract import ForensicContract
+from src.upload_sessions import UploadSessions
+
+# Block sealing policy (default: one block per transaction)
+seal_max_latency = os.environ.get('FORENSIC_CHAIN_SEAL_MAX_LATENCY')
+seal_policy = SealPolicy(
+    max_transactions=int(os.environ.get('FORENSIC_CHAIN_SEAL_MAX_TX', '1')),
+    max_latency=float(seal_max_latency) if seal_max_latency else None
+)
+# Multi-process mode: this worker serves reads from the shared ledger in
+# FORENSIC_CHAIN_DATA_DIR and forwards writes to the owner process
+# (python -m src.ledger_server) listening on this socket
+ledger_socket = os.environ.get('FORENSIC_CHAIN_LEDGER_SOCKET')
+if ledger_socket:
+    contract = RemoteContract(os.environ['FORENSIC_CHAIN_DATA_DIR'], ledger_socket)
+else:
+    # Durable ledger directory (unset = in-memory ledger, lost on restart)
+    contract = ForensicContract(
+        seal_policy=seal_policy,
+        data_dir=os.environ.get('FORENSIC_CHAIN_DATA_DIR'),
+        difficulty=int(os.environ.get('FORENSIC_CHAIN_DIFFICULTY', '2')),
+        mining_workers=int(os.environ.get('FORENSIC_CHAIN_MINING_WORKERS', '0'))
+    )
+atexit.register(contract.close)
+# Group commit: custody writes go through one commit thread that seals each
+# group of concurrent operations as one block (unset/0 = write directly;
+# in multi-process mode the owner process does the grouping)
+commit_group_size = int(os.environ.get('FORENSIC_CHAIN_COMMIT_GROUP_SIZE', '0'))
+commit_queue = None
+if commit_group_size > 0 and not ledger_socket:
+    commit_queue = CommitQueue(
+        contract,
+        max_group_size=commit_group_size,
+        max_wait=float(os.environ.get('FORENSIC_CHAIN_COMMIT_MAX_WAIT', '0.002'))
+    )
+    atexit.register(commit_queue.close)  # Runs before contract.close
+evidence_store = EvidenceStore()
+# Chunked uploads that receive nothing for this long are deleted (seconds)
+upload_sessions = UploadSessions(
+    evidence_store,
+    ttl=float(os.environ.get('FORENSIC_CHAIN_UPLOAD_TTL', UploadSessions.DEFAULT_TTL))
+)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def commit(operation: str, **kwargs):
+    """Run a custody operation through the commit queue, or directly if disabled."""
+    if commit_queue is not None:
+        result = commit_queue.submit(operation, **kwargs).result()
+        return result.success, result.message
+    return getattr(contract, operation)(**kwargs)
+
+
+def validate_required_fields(data, required):
+    """Validate required fields in request data."""
+    if not data:
+        return False, "No data provided"
+    if not isinstance(data, dict):
+        return False, "Request body must be a JSON object"
+    missing = [field for field in required if field not in data]
+    if missing:
+        return False, f"Missing required fields: {missing}"
+    return True, "Valid"
+
+
+def validate_batch_items(data):
+    """Validate the body of a batch evidence creation."""
+    valid, msg = validate_required_fields(data, ['items'])
+    if not valid:
+        return valid, msg
+    items = data['items']
+    if not isinstance(items, list) or not items:
+        return False, "items must be a non-empty list of evidence objects"
+    bad = [i for i, item in enumerate(items) if not isinstance(item, dict)]
+    if bad:
+        return False, f"items must be evidence objects (invalid at index {bad})"
+    if not isinstance(data.get('atomic', True), bool):
+        return False, "atomic must be true or false"
+    return True, "Valid"
+
+
+def validate_transfer_batch(data):
+    """Validate the body of a batch evidence transfer."""
+    valid, msg = validate_required_fields(data, ['from_owner_id', 'to_owner_id', 'reason'])
+    if not valid:
+        return valid, msg
+    # Individual IDs are checked by the contract and reported per item
+    if data.get('evidence_ids') is not None and not isinstance(data['evidence_ids'], list):
+        return False, "evidence_ids must be a list of evidence IDs"
+    if data.get('case_id') is not None and not isinstance(data['case_id'], str):
+        return False, "case_id must be a string"
+    if not isinstance(data.get('atomic', True), bool):
+        return False, "atomic must be true or false"
+    return True, "Valid"
+
+
+def validate_upload_session(data):
+    """Validate the body of a new chunked upload."""
+    valid, msg = validate_required_fields(data, ['evidence_id', 'case_id'])
+    if not valid:
+        return valid, msg
+    total_size = data.get('total_size')
+    if total_size is not None and (not isinstance(total_size, int) or total_size < 0):
+        return False, "total_size must be a non-negative integer"
+    return True, "Valid"
+
+
+def parse_verify_request(data):
+    """
+    Read the verification mode of a /api/store/verify request.
+    
+    Returns:
+        Tuple: (error message or None, keyword arguments for
+                EvidenceStore.verify_tree_integrity, or None for a flat hash check)
+    """
+    mode = data.get('mode', 'hash')
+    if mode == 'hash':
+        if not data.get('expected_hash'):
+            return "Missing storage_path or expected_hash", None
+        return None, None
+    if mode == 'full':
+        return None, {}
+    if mode == 'ranges':
+        ranges = data.get('ranges')
+        if not ranges or not all(isinstance(r, list) and len(r) == 2
+                                 and all(isinstance(v, int) for v in r) for r in ranges):
+            return "ranges must be a list of [start, end] byte offsets", None
+        return None, {"ranges": [tuple(r) for r in ranges]}
+    if mode == 'sample':
+        sample = data.get('sample_size')
+        if not isinstance(sample, int) or sample < 1:
+            return "sample_size must be a positive integer", None
+        return None, {"sample": sample}
+    return f"Unknown mode '{mode}' (hash, full, ranges or sample)", None
+
+
+def blockchain_info():
+    """Blockchain overview, plus group commit statistics when enabled."""
+    info = contract.get_blockchain_info()
+    if commit_queue is not None:
+        info["commit_queue"] = commit_queue.get_stats()
+    return info
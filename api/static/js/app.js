@@ -1,6 +1,8 @@
 // Forensic-Chain - Main JavaScript
 
 const API_BASE = 'http://localhost:5000/api';
+const PAGE_SIZE = 1000;        // Largest page the API serves
+const BLOCKS_SHOWN = 50;       // Most recent blocks shown in the explorer
 
 // State Management
 let currentUser = { participant_id: null, name: null, role: null };
@@ -169,6 +171,21 @@ async function apiCall(endpoint, method = 'GET', data = null) {
     }
 }
 
+// Fetch every page of a cursor-paginated list (follows next_cursor)
+async function apiCallAllPages(endpoint) {
+    const separator = endpoint.includes('?') ? '&' : '?';
+    let items = [];
+    let cursor = null;
+    do {
+        const after = cursor === null ? '' : `&after=${encodeURIComponent(cursor)}`;
+        const result = await apiCall(`${endpoint}${separator}limit=${PAGE_SIZE}${after}`);
+        if (!result.success) return result;
+        items = items.concat(result.data);
+        cursor = result.next_cursor ?? null;
+    } while (cursor !== null);
+    return { success: true, data: items };
+}
+
 // =============================================================================
 // DASHBOARD
 // =============================================================================
@@ -277,7 +294,7 @@ async function populateDeleteSelect() {
 // =============================================================================
 
 async function loadEvidence() {
-    const result = await apiCall('/evidence?active_only=false');
+    const result = await apiCallAllPages('/evidence?active_only=false');
     
     if (result.success) {
         allEvidence = result.data;
@@ -549,13 +566,21 @@ async function deleteEvidence(e) {
 // =============================================================================
 
 async function loadBlockchain() {
-    const result = await apiCall('/blockchain');
     const container = document.getElementById('blockchain-viz');
+    const info = await apiCall('/blockchain/info');
+    if (!info.success) return;
+    
+    // Newest blocks first; the chain can be far too long to show in full
+    const total = info.data.total_blocks;
+    const start = Math.max(0, total - BLOCKS_SHOWN);
+    const result = await apiCall(`/blockchain/blocks?start=${start}&end=${total}`);
     
     if (result.success && result.data.length > 0) {
+        const blocks = result.data.reverse();
         container.innerHTML = `
+            <p style="color: #6b7280; margin-bottom: 15px;">Showing the latest ${blocks.length} of ${total} blocks</p>
             <div class="blockchain-blocks">
-                ${result.data.map(block => `
+                ${blocks.map(block => `
                     <div class="block">
                         <div class="block-header">Block #${block.index}</div>
                         <div class="block-content">
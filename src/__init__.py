@@ -1,10 +1,10 @@
 # Forensic Chain Package
-from .blockchain import Block, Blockchain
+from .blockchain import Block, Blockchain, SealPolicy
 from .models import Evidence, Participant, ParticipantRole, TransferRecord
 from .smart_contract import ForensicContract
 
 __all__ = [
-    'Block', 'Blockchain',
+    'Block', 'Blockchain', 'SealPolicy',
     'Evidence', 'Participant', 'ParticipantRole', 'TransferRecord',
     'ForensicContract'
 ]
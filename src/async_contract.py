@@ -0,0 +1,74 @@
+"""
+Async Contract Module - Forensic Chain
+asyncio facade over ForensicContract for ASGI servers.
+
+Contract calls block: they take locks, mine blocks and fsync the ledger.
+The facade runs every call in a thread pool, so the event loop keeps
+serving other connections in the meantime. Queries still run in parallel
+because the contract lets readers share its lock.
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .smart_contract import ForensicContract
+
+
+class AsyncContract:
+    """
+    Awaitable view of a ForensicContract.
+    
+    Every public contract method is available as a coroutine with the same
+    signature, e.g. `await contract.get_evidence(evidence_id)`.
+    """
+    
+    def __init__(self, contract: 'ForensicContract', executor: Executor = None,
+                 max_workers: int = 32):
+        """
+        Initialize async facade.
+        
+        Args:
+            contract: Contract to wrap
+            executor: Executor for blocking calls (default: a new thread pool)
+            max_workers: Size of the default thread pool
+        """
+        self.contract = contract
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers,
+                                                       thread_name_prefix="contract")
+    
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run any blocking callable (contract, file I/O, hashing) in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def iterate(self, iterator: Iterator, batch_size: int = 256) -> AsyncIterator[list]:
+        """
+        Drain a blocking iterator (e.g. an NDJSON export) in the executor.
+        
+        Yields:
+            list: Up to `batch_size` items at a time
+        """
+        while True:
+            batch = await self.run(lambda: list(islice(iterator, batch_size)))
+            if not batch:
+                return
+            yield batch
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(self.contract, name)
+        if name.startswith('_') or not callable(attribute):
+            raise AttributeError(f"'{type(self).__name__}' exposes only public contract methods, not '{name}'")
+        
+        async def method(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+        
+        method.__name__ = name
+        method.__doc__ = attribute.__doc__
+        return method
+    
+    def close(self):
+        """Shut down the executor."""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,174 @@
+"""
+Audit Module - Forensic Chain
+Parallel full-chain audit: re-hashes block ranges across CPU cores.
+
+The chain is split into height ranges. Each range is re-hashed (and its
+internal previous_hash links checked) in a process pool; the links across
+range boundaries are checked afterwards in the parent process.
+
+Run an audit of a persisted ledger from the command line:
+    python -m src.audit --data-dir ./ledger --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .blockchain import Block
+from .ledger_store import LedgerStore
+
+
+@dataclass
+class AuditReport:
+    """Result of a full-chain audit."""
+    is_valid: bool
+    first_bad_height: Optional[int]    # Lowest height that failed verification
+    blocks_checked: int
+    elapsed_seconds: float
+    workers: int
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+    
+    @property
+    def blocks_per_second(self) -> float:
+        return self.blocks_checked / self.elapsed_seconds if self.elapsed_seconds else 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            "is_valid": self.is_valid,
+            "first_bad_height": self.first_bad_height,
+            "blocks_checked": self.blocks_checked,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "blocks_per_second": round(self.blocks_per_second, 1),
+            "workers": self.workers,
+            "ranges": len(self.ranges)
+        }
+
+
+def _block_is_valid(block: Block) -> bool:
+    """Check a block's hash and, if it has one, its Merkle root."""
+    if block.hash != block.calculate_hash():
+        return False
+    return block.merkle_root is None or block.merkle_root == block.calculate_merkle_root()
+
+
+def _audit_range(data_dir: Optional[str], blocks: Optional[List[Dict]],
+                 start: int, end: int) -> Tuple[Optional[int], str, str]:
+    """
+    Re-hash blocks [start, end) and check the links inside the range.
+    
+    Blocks come either from a persisted ledger (data_dir) or are passed in
+    as dictionaries (in-memory chains).
+    
+    Returns:
+        Tuple: (first bad height or None, previous_hash of the first block,
+                hash of the last block)
+    """
+    if data_dir is not None:
+        store = LedgerStore(data_dir, read_only=True)
+        source = (store.read_block(height) for height in range(start, end))
+    else:
+        store = None
+        source = (Block.from_dict(data) for data in blocks)
+    
+    first_previous_hash = last_hash = None
+    first_bad = None
+    for height, block in zip(range(start, end), source):
+        if first_previous_hash is None:
+            first_previous_hash = block.previous_hash
+        elif block.previous_hash != last_hash:
+            first_bad = height
+            break
+        if not _block_is_valid(block):
+            first_bad = height
+            break
+        last_hash = block.hash
+    
+    if store is not None:
+        store.close()
+    return first_bad, first_previous_hash, last_hash
+
+
+def split_ranges(start: int, end: int, count: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into at most `count` contiguous ranges."""
+    size = max(1, -(-(end - start) // max(count, 1)))
+    return [(lo, min(lo + size, end)) for lo in range(start, end, size)]
+
+
+def audit_chain(chain: Sequence[Block], data_dir: str = None, workers: int = None,
+                ranges_per_worker: int = 4,
+                progress: Callable[[int, int], None] = None) -> AuditReport:
+    """
+    Re-hash every block of the chain in parallel.
+    
+    Args:
+        chain: Blocks to audit (Blockchain.chain)
+        data_dir: Ledger directory of a persisted chain; workers then read
+                  blocks straight from the ledger files instead of receiving them
+        workers: Worker processes (default: CPU count)
+        ranges_per_worker: Ranges per worker; more ranges give finer progress
+        progress: Called as progress(blocks_done, blocks_total) when a range finishes
+    
+    Returns:
+        AuditReport: Validity, first bad height and throughput
+    """
+    workers = workers or os.cpu_count() or 1
+    end = len(chain)
+    ranges = split_ranges(1, end, workers * ranges_per_worker)
+    total = max(end - 1, 0)
+    started = time.perf_counter()
+    
+    results: Dict[Tuple[int, int], Tuple[Optional[int], str, str]] = {}
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for lo, hi in ranges:
+            blocks = None if data_dir else [chain[i].to_dict() for i in range(lo, hi)]
+            futures[executor.submit(_audit_range, data_dir, blocks, lo, hi)] = (lo, hi)
+        for future in as_completed(futures):
+            lo, hi = futures[future]
+            results[(lo, hi)] = future.result()
+            done += hi - lo
+            if progress:
+                progress(done, total)
+    
+    # Lowest failing height inside a range or at a range boundary
+    bad_heights = [first_bad for first_bad, _, _ in results.values() if first_bad is not None]
+    previous_hash = chain[0].hash if end else None
+    for lo, hi in ranges:
+        _, first_previous_hash, last_hash = results[(lo, hi)]
+        if first_previous_hash != previous_hash:
+            bad_heights.append(lo)
+        previous_hash = last_hash
+    first_bad = min(bad_heights) if bad_heights else None
+    
+    return AuditReport(
+        is_valid=first_bad is None,
+        first_bad_height=first_bad,
+        blocks_checked=total if first_bad is None else first_bad - 1,
+        elapsed_seconds=time.perf_counter() - started,
+        workers=workers,
+        ranges=ranges
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit a persisted Forensic-Chain ledger")
+    parser.add_argument("--data-dir", required=True, help="Ledger directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+    
+    store = LedgerStore(args.data_dir, read_only=True)
+    
+    def print_progress(done, total):
+        print(f"  {done}/{total} blocks ({done * 100 // max(total, 1)}%)", flush=True)
+    
+    report = audit_chain(store.blocks, data_dir=args.data_dir, workers=args.workers,
+                         progress=print_progress)
+    print(report.to_dict())
+    raise SystemExit(0 if report.is_valid else 1)
+
+
+if __name__ == "__main__":
+    main()
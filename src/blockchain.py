@@ -4,38 +4,162 @@ This module implements the basic blockchain mechanism for immutable transaction
 """
 import hashlib
 import json
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from .merkle import leaf_hash, merkle_proof, merkle_root, verify_merkle_proof
+
+if TYPE_CHECKING:
+    from .ledger_store import LedgerStore
+    from .mining import ParallelMiner
+
+
+# Block hash encodings. The version is stored per block so blocks hashed
+# with an older encoding keep verifying.
+ENCODING_JSON = 1      # json.dumps(..., sort_keys=True) of the whole block
+ENCODING_BINARY = 2    # Length-prefixed binary form (see Block.encode)
+ENCODING_MERKLE = 3    # Binary header committing to the Merkle root of the transactions
+CURRENT_ENCODING = ENCODING_MERKLE
+
+_canonical_json = json.JSONEncoder(sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode
+_u32 = struct.Struct('>I')
+_u64 = struct.Struct('>Q')
+
+
+def is_encodable(transaction: Dict) -> bool:
+    """Check that a transaction can be hashed (its text is valid UTF-8, e.g. no lone surrogates)."""
+    try:
+        _canonical_json(transaction).encode()
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _length_prefixed(data: bytes) -> bytes:
+    """Prefix bytes with their 4-byte big-endian length."""
+    return _u32.pack(len(data)) + data
+
+
+def encode_nonce(encoding_version: int, nonce: int) -> bytes:
+    """Encode a nonce the way the given block encoding hashes it."""
+    if encoding_version == ENCODING_JSON:
+        return str(nonce).encode()
+    return _u64.pack(nonce)
 
 
 class Block:
     """Represents a block in the blockchain."""
     
-    def __init__(self, index: int, transactions: List[Dict], previous_hash: str, timestamp: str = None):
+    def __init__(self, index: int, transactions: List[Dict], previous_hash: str, timestamp: str = None,
+                 encoding_version: int = CURRENT_ENCODING):
         self.index = index
         self.timestamp = timestamp or datetime.now().isoformat()
         self.transactions = transactions
         self.previous_hash = previous_hash
         self.nonce = 0
+        self.encoding_version = encoding_version
+        self.merkle_root = (self.calculate_merkle_root()
+                            if encoding_version >= ENCODING_MERKLE else None)
         self.hash = self.calculate_hash()
     
+    def transaction_leaves(self) -> List[bytes]:
+        """Merkle leaf hashes of the transactions (canonical JSON of each)."""
+        return [leaf_hash(_canonical_json(tx).encode()) for tx in self.transactions]
+    
+    def calculate_merkle_root(self) -> str:
+        """Calculate the Merkle root of the block's transactions."""
+        return merkle_root(self.transaction_leaves())
+    
+    def encode(self) -> bytes:
+        """
+        Canonical binary encoding of the block (ENCODING_BINARY / ENCODING_MERKLE).
+        
+        Layout: version (1 byte), index (8 bytes), then the timestamp,
+        previous hash and transaction list (compact sorted-key JSON), each
+        length-prefixed, and finally the nonce (8 bytes). ENCODING_MERKLE
+        replaces the transaction list with the 32-byte Merkle root. The
+        nonce comes last so mining can reuse the prefix.
+        """
+        return self._encode_prefix() + _u64.pack(self.nonce)
+    
+    def _encode_prefix(self) -> bytes:
+        """Binary encoding of everything except the nonce."""
+        if self.encoding_version == ENCODING_MERKLE:
+            body = bytes.fromhex(self.merkle_root)
+        else:
+            body = _length_prefixed(_canonical_json(self.transactions).encode())
+        return b"".join((
+            bytes([self.encoding_version]),
+            _u64.pack(self.index),
+            _length_prefixed(self.timestamp.encode()),
+            _length_prefixed(self.previous_hash.encode()),
+            body
+        ))
+    
     def calculate_hash(self) -> str:
-        """Calculate SHA256 hash of the block."""
-        block_data = json.dumps({
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "transactions": self.transactions,
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_data.encode()).hexdigest()
+        """Calculate SHA256 hash of the block using its encoding version."""
+        if self.encoding_version == ENCODING_JSON:
+            block_data = json.dumps({
+                "index": self.index,
+                "timestamp": self.timestamp,
+                "transactions": self.transactions,
+                "previous_hash": self.previous_hash,
+                "nonce": self.nonce
+            }, sort_keys=True)
+            return hashlib.sha256(block_data.encode()).hexdigest()
+        if self.encoding_version in (ENCODING_BINARY, ENCODING_MERKLE):
+            return hashlib.sha256(self.encode()).hexdigest()
+        raise ValueError(f"Unknown block encoding version: {self.encoding_version}")
+    
+    def mining_parts(self) -> Tuple[bytes, bytes]:
+        """
+        Split the hashed document around the nonce.
+        
+        Returns:
+            Tuple[bytes, bytes]: (prefix, suffix) such that the block hash is
+            sha256(prefix + encode_nonce(encoding_version, nonce) + suffix)
+        """
+        if self.encoding_version == ENCODING_JSON:
+            # Keys are sorted, so the nonce sits between index and previous_hash
+            prefix = json.dumps({"index": self.index})[:-1] + ', "nonce": '
+            suffix = ', ' + json.dumps({
+                "timestamp": self.timestamp,
+                "transactions": self.transactions,
+                "previous_hash": self.previous_hash
+            }, sort_keys=True)[1:]
+            return prefix.encode(), suffix.encode()
+        if self.encoding_version in (ENCODING_BINARY, ENCODING_MERKLE):
+            return self._encode_prefix(), b""
+        raise ValueError(f"Unknown block encoding version: {self.encoding_version}")
     
     def mine(self, difficulty: int = 2):
-        """Mine block with given difficulty (simple Proof of Work)."""
+        """
+        Mine block with given difficulty (simple Proof of Work).
+        
+        Everything except the nonce is serialized once; each attempt copies a
+        SHA256 object primed with that prefix and hashes only the nonce.
+        """
         target = "0" * difficulty
-        while not self.hash.startswith(target):
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        if self.hash.startswith(target):
+            return
+        prefix, suffix = self.mining_parts()
+        primed = hashlib.sha256(prefix)
+        nonce = self.nonce
+        while True:
+            nonce += 1
+            attempt = primed.copy()
+            attempt.update(encode_nonce(self.encoding_version, nonce))
+            attempt.update(suffix)
+            digest = attempt.hexdigest()
+            if digest.startswith(target):
+                break
+        self.nonce = nonce
+        self.hash = digest
     
     def to_dict(self) -> Dict:
         """Convert block to dictionary."""
@@ -45,78 +169,438 @@ class Block:
             "transactions": self.transactions,
             "previous_hash": self.previous_hash,
             "nonce": self.nonce,
-            "hash": self.hash
+            "hash": self.hash,
+            "encoding_version": self.encoding_version,
+            "merkle_root": self.merkle_root
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Block':
+        """Restore a block from its dictionary form without re-hashing it."""
+        block = cls.__new__(cls)
+        block.index = data["index"]
+        block.timestamp = data["timestamp"]
+        block.transactions = data["transactions"]
+        block.previous_hash = data["previous_hash"]
+        block.nonce = data["nonce"]
+        block.hash = data["hash"]
+        block.encoding_version = data.get("encoding_version", ENCODING_JSON)
+        block.merkle_root = data.get("merkle_root")
+        return block
+
+
+@dataclass
+class SealPolicy:
+    """
+    Rule deciding when pending transactions are sealed into a block.
+    
+    A block is sealed as soon as either limit is reached; an explicit flush
+    seals whatever is pending regardless of the policy. The latency limit
+    is also enforced when no further transactions arrive (see
+    ForensicContract's latency sealer).
+    """
+    max_transactions: int = 1              # Seal once this many transactions are pending
+    max_latency: Optional[float] = None    # Seal once the oldest pending tx is this old (seconds)
+    
+    def is_due(self, pending_count: int, oldest_age: float) -> bool:
+        """Check whether pending transactions should be sealed now."""
+        if pending_count == 0:
+            return False
+        if pending_count >= self.max_transactions:
+            return True
+        return self.max_latency is not None and oldest_age >= self.max_latency
 
 
 class Blockchain:
-    """Manages blockchain and pending transactions."""
+    """
+    Manages blockchain and pending transactions.
+    
+    Every change to the chain goes through one append path (add_transaction,
+    seal_if_due, mine_pending_transactions). Blocks are sealed one at a time
+    under the seal lock; the state lock guarding the pending list and the
+    chain is only held to cut a block and to append it, never while mining,
+    so transactions can be added while a block is mined. Reads of sealed
+    blocks take no lock.
+    """
     
-    def __init__(self, difficulty: int = 2):
+    def __init__(self, difficulty: int = 2, seal_policy: SealPolicy = None,
+                 store: 'LedgerStore' = None, miner: 'ParallelMiner' = None):
+        """
+        Initialize blockchain.
+        
+        Args:
+            difficulty: Proof of Work difficulty
+            seal_policy: When to seal pending transactions into a block
+            store: Optional durable ledger; the chain is loaded from it and
+                   every new block and pending transaction is written to it
+            miner: Optional mining engine (default: mine in-process)
+        """
         self.chain: List[Block] = []
         self.pending_transactions: List[Dict] = []
         self.difficulty = difficulty
-        self._create_genesis_block()
+        self.seal_policy = seal_policy or SealPolicy()
+        self._pending_since: Optional[float] = None
+        self.miner = miner
+        self._blocks_mined = 0
+        self._last_mining_time = 0.0
+        self._total_mining_time = 0.0
+        # Secondary index: evidence_id -> [(block_index, tx_offset), ...]
+        self._tx_index: Dict[str, List[Tuple[int, int]]] = {}
+        # Highest block height whose hash and link have already been verified
+        self.verified_height = 0
+        self._indexed_height = 0
+        # Guards pending transactions, chain appends, checkpoint updates and
+        # index catch-up; never held while mining
+        self._lock = threading.RLock()
+        # Serializes sealing, so blocks are mined and appended one at a time
+        self._seal_lock = threading.Lock()
+        # Transactions added inside atomic(), journaled together when it exits
+        self._journal_buffer: Optional[List[Dict]] = None
+        self.store = store
+        if store is not None:
+            # Blocks are served lazily from the memory-mapped ledger
+            self.chain = store.blocks
+        if store is not None and store.block_count:
+            self._load_from_store()
+        else:
+            self._create_genesis_block()
     
     def _create_genesis_block(self):
         """Create genesis block (first block)."""
         genesis = Block(0, [{"type": "genesis", "message": "Forensic-Chain Genesis Block"}], "0")
-        genesis.mine(self.difficulty)
-        self.chain.append(genesis)
+        self._mine(genesis)
+        self._append_block(genesis)
+    
+    def _load_from_store(self):
+        """Load unsealed transactions from the durable ledger."""
+        if self.store.read_only:
+            # Read-only replicas serve sealed blocks only; the journal
+            # belongs to the process that owns the ledger
+            return
+        # A crash between appending a block and clearing the journal leaves
+        # already-sealed transactions in the journal
+        sealed = {(tx.get("transaction_id"), tx.get("timestamp"))
+                  for tx in self.get_latest_block().transactions}
+        # Transactions that cannot be hashed were journaled by older
+        # versions; keeping them would block sealing for good
+        self.pending_transactions = [
+            tx for tx in self.store.load_journal()
+            if (tx.get("transaction_id"), tx.get("timestamp")) not in sealed and is_encodable(tx)
+        ]
+        if self.pending_transactions:
+            self._pending_since = time.monotonic()
+    
+    def _mine(self, block: Block):
+        """Run Proof of Work on a block with the configured engine and record timing."""
+        started = time.perf_counter()
+        if self.miner is not None:
+            self.miner.mine(block, self.difficulty)
+        else:
+            block.mine(self.difficulty)
+        self._last_mining_time = time.perf_counter() - started
+        self._total_mining_time += self._last_mining_time
+        self._blocks_mined += 1
+    
+    def get_mining_stats(self) -> Dict:
+        """Get mining engine statistics."""
+        return {
+            "engine": "parallel" if self.miner is not None else "serial",
+            "workers": self.miner.workers if self.miner is not None else 1,
+            "blocks_mined": self._blocks_mined,
+            "last_block_seconds": round(self._last_mining_time, 6),
+            "average_block_seconds": round(
+                self._total_mining_time / self._blocks_mined, 6
+            ) if self._blocks_mined else 0.0
+        }
+    
+    def _append_block(self, block: Block):
+        """Append a sealed block to the chain (persisted when backed by a store)."""
+        self.chain.append(block)
+        if self._indexed_height == block.index:
+            self._index_block(block)
+            self._indexed_height += 1
     
     def get_latest_block(self) -> Block:
         """Get the latest block in the chain."""
         return self.chain[-1]
     
     def add_transaction(self, transaction: Dict) -> str:
-        """Add transaction to pending list and return transaction_id."""
+        """
+        Add transaction to pending list and return transaction_id.
+        
+        Raises:
+            ValueError: If the transaction could never be sealed (text that
+                        is not valid UTF-8); nothing is journaled then
+        """
+        if not is_encodable(transaction):
+            raise ValueError("Transaction text is not valid UTF-8 (e.g. a lone surrogate)")
         transaction["transaction_id"] = hashlib.sha256(
             json.dumps(transaction, sort_keys=True).encode()
         ).hexdigest()[:16]
         transaction["timestamp"] = datetime.now().isoformat()
-        self.pending_transactions.append(transaction)
+        with self._lock:
+            if not self.pending_transactions:
+                self._pending_since = time.monotonic()
+            if self._journal_buffer is not None:
+                self._journal_buffer.append(transaction)
+            elif self.store is not None:
+                self.store.journal_transaction(transaction)
+            self.pending_transactions.append(transaction)
         return transaction["transaction_id"]
     
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Add several transactions that are sealed into the same block.
+        
+        The transactions are journaled together when the outermost block
+        exits, with one write and one sync.
+        """
+        with self._lock:
+            if self._journal_buffer is not None:
+                yield
+                return
+            self._journal_buffer = []
+            try:
+                yield
+            finally:
+                buffered, self._journal_buffer = self._journal_buffer, None
+                if self.store is not None:
+                    self.store.journal_transactions(buffered)
+    
+    def seal_if_due(self) -> Optional[Block]:
+        """Mine pending transactions if the seal policy says it is time."""
+        return self._seal(force=False)
+    
     def mine_pending_transactions(self) -> Optional[Block]:
         """Mine new block containing pending transactions."""
-        if not self.pending_transactions:
-            return None
+        return self._seal(force=True)
+    
+    def _seal(self, force: bool) -> Optional[Block]:
+        """
+        Cut a block from the pending transactions, mine it and append it.
         
-        new_block = Block(
-            index=len(self.chain),
-            transactions=self.pending_transactions.copy(),
-            previous_hash=self.get_latest_block().hash
-        )
-        new_block.mine(self.difficulty)
-        self.chain.append(new_block)
-        self.pending_transactions = []
+        Args:
+            force: Seal whatever is pending, regardless of the seal policy
+        
+        Returns:
+            Optional[Block]: The sealed block, or None if nothing was sealed
+        """
+        # Do not queue behind a seal in progress when nothing is due
+        if not force and not self._is_due():
+            return None
+        with self._seal_lock:
+            with self._lock:
+                if not self.pending_transactions or not (force or self._is_due()):
+                    return None
+                cut_at = time.monotonic()
+                new_block = Block(
+                    index=len(self.chain),
+                    transactions=self.pending_transactions.copy(),
+                    previous_hash=self.get_latest_block().hash
+                )
+            
+            # Transactions added from here on go into the next block
+            self._mine(new_block)
+            
+            with self._lock:
+                self._append_block(new_block)
+                # Replace (not trim) the list so readers iterating it are unaffected
+                self.pending_transactions = self.pending_transactions[len(new_block.transactions):]
+                if self.store is not None:
+                    self.store.clear_journal(self.pending_transactions)
+                # Whatever is left arrived after the block was cut
+                self._pending_since = cut_at if self.pending_transactions else None
         return new_block
     
-    def is_chain_valid(self) -> bool:
-        """Verify chain integrity."""
-        for i in range(1, len(self.chain)):
+    def seconds_until_due(self) -> Optional[float]:
+        """
+        Time left until the pending transactions reach the seal policy's max_latency.
+        
+        Returns:
+            Optional[float]: Seconds (0 if already due), or None if nothing
+                             is pending or the policy has no latency limit
+        """
+        with self._lock:
+            if self.seal_policy.max_latency is None or self._pending_since is None:
+                return None
+            oldest_age = time.monotonic() - self._pending_since
+            return max(self.seal_policy.max_latency - oldest_age, 0.0)
+    
+    def _is_due(self) -> bool:
+        """Check the seal policy against the pending transactions."""
+        with self._lock:
+            oldest_age = time.monotonic() - self._pending_since if self._pending_since else 0.0
+            return self.seal_policy.is_due(len(self.pending_transactions), oldest_age)
+    
+    def is_chain_valid(self, full: bool = False) -> bool:
+        """
+        Verify chain integrity.
+        
+        By default only blocks above the verified-height checkpoint are
+        checked, so repeated calls (health checks, info pages) cost O(new blocks).
+        
+        Args:
+            full: Re-hash every block from genesis (full audit) instead of
+                  starting at the checkpoint
+        
+        Returns:
+            bool: True if the checked part of the chain is valid
+        """
+        start = 1 if full else max(self.verified_height + 1, 1)
+        end = len(self.chain)
+        for i in range(start, end):
             current = self.chain[i]
             previous = self.chain[i - 1]
             
-            # Verify hash of current block
-            if current.hash != current.calculate_hash():
+            # Verify hash of current block (and the Merkle root it commits to)
+            if current.hash != current.calculate_hash() or (
+                    current.merkle_root is not None
+                    and current.merkle_root != current.calculate_merkle_root()):
+                self.move_checkpoint(i - 1, valid=False)
                 return False
             
             # Verify link with previous block
             if current.previous_hash != previous.hash:
+                self.move_checkpoint(i - 1, valid=False)
                 return False
         
+        self.move_checkpoint(end - 1, valid=True)
         return True
     
+    def move_checkpoint(self, height: int, valid: bool):
+        """
+        Record a verification result in the verified-height checkpoint.
+        
+        Args:
+            height: Highest height known good
+            valid: True raises the checkpoint to `height`; False (a later
+                   block failed) lowers it to `height`
+        """
+        with self._lock:
+            if valid:
+                self.verified_height = max(self.verified_height, height)
+            else:
+                self.verified_height = min(self.verified_height, height)
+    
+    def _index_block(self, block: Block):
+        """Add the evidence transactions of a block to the history index."""
+        for offset, tx in enumerate(block.transactions):
+            evidence_id = tx.get("evidence_id")
+            if evidence_id is not None:
+                self._tx_index.setdefault(evidence_id, []).append((block.index, offset))
+    
+    def rebuild_index(self):
+        """Rebuild the history index from the blocks currently in the chain."""
+        with self._lock:
+            self.restore_index({}, 0)
+            self._catch_up_index()
+    
+    def export_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Return the history index covering every block in the chain (for snapshots)."""
+        with self._lock:
+            self._catch_up_index()
+            return self._tx_index
+    
+    def restore_index(self, index: Dict[str, List[Tuple[int, int]]], height: int):
+        """
+        Restore the history index from a snapshot covering blocks below `height`.
+        
+        Blocks from `height` onward are indexed on the next history lookup.
+        """
+        with self._lock:
+            self._tx_index = {evidence_id: [tuple(entry) for entry in entries]
+                              for evidence_id, entries in index.items()}
+            self._indexed_height = height
+    
+    def _catch_up_index(self):
+        """Index blocks appended since the index was last brought up to date."""
+        if self._indexed_height == len(self.chain):
+            return
+        with self._lock:
+            while self._indexed_height < len(self.chain):
+                self._index_block(self.chain[self._indexed_height])
+                self._indexed_height += 1
+    
     def get_transaction_history(self, evidence_id: str) -> List[Dict]:
         """Get complete transaction history of an evidence."""
+        self._catch_up_index()
         history = []
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx.get("evidence_id") == evidence_id:
-                    history.append({**tx, "block_index": block.index, "block_hash": block.hash})
+        for block_index, offset in self._tx_index.get(evidence_id, []):
+            block = self.chain[block_index]
+            tx = block.transactions[offset]
+            history.append({**tx, "block_index": block.index, "block_hash": block.hash})
+        
+        # Transactions accepted but not sealed yet
+        for tx in self.pending_transactions:
+            if tx.get("evidence_id") == evidence_id:
+                history.append({**tx, "block_index": None, "block_hash": None})
         return history
     
+    def get_inclusion_proofs(self, evidence_id: str) -> List[Dict]:
+        """
+        Get a Merkle inclusion proof for every sealed transaction of an evidence.
+        
+        Blocks sealed before Merkle roots were introduced have no root, so
+        their entries carry "proof": None.
+        """
+        self._catch_up_index()
+        proofs = []
+        leaves_by_block: Dict[int, List[bytes]] = {}
+        for block_index, offset in self._tx_index.get(evidence_id, []):
+            block = self.chain[block_index]
+            entry = {
+                "transaction": block.transactions[offset],
+                "block_index": block.index,
+                "block_hash": block.hash,
+                "merkle_root": block.merkle_root,
+                "tx_offset": offset,
+                "proof": None
+            }
+            if block.merkle_root is not None:
+                if block_index not in leaves_by_block:
+                    leaves_by_block[block_index] = block.transaction_leaves()
+                entry["proof"] = merkle_proof(leaves_by_block[block_index], offset)
+            proofs.append(entry)
+        return proofs
+    
+    @staticmethod
+    def verify_inclusion_proof(transaction: Dict, proof: List[Dict], root: str) -> bool:
+        """Verify that a transaction is included under a block's Merkle root."""
+        return verify_merkle_proof(leaf_hash(_canonical_json(transaction).encode()), proof, root)
+    
+    def iter_blocks(self, start: int = 0, end: int = None) -> Iterator[Block]:
+        """
+        Yield blocks with heights in [start, end).
+        
+        Without `end`, iteration follows the tip, including blocks sealed meanwhile.
+        """
+        height = max(start, 0)
+        while height < (len(self.chain) if end is None else min(end, len(self.chain))):
+            yield self.chain[height]
+            height += 1
+    
+    def get_blocks(self, start: int, end: int = None) -> List[Dict]:
+        """Get blocks with heights in [start, end) as dictionaries."""
+        end = len(self.chain) if end is None else min(end, len(self.chain))
+        return [self.chain[height].to_dict() for height in range(max(start, 0), end)]
+    
+    def get_blocks_page(self, limit: int = 100, after: int = None) -> Tuple[List[Dict], Optional[int]]:
+        """
+        List blocks in height order, one page at a time.
+        
+        Args:
+            limit: Maximum number of blocks to return
+            after: Cursor - height of the last block of the previous page
+        
+        Returns:
+            Tuple[List[Dict], Optional[int]]: (Blocks, cursor of the next page or None)
+        """
+        start = 0 if after is None else after + 1
+        blocks = self.get_blocks(start, start + limit)
+        has_more = start + limit < len(self.chain)
+        return blocks, blocks[-1]["index"] if blocks and has_more else None
+    
     def to_dict(self) -> List[Dict]:
         """Convert entire blockchain to list of dictionaries."""
         return [block.to_dict() for block in self.chain]
@@ -0,0 +1,147 @@
+"""
+Commit Queue Module - Forensic Chain
+Single-writer commit thread with group commit.
+
+Writer threads submit custody operations and get a Future back. One commit
+thread drains the queue, runs the operations in submission order and seals
+each group as a single block, so under load many operations share one
+Proof of Work, one ledger append and one fsync instead of each paying for
+its own.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .smart_contract import ForensicContract
+
+
+@dataclass
+class CommitResult:
+    """Outcome of one committed operation."""
+    success: bool
+    message: str
+    transaction_id: Optional[str]    # None if the operation was rejected
+
+
+# Queue marker telling the commit thread to finish
+_STOP = object()
+
+
+class CommitQueue:
+    """Queue of custody operations committed in groups by one thread."""
+    
+    def __init__(self, contract: 'ForensicContract', max_group_size: int = 256,
+                 max_wait: float = 0.002):
+        """
+        Initialize and start the commit thread.
+        
+        Args:
+            contract: Contract the operations are committed to
+            max_group_size: Most operations sealed into one block
+            max_wait: Seconds to wait for more operations after the first
+                      one of a group arrives (0 = only take what is queued)
+        """
+        self.contract = contract
+        self.max_group_size = max_group_size
+        self.max_wait = max_wait
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._groups_committed = 0
+        self._operations_committed = 0
+        self._thread = threading.Thread(target=self._run, name="commit-queue", daemon=True)
+        self._thread.start()
+    
+    def submit(self, operation: str, **kwargs) -> Future:
+        """
+        Queue a custody operation.
+        
+        Args:
+            operation: One of ForensicContract.GROUP_OPERATIONS
+            **kwargs: Arguments of the contract method
+        
+        Returns:
+            Future: Resolves to a CommitResult once the operation's block is sealed
+        """
+        if operation not in self.contract.GROUP_OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Commit queue is closed")
+            self._queue.put((operation, kwargs, future))
+        return future
+    
+    def get_stats(self) -> Dict:
+        """Get group commit statistics."""
+        return {
+            "groups_committed": self._groups_committed,
+            "operations_committed": self._operations_committed,
+            "average_group_size": round(
+                self._operations_committed / self._groups_committed, 2
+            ) if self._groups_committed else 0.0,
+            "queued": self._queue.qsize(),
+            "max_group_size": self.max_group_size,
+            "max_wait": self.max_wait
+        }
+    
+    def close(self):
+        """Commit everything already queued, then stop the commit thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+    
+    def _next_group(self) -> Tuple[List[Tuple[str, Dict, Future]], bool]:
+        """
+        Block for the next group of operations.
+        
+        Returns:
+            Tuple: (operations, whether the queue was closed)
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        group = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(group) < self.max_group_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return group, True
+            group.append(item)
+        return group, False
+    
+    def _commit(self, group: List[Tuple[str, Dict, Future]]):
+        """Commit one group and resolve its futures."""
+        group = [entry for entry in group if entry[2].set_running_or_notify_cancel()]
+        if not group:
+            return
+        try:
+            results = self.contract.commit_group([(operation, kwargs) for operation, kwargs, _ in group])
+        except Exception as e:
+            for _, _, future in group:
+                future.set_exception(e)
+            return
+        
+        self._groups_committed += 1
+        self._operations_committed += len(group)
+        for (_, _, future), (success, message, tx_id) in zip(group, results):
+            future.set_result(CommitResult(success, message, tx_id))
+    
+    def _run(self):
+        """Commit thread: drain the queue one group at a time."""
+        stopping = False
+        while not stopping:
+            group, stopping = self._next_group()
+            if group:
+                self._commit(group)
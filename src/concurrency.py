@@ -0,0 +1,114 @@
+"""
+Concurrency Module - Forensic Chain
+Reader-writer lock so queries run in parallel while writes are serialized.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class RWLock:
+    """
+    Reader-writer lock.
+    
+    Any number of threads may hold the lock for reading; a writer holds it
+    alone. Waiting writers keep new readers out, so a steady stream of
+    queries cannot starve writes.
+    
+    The lock is reentrant: a writer may take it again for reading or
+    writing, and a reader may take it again for reading. A reader cannot
+    upgrade to writing (that would deadlock with another upgrading reader).
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0                   # Threads holding the lock for reading
+        self._writer: Optional[int] = None  # Ident of the thread holding it for writing
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()     # Per-thread read depth
+    
+    def acquire_read(self):
+        # Only this thread can set or clear self._writer to its own ident
+        if self._writer == threading.get_ident():
+            return
+        depth = getattr(self._local, "read_depth", 0)
+        if not depth:
+            with self._cond:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.read_depth = depth + 1
+    
+    def release_read(self):
+        if self._writer == threading.get_ident():
+            return
+        self._local.read_depth -= 1
+        if not self._local.read_depth:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._write_depth += 1
+            return
+        if getattr(self._local, "read_depth", 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+    
+    def release_write(self):
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+    
+    def write_held(self) -> bool:
+        """Check whether the calling thread holds the lock for writing."""
+        return self._writer == threading.get_ident()
+    
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+    
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def read_locked(method):
+    """Run an instance method holding `self._lock` for reading."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def write_locked(method):
+    """Run an instance method holding `self._lock` exclusively."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper
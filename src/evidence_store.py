@@ -2,14 +2,147 @@
 Evidence Store Module - Forensic Chain
 Handles distributed storage of actual evidence files separately from blockchain.
 This simulates a secure evidence repository where files are stored with encryption.
+
+Content is stored once, addressed by its SHA-256 (objects/<ab>/<sha256>).
+Each case attachment (active/<case_id>/<evidence_id>_<timestamp><ext>) is a
+hard link to its object with its own .meta sidecar, so the object's link
+count is its reference count and storage grows with unique bytes only.
+
+Each object also gets a chunked Merkle digest (objects/<ab>/<sha256>.tree,
+see tree_hash), hashed in parallel; the .meta sidecars record its root
+next to the flat SHA-256.
 """
+import errno
 import hashlib
+import json
+import mmap
 import os
+import random
+import re
 import shutil
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+from .merkle import merkle_root
+from .tree_hash import (
+    TREE_CHUNK_SIZE, TreeBuilder, chunk_count, hash_chunks, hash_file, read_blocks, tree_digest
+)
+
+
+# Read/write size for streaming intake and hashing
+CHUNK_SIZE = 1024 * 1024
+
+# A content address: lowercase hex SHA-256 (never a path)
+SHA256_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+
+class EvidenceWriter:
+    """
+    Incremental intake of one evidence file.
+    
+    Data is hashed (flat SHA-256 and tree digest) as it is written to a
+    temporary file inside the store (same filesystem as its final
+    location). finish() then moves it into place with an atomic rename, so
+    the file is never read back to hash it and never appears half-written.
+    """
+    
+    def __init__(self, store: 'EvidenceStore', evidence_id: str, case_id: str,
+                 filename: str = "", temp_path: Optional[Path] = None):
+        """
+        Initialize writer.
+        
+        Args:
+            store: Store the file is written into
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename (its extension is kept)
+            temp_path: Partial file to write; an existing one is resumed
+                       (re-hashed once, then appended to)
+        """
+        self.store = store
+        self.evidence_id = evidence_id
+        self.case_id = case_id
+        self.file_ext = Path(filename).suffix
+        self.sha256 = hashlib.sha256()
+        self.tree = TreeBuilder(store.tree_chunk_size) if store.tree_chunk_size else None
+        self.bytes_written = 0
+        self.temp_path = temp_path or store.base_path / "temp" / f"{evidence_id}_{uuid.uuid4().hex}.part"
+        if self.temp_path.exists():
+            self._file = open(self.temp_path, 'r+b')
+            for block in read_blocks(self._file, CHUNK_SIZE):
+                self._hash(block)
+        else:
+            self._file = open(self.temp_path, 'wb')
+    
+    def _hash(self, data: bytes):
+        self.sha256.update(data)
+        if self.tree is not None:
+            self.tree.update(data)
+        self.bytes_written += len(data)
+    
+    def write(self, data: bytes):
+        """Append a chunk of the file."""
+        self._hash(data)
+        self._file.write(data)
+    
+    def mark(self) -> Tuple[int, 'hashlib._Hash', Optional[TreeBuilder]]:
+        """Remember the current end of the file, to roll back to."""
+        return self.bytes_written, self.sha256.copy(), self.tree and self.tree.copy()
+    
+    def rollback(self, mark: Tuple[int, 'hashlib._Hash', Optional[TreeBuilder]]):
+        """Drop everything written since mark()."""
+        self.bytes_written, self.sha256 = mark[0], mark[1].copy()
+        self.tree = mark[2] and mark[2].copy()
+        self._file.seek(self.bytes_written)
+        self._file.truncate()
+    
+    def flush(self):
+        """Hand written data to the OS (it is fsynced by finish())."""
+        self._file.flush()
+    
+    def finish(self) -> Tuple[bool, str, str]:
+        """
+        Make the file durable and move it to its final location.
+        
+        Returns:
+            Tuple[bool, str, str]: (Success?, Storage path, File hash)
+        """
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            file_hash = self.sha256.hexdigest()
+            
+            storage_path = self.store._case_path(self.evidence_id, self.case_id, self.file_ext)
+            deduplicated = self.store._link_object(self.temp_path, file_hash, storage_path)
+            if self.temp_path.exists():
+                os.remove(self.temp_path)
+            tree = self.store._record_tree(file_hash, storage_path,
+                                           tree=self.tree.digest() if self.tree else None)
+            
+            # Create metadata file
+            self.store._create_metadata(storage_path, self.evidence_id, self.case_id, file_hash,
+                                        deduplicated=deduplicated, tree=tree)
+            
+            return True, str(storage_path), file_hash
+        
+        except Exception as e:
+            self.abort()
+            return False, "", f"Error storing evidence: {str(e)}"
+    
+    def close(self):
+        """Close the partial file, keeping it (to be resumed later)."""
+        self._file.close()
+    
+    def abort(self):
+        """Discard the partial file."""
+        self._file.close()
+        if self.temp_path.exists():
+            os.remove(self.temp_path)
+
 
 class EvidenceStore:
     """
@@ -17,13 +150,18 @@ class EvidenceStore:
     Files are stored separately from blockchain metadata.
     """
     
-    def __init__(self, base_path: str = "./evidence_store"):
+    def __init__(self, base_path: str = "./evidence_store",
+                 tree_chunk_size: int = TREE_CHUNK_SIZE, hash_workers: int = None):
         """
         Initialize evidence store.
         
         Args:
             base_path: Base directory for storing evidence files
+            tree_chunk_size: Chunk size of the tree digest (0 = no tree digest)
+            hash_workers: Threads hashing chunks in parallel (default: one per CPU)
         """
+        self.tree_chunk_size = tree_chunk_size
+        self.hash_workers = hash_workers
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         
@@ -31,6 +169,7 @@ class EvidenceStore:
         (self.base_path / "active").mkdir(exist_ok=True)
         (self.base_path / "archived").mkdir(exist_ok=True)
         (self.base_path / "temp").mkdir(exist_ok=True)
+        (self.base_path / "objects").mkdir(exist_ok=True)
     
     def store_evidence(self, file_path: str, evidence_id: str, 
                       case_id: str) -> Tuple[bool, str, str]:
@@ -50,34 +189,111 @@ class EvidenceStore:
             if not os.path.exists(file_path):
                 return False, "", f"Source file not found: {file_path}"
             
-            # Calculate file hash
-            file_hash = self._calculate_file_hash(file_path)
-            
-            # Create case directory
-            case_dir = self.base_path / "active" / case_id
-            case_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate storage filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_ext = Path(file_path).suffix
-            storage_filename = f"{evidence_id}_{timestamp}{file_ext}"
-            storage_path = case_dir / storage_filename
-            
-            # Copy file to storage
-            shutil.copy2(file_path, storage_path)
-            
-            # Create metadata file
-            self._create_metadata(storage_path, evidence_id, case_id, file_hash)
-            
+            # Copy and hash in a single pass. The source's times and mode are
+            # not copied: the stored object is shared by every case holding
+            # this content and stays read-only
+            with open(file_path, 'rb') as f:
+                return self.store_evidence_stream(f, evidence_id, case_id, filename=file_path)
+        
+        except Exception as e:
+            return False, "", f"Error storing evidence: {str(e)}"
+    
+    def attach_existing(self, file_hash: str, evidence_id: str, case_id: str,
+                        filename: str = "") -> Tuple[bool, str, str]:
+        """
+        Attach content that is already in the store to a case, without re-uploading it.
+        
+        Args:
+            file_hash: SHA-256 of the content
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename (its extension is kept)
+        
+        Returns:
+            Tuple[bool, str, str]: (Success?, Storage path, File hash or error message)
+        """
+        try:
+            file_hash = str(file_hash).lower()
+            if not SHA256_PATTERN.fullmatch(file_hash):
+                return False, "", "Invalid file hash - expected 64 hex characters"
+            if not self.has_content(file_hash):
+                return False, "", "Content not in store - upload the file"
+            storage_path = self._case_path(evidence_id, case_id, Path(filename).suffix)
+            self._link_object(None, file_hash, storage_path)
+            tree = self._record_tree(file_hash, storage_path)
+            self._create_metadata(storage_path, evidence_id, case_id, file_hash,
+                                  deduplicated=True, tree=tree)
             return True, str(storage_path), file_hash
-            
+        except FileNotFoundError:
+            return False, "", "Content not in store - upload the file"
+        except Exception as e:
+            return False, "", f"Error storing evidence: {str(e)}"
+    
+    def has_content(self, file_hash: str) -> bool:
+        """Check whether content with this SHA-256 is stored."""
+        file_hash = str(file_hash).lower()
+        return bool(SHA256_PATTERN.fullmatch(file_hash)) and self._object_path(file_hash).exists()
+    
+    def open_evidence_writer(self, evidence_id: str, case_id: str,
+                             filename: str = "") -> EvidenceWriter:
+        """
+        Start an incremental intake (for callers that receive the file in chunks).
+        
+        Args:
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename (its extension is kept)
+        
+        Returns:
+            EvidenceWriter: Call write() per chunk, then finish() or abort()
+        """
+        return EvidenceWriter(self, evidence_id, case_id, filename)
+    
+    def store_evidence_stream(self, stream: BinaryIO, evidence_id: str, case_id: str,
+                              filename: str = "", allow_empty: bool = True) -> Tuple[bool, str, str]:
+        """
+        Store evidence from a readable stream (e.g. an upload's request body).
+        
+        The SHA-256 is computed while the data is written into the store, so
+        the file is read exactly once.
+        
+        Args:
+            stream: Binary stream with a readinto() or read(size) method
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename (its extension is kept)
+            allow_empty: Store an empty stream as an empty file (False: refuse it)
+        
+        Returns:
+            Tuple[bool, str, str]: (Success?, Storage path, File hash)
+        """
+        try:
+            writer = self.open_evidence_writer(evidence_id, case_id, filename)
         except Exception as e:
             return False, "", f"Error storing evidence: {str(e)}"
+        try:
+            if hasattr(stream, 'readinto'):
+                # One reused buffer instead of a new bytes object per chunk
+                for block in read_blocks(stream, CHUNK_SIZE):
+                    writer.write(block)
+            else:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    writer.write(chunk)
+        except Exception as e:
+            writer.abort()
+            return False, "", f"Error receiving evidence: {str(e)}"
+        if not allow_empty and not writer.bytes_written:
+            writer.abort()
+            return False, "", "No file provided"
+        return writer.finish()
     
     def retrieve_evidence(self, storage_path: str) -> Tuple[bool, bytes, str]:
         """
         Retrieve evidence file from storage.
         
+        Loads the whole file into memory; use retrieve_evidence_stream() or
+        open_evidence() for large files.
+        
         Args:
             storage_path: Path to stored evidence
         
@@ -92,10 +308,59 @@ class EvidenceStore:
                 content = f.read()
             
             return True, content, "Evidence retrieved successfully"
-            
+        
         except Exception as e:
             return False, b"", f"Error retrieving evidence: {str(e)}"
     
+    def retrieve_evidence_stream(self, storage_path: str,
+                                 chunk_size: int = CHUNK_SIZE) -> Tuple[bool, Iterator[bytes], str]:
+        """
+        Retrieve evidence file from storage as a stream, in constant memory.
+        
+        Args:
+            storage_path: Path to stored evidence
+            chunk_size: Size of the pieces yielded
+        
+        Returns:
+            Tuple[bool, Iterator[bytes], str]: (Success?, File content piece by piece, Message)
+        """
+        try:
+            file = open(storage_path, 'rb', buffering=0)
+        except FileNotFoundError:
+            return False, iter(()), "Evidence file not found in storage"
+        except Exception as e:
+            return False, iter(()), f"Error retrieving evidence: {str(e)}"
+        
+        def pieces():
+            with file:
+                for chunk in iter(lambda: file.read(chunk_size), b''):
+                    yield chunk
+        
+        return True, pieces(), "Evidence retrieved successfully"
+    
+    @contextmanager
+    def open_evidence(self, storage_path: str) -> Iterator[memoryview]:
+        """
+        Map a stored evidence file into memory, read-only.
+        
+        Slices of the view are zero-copy; pages are loaded on access and can
+        be dropped by the OS again, so even images larger than RAM can be
+        read at random. Do not keep slices past the with block.
+        
+        Args:
+            storage_path: Path to stored evidence
+        
+        Yields:
+            memoryview: The file content
+        """
+        with open(storage_path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                yield memoryview(b"")    # Empty files cannot be mapped
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    yield view
+    
     def verify_file_integrity(self, storage_path: str, 
                             expected_hash: str) -> Tuple[bool, str]:
         """
@@ -118,10 +383,101 @@ class EvidenceStore:
                 return True, "✓ File integrity verified - No tampering detected"
             else:
                 return False, "✗ WARNING: File has been modified! Hash mismatch"
-                
+        
         except Exception as e:
             return False, f"Error verifying integrity: {str(e)}"
     
+    def get_tree_digest(self, file_hash: str) -> Optional[Dict]:
+        """
+        Get the recorded chunked Merkle digest of stored content.
+        
+        Args:
+            file_hash: SHA-256 of the content
+        
+        Returns:
+            Optional[Dict]: Digest (see tree_hash.tree_digest), or None if not recorded
+        """
+        file_hash = str(file_hash).lower()
+        if not SHA256_PATTERN.fullmatch(file_hash):
+            return None
+        tree_path = self._tree_path(file_hash)
+        if not tree_path.exists():
+            return None
+        with open(tree_path) as f:
+            return json.load(f)
+    
+    def verify_tree_integrity(self, storage_path: str,
+                              ranges: Optional[List[Tuple[int, int]]] = None,
+                              sample: Optional[int] = None,
+                              expected_hash: Optional[str] = None) -> Tuple[bool, str, Dict]:
+        """
+        Verify a file against its recorded tree digest, hashing chunks in parallel.
+        
+        Checks every chunk by default. An auditor can instead check only the
+        chunks covering some byte ranges, or a random sample of chunks (a
+        sample of n chunks misses a modification confined to a fraction f of
+        the chunks with probability (1 - f) ** n).
+        
+        Args:
+            storage_path: Path to stored evidence
+            ranges: Byte ranges to check, as (start, end) with end exclusive
+            sample: Number of randomly chosen chunks to check
+            expected_hash: Hash from blockchain; the recorded digest must belong to it
+        
+        Returns:
+            Tuple[bool, str, Dict]: (Valid?, Message, Report with mode, chunks_total,
+                                     chunks_checked and mismatched_chunks)
+        """
+        mode = "ranges" if ranges is not None else "sample" if sample is not None else "full"
+        report = {"mode": mode, "chunks_total": 0, "chunks_checked": 0, "mismatched_chunks": []}
+        try:
+            if ranges is not None and sample is not None:
+                return False, "Give either ranges or sample, not both", report
+            if not os.path.exists(storage_path):
+                return False, "File not found in storage", report
+            
+            metadata, tree = self._tree_for(storage_path)
+            if tree is None:
+                return False, "No tree digest recorded for this file", report
+            if expected_hash and metadata["file_hash"] != expected_hash:
+                return False, "✗ WARNING: Stored file does not belong to the expected hash", report
+            
+            # The recorded chunk hashes must still add up to the root recorded at intake
+            chunks, chunk_size = tree["chunks"], tree["chunk_size"]
+            if (merkle_root([bytes.fromhex(chunk) for chunk in chunks]) != tree["root"]
+                    or metadata.get("tree_root", tree["root"]) != tree["root"]):
+                return False, "✗ WARNING: Tree digest has been modified", report
+            report["chunks_total"] = len(chunks)
+            
+            if ranges is not None:
+                indexes = self._chunks_in_ranges(ranges, tree)
+            elif sample is not None:
+                if sample < 1:
+                    return False, "Sample must be at least one chunk", report
+                indexes = sorted(random.SystemRandom().sample(range(len(chunks)), min(sample, len(chunks))))
+            else:
+                indexes = list(range(len(chunks)))
+            
+            leaves = hash_chunks(storage_path, chunk_size, indexes, workers=self.hash_workers)
+            mismatched = {i for i, leaf in zip(indexes, leaves) if leaf.hex() != chunks[i]}
+            
+            # A truncated or extended file changes its last chunks
+            file_size = os.path.getsize(storage_path)
+            if file_size != tree["file_size"]:
+                first = min(file_size, tree["file_size"]) // chunk_size
+                mismatched.update(range(first, max(len(chunks), chunk_count(file_size, chunk_size))))
+            
+            report["chunks_checked"] = len(indexes)
+            report["mismatched_chunks"] = sorted(mismatched)
+            if mismatched:
+                return False, f"✗ WARNING: File has been modified! {len(mismatched)} chunk(s) differ", report
+            if mode == "full":
+                return True, "✓ File integrity verified - No tampering detected", report
+            return True, f"✓ {len(indexes)} of {len(chunks)} chunks verified - No tampering detected", report
+        
+        except Exception as e:
+            return False, f"Error verifying integrity: {str(e)}", report
+    
     def archive_evidence(self, storage_path: str, 
                         evidence_id: str) -> Tuple[bool, str]:
         """
@@ -152,7 +508,7 @@ class EvidenceStore:
                 shutil.move(meta_source, meta_dest)
             
             return True, str(archive_path)
-            
+        
         except Exception as e:
             return False, f"Error archiving evidence: {str(e)}"
     
@@ -171,16 +527,23 @@ class EvidenceStore:
             if not os.path.exists(storage_path):
                 return False, "Evidence file not found"
             
-            # Delete file
+            # Delete file (this case's link to the content)
             os.remove(storage_path)
             
             # Delete metadata
             meta_path = Path(storage_path).with_suffix('.meta')
+            file_hash = None
             if meta_path.exists():
+                with open(meta_path) as f:
+                    file_hash = json.load(f).get("file_hash")
                 os.remove(meta_path)
             
-            return True, "Evidence file permanently deleted"
+            # Drop the content once no case links to it
+            if file_hash:
+                self._collect_object(file_hash)
             
+            return True, "Evidence file permanently deleted"
+        
         except Exception as e:
             return False, f"Error deleting evidence: {str(e)}"
     
@@ -213,27 +576,153 @@ class EvidenceStore:
     
     def _calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA256 hash of file."""
-        sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+        return hash_file(file_path, CHUNK_SIZE)
+    
+    def _object_path(self, file_hash: str) -> Path:
+        """Location of the content with the given SHA-256."""
+        if not SHA256_PATTERN.fullmatch(file_hash):
+            raise ValueError(f"Invalid content address {file_hash!r}")
+        return self.base_path / "objects" / file_hash[:2] / file_hash
+    
+    def _case_path(self, evidence_id: str, case_id: str, file_ext: str) -> Path:
+        """Path of a new case attachment (creates the case directory)."""
+        case_dir = self.base_path / "active" / case_id
+        case_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Generate storage filename with timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return case_dir / f"{evidence_id}_{timestamp}{file_ext}"
+    
+    def _link_object(self, temp_path: Optional[Path], file_hash: str, storage_path: Path) -> bool:
+        """
+        Store content (if new) and link it into a case.
+        
+        Args:
+            temp_path: Fully written file with this content, or None to link
+                       content that is already stored
+            file_hash: SHA-256 of the content
+            storage_path: Case attachment path to create
+        
+        Returns:
+            bool: True if the content was already stored (deduplicated)
+        
+        Raises:
+            OSError: If the filesystem does not support hard links
+        """
+        object_path = self._object_path(file_hash)
+        object_path.parent.mkdir(exist_ok=True)
+        
+        # A concurrent delete may collect the object between the two links;
+        # publish it again from our copy and retry
+        for _ in range(3):
+            deduplicated = True
+            if temp_path is not None:
+                try:
+                    os.link(temp_path, object_path)
+                    os.chmod(object_path, 0o444)    # Stored content is immutable
+                    deduplicated = False
+                except FileExistsError:
+                    pass
+                except OSError as e:
+                    if e.errno not in (errno.EPERM, errno.EXDEV, errno.ENOTSUP):
+                        raise
+                    # Link counts are the reference counts: without hard links
+                    # content would be stored unshared and never collected
+                    raise OSError(e.errno, "Evidence store needs a filesystem with hard links",
+                                  str(self.base_path)) from e
+            try:
+                os.link(object_path, storage_path)
+                return deduplicated
+            except FileNotFoundError:
+                if temp_path is None:
+                    raise
+        raise RuntimeError(f"Could not link content {file_hash}")
+    
+    def _collect_object(self, file_hash: str):
+        """Remove stored content that no case links to any more."""
+        if not SHA256_PATTERN.fullmatch(file_hash):
+            return    # Hash from a damaged .meta: never names a stored object
+        object_path = self._object_path(file_hash)
+        try:
+            if object_path.stat().st_nlink <= 1:
+                os.remove(object_path)
+                os.remove(self._tree_path(file_hash))
+        except FileNotFoundError:
+            pass
+    
+    def _tree_path(self, file_hash: str) -> Path:
+        """Location of the tree digest of the content with the given SHA-256."""
+        return self._object_path(file_hash).with_suffix('.tree')
+    
+    def _tree_for(self, storage_path: str) -> Tuple[Dict, Optional[Dict]]:
+        """Metadata and tree digest of a stored file, found through its .meta sidecar."""
+        meta_path = Path(storage_path).with_suffix('.meta')
+        if not meta_path.exists():
+            return {}, None
+        with open(meta_path) as f:
+            metadata = json.load(f)
+        file_hash = metadata.get("file_hash")
+        return metadata, self.get_tree_digest(file_hash) if file_hash else None
+    
+    @staticmethod
+    def _chunks_in_ranges(ranges: List[Tuple[int, int]], tree: Dict) -> List[int]:
+        """Indexes of the chunks covering byte ranges (start, end), end exclusive."""
+        chunk_size = tree["chunk_size"]
+        indexes = set()
+        for start, end in ranges:
+            if not 0 <= start < end <= tree["file_size"]:
+                raise ValueError(f"Invalid range {start}-{end} for a file of {tree['file_size']} bytes")
+            indexes.update(range(start // chunk_size, (end - 1) // chunk_size + 1))
+        return sorted(indexes)
+    
+    def _record_tree(self, file_hash: str, content_path: Path,
+                     tree: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Record the tree digest of stored content, unless it already is.
+        
+        Args:
+            file_hash: SHA-256 of the content
+            content_path: A file holding the content
+            tree: Digest built while the content was written (default:
+                  hash the file)
+        
+        Returns:
+            Optional[Dict]: The digest (None if tree digests are disabled)
+        """
+        if not self.tree_chunk_size:
+            return None
+        recorded = self.get_tree_digest(file_hash)
+        if recorded is not None:
+            return recorded
+        if tree is None:
+            tree = tree_digest(str(content_path), self.tree_chunk_size, workers=self.hash_workers)
+        tree_path = self._tree_path(file_hash)
+        temp_path = tree_path.with_name(f"{tree_path.name}.{uuid.uuid4().hex}")
+        with open(temp_path, 'w') as f:
+            json.dump(tree, f)
+        os.replace(temp_path, tree_path)
+        return tree
     
     def _create_metadata(self, storage_path: Path, evidence_id: str,
-                        case_id: str, file_hash: str):
-        """Create metadata file for evidence."""
+                        case_id: str, file_hash: str, deduplicated: bool = False,
+                        tree: Optional[Dict] = None):
+        """Create metadata file for evidence (one per case attachment)."""
         metadata = {
             "evidence_id": evidence_id,
             "case_id": case_id,
             "file_hash": file_hash,
             "stored_at": datetime.now().isoformat(),
             "file_size": storage_path.stat().st_size,
-            "original_filename": storage_path.name
+            "original_filename": storage_path.name,
+            "content_path": str(self._object_path(file_hash).relative_to(self.base_path)),
+            "deduplicated": deduplicated
         }
+        if tree is not None:
+            metadata["tree_root"] = tree["root"]
+            metadata["tree_chunk_size"] = tree["chunk_size"]
         
         meta_path = storage_path.with_suffix('.meta')
         with open(meta_path, 'w') as f:
-            import json
             json.dump(metadata, f, indent=2)
     
     def get_storage_stats(self) -> dict:
@@ -241,17 +730,24 @@ class EvidenceStore:
         active_count = len(list((self.base_path / "active").rglob("*.*")))
         archived_count = len(list((self.base_path / "archived").rglob("*.*")))
         
-        # Calculate total size
-        total_size = sum(
-            f.stat().st_size 
-            for f in self.base_path.rglob("*") 
-            if f.is_file() and f.suffix != '.meta'
-        )
+        # Calculate total size: each stored file counts once however many
+        # case attachments link to it
+        inodes = {}
+        logical_size = 0
+        for f in self.base_path.rglob("*"):
+            if f.is_file() and f.suffix not in ('.meta', '.tree') and f.parent.name != "temp":
+                stat = f.stat()
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+                if "objects" not in f.relative_to(self.base_path).parts:
+                    logical_size += stat.st_size
+        total_size = sum(inodes.values())
         
         return {
             "active_evidence": active_count // 2,  # Divide by 2 (file + meta)
             "archived_evidence": archived_count // 2,
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "attached_size_bytes": logical_size,
+            "deduplication_ratio": round(logical_size / total_size, 2) if total_size else 1.0,
             "base_path": str(self.base_path)
         }
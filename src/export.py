@@ -0,0 +1,58 @@
+"""
+Export Module - Forensic Chain
+Streams the ledger and registries as newline-delimited JSON (NDJSON).
+
+Every line is one JSON object of the form {"kind": ..., "data": ...}.
+Records are produced one at a time from generators, so memory stays flat
+however large the ledger is, and block exports can resume from a height.
+"""
+import json
+from datetime import datetime
+from typing import Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .smart_contract import ForensicContract
+
+
+def _line(kind: str, data) -> str:
+    """Encode one NDJSON record."""
+    return json.dumps({"kind": kind, "data": data}, separators=(',', ':')) + "\n"
+
+
+def iter_blocks_ndjson(contract: 'ForensicContract', start_height: int = 0,
+                       end_height: int = None) -> Iterator[str]:
+    """Yield blocks from `start_height` (to `end_height` or the tip) as NDJSON lines."""
+    for block in contract.blockchain.iter_blocks(start_height, end_height):
+        yield _line("block", block.to_dict())
+
+
+def iter_evidence_ndjson(contract: 'ForensicContract') -> Iterator[str]:
+    """Yield every evidence record (including deactivated ones) as NDJSON lines."""
+    for evidence in contract.iter_evidence(active_only=False):
+        yield _line("evidence", evidence.to_dict())
+
+
+def iter_participants_ndjson(contract: 'ForensicContract') -> Iterator[str]:
+    """Yield every participant as NDJSON lines."""
+    for participant in contract.list_participants():
+        yield _line("participant", participant.to_dict())
+
+
+def iter_ledger_ndjson(contract: 'ForensicContract', start_height: int = 0) -> Iterator[str]:
+    """
+    Yield a full export: a header line, blocks from `start_height` up to
+    the height recorded in the header, then participants and evidence.
+    
+    Args:
+        contract: Contract to export
+        start_height: First block height to include (resume point)
+    """
+    chain_height = len(contract.blockchain.chain)
+    yield _line("export", {
+        "exported_at": datetime.now().isoformat(),
+        "start_height": start_height,
+        "chain_height": chain_height
+    })
+    yield from iter_blocks_ndjson(contract, start_height, chain_height)
+    yield from iter_participants_ndjson(contract)
+    yield from iter_evidence_ndjson(contract)
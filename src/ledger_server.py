@@ -0,0 +1,239 @@
+"""
+Ledger Server Module - Forensic Chain
+Multi-process serving over one shared ledger.
+
+One owner process holds the writable ForensicContract and listens on a
+local Unix socket. API worker processes use RemoteContract: queries are
+served from a read-only replica of the shared ledger directory, and
+custody operations are forwarded to the owner, one NDJSON request and
+response per line.
+
+Start the owner, then point any number of API workers at it:
+    python -m src.ledger_server --data-dir ./ledger --socket /tmp/forensic-chain.sock
+"""
+import argparse
+import inspect
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from .blockchain import SealPolicy
+from .commit_queue import CommitQueue
+from .smart_contract import ForensicContract
+
+
+# Contract methods a worker may forward to the owner
+OPERATIONS = (
+    'register_participant', 'create_evidence', 'create_evidence_batch',
+    'transfer_evidence', 'transfer_evidence_batch', 'delete_evidence',
+    'commit_group', 'flush'
+)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serve NDJSON requests from one worker connection until it closes."""
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = {"ok": True, "result": self.server.ledger.execute(
+                    request["op"], request.get("args", {})
+                )}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, separators=(',', ':')).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class LedgerServer:
+    """Owner process endpoint: applies custody operations forwarded by workers."""
+    
+    def __init__(self, contract: ForensicContract, socket_path: str,
+                 commit_queue: CommitQueue = None):
+        """
+        Initialize ledger server.
+        
+        Args:
+            contract: Writable contract owning the ledger
+            socket_path: Path of the Unix socket to listen on
+            commit_queue: Optional group commit queue; single custody
+                          operations from all workers are then sealed together
+        """
+        self.contract = contract
+        self.socket_path = socket_path
+        self.commit_queue = commit_queue
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = _UnixServer(socket_path, _RequestHandler)
+        self._server.ledger = self
+    
+    def execute(self, operation: str, args: Dict):
+        """Run one forwarded operation and return its JSON-serializable result."""
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        if self.commit_queue is not None and operation in self.contract.GROUP_OPERATIONS:
+            result = self.commit_queue.submit(operation, **args).result()
+            return [result.success, result.message]
+        return getattr(self.contract, operation)(**args)
+    
+    def serve_forever(self):
+        """Serve workers until shutdown() is called."""
+        self._server.serve_forever()
+    
+    def shutdown(self):
+        """Stop serving and remove the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def _forwarded(name: str):
+    """Build a RemoteContract method that forwards `name` to the owner process."""
+    signature = inspect.signature(getattr(ForensicContract, name))
+    
+    def method(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        arguments.pop('self')
+        return tuple(self._forward(name, dict(arguments)))
+    
+    method.__name__ = name
+    method.__doc__ = f"Forward {name} to the ledger owner process."
+    return method
+
+
+class RemoteContract(ForensicContract):
+    """
+    Worker-side contract.
+    
+    Reads come from a read-only replica of the shared ledger, brought up to
+    date with refresh(). Custody operations are forwarded to the owner
+    process, and the replica is refreshed right after, so a worker sees
+    its own writes once they are sealed.
+    """
+    
+    def __init__(self, data_dir: str, socket_path: str):
+        """
+        Initialize remote contract.
+        
+        Args:
+            data_dir: Ledger directory owned by the server process
+            socket_path: Unix socket of the server process
+        """
+        super().__init__(data_dir=data_dir, read_only=True)
+        self.socket_path = socket_path
+        self._connections = threading.local()    # One connection per thread
+    
+    def _connect(self) -> Tuple[socket.socket, BinaryIO, bool]:
+        """
+        Return this thread's connection to the owner, opening it if needed.
+        
+        Returns:
+            Tuple: (socket, reader, whether the connection was already open)
+        """
+        connection = getattr(self._connections, "connection", None)
+        if connection is not None:
+            return (*connection, True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"Ledger owner at '{self.socket_path}' is not reachable") from e
+        self._connections.connection = (sock, sock.makefile('rb'))
+        return (*self._connections.connection, False)
+    
+    def _disconnect(self, sock: socket.socket):
+        """Drop this thread's connection."""
+        self._connections.connection = None
+        sock.close()
+    
+    def _forward(self, operation: str, args: Dict):
+        """Send one operation to the owner process and return its result."""
+        request = json.dumps({"op": operation, "args": args}, separators=(',', ':')).encode() + b"\n"
+        sock, reader, reused = self._connect()
+        try:
+            sock.sendall(request)
+        except OSError:
+            self._disconnect(sock)
+            if not reused:
+                raise ConnectionError(f"Ledger owner at '{self.socket_path}' is not reachable")
+            # Closed by an owner that restarted since the last request: the
+            # request never left, so it is safe to send it on a new connection
+            return self._forward(operation, args)
+        try:
+            line = reader.readline()
+        except OSError:
+            line = b""
+        if not line:
+            # The owner may or may not have applied it: never resent
+            self._disconnect(sock)
+            raise ConnectionError(f"Ledger owner at '{self.socket_path}' closed the connection")
+        
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        self.refresh()
+        return response["result"]
+    
+    register_participant = _forwarded('register_participant')
+    create_evidence = _forwarded('create_evidence')
+    create_evidence_batch = _forwarded('create_evidence_batch')
+    transfer_evidence = _forwarded('transfer_evidence')
+    transfer_evidence_batch = _forwarded('transfer_evidence_batch')
+    delete_evidence = _forwarded('delete_evidence')
+    flush = _forwarded('flush')
+    
+    def commit_group(self, operations: List[Tuple[str, Dict]]) -> List[Tuple[bool, str, Optional[str]]]:
+        """Forward commit_group to the ledger owner process."""
+        return [tuple(result) for result in self._forward("commit_group", {"operations": operations})]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Own a Forensic-Chain ledger and serve API workers")
+    parser.add_argument("--data-dir", required=True, help="Ledger directory")
+    parser.add_argument("--socket", required=True, help="Unix socket path")
+    parser.add_argument("--difficulty", type=int, default=2, help="Proof of Work difficulty")
+    parser.add_argument("--mining-workers", type=int, default=0, help="Parallel mining processes")
+    parser.add_argument("--seal-max-tx", type=int, default=1, help="Seal once N transactions are pending")
+    parser.add_argument("--seal-max-latency", type=float, default=None,
+                        help="Seal once the oldest pending transaction is N seconds old")
+    parser.add_argument("--commit-group-size", type=int, default=0,
+                        help="Group commit of forwarded operations (0 = off)")
+    parser.add_argument("--commit-max-wait", type=float, default=0.002,
+                        help="Seconds to collect a commit group")
+    args = parser.parse_args()
+    
+    contract = ForensicContract(
+        seal_policy=SealPolicy(max_transactions=args.seal_max_tx, max_latency=args.seal_max_latency),
+        data_dir=args.data_dir,
+        difficulty=args.difficulty,
+        mining_workers=args.mining_workers
+    )
+    commit_queue = None
+    if args.commit_group_size > 0:
+        commit_queue = CommitQueue(contract, max_group_size=args.commit_group_size,
+                                   max_wait=args.commit_max_wait)
+    server = LedgerServer(contract, args.socket, commit_queue=commit_queue)
+    print(f"Serving ledger {args.data_dir} on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        if commit_queue is not None:
+            commit_queue.close()
+        contract.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+Ledger Store Module - Forensic Chain
+Append-only on-disk storage for blocks, registry snapshots and pending transactions.
+
+Layout of the data directory:
+    segment-<first_height>.log   Append-only block segments
+    segment-<first_height>.idx   Offset table (one 8-byte offset per block)
+    snapshot.json                Latest registry snapshot (written atomically)
+    pending.jsonl                Journal of transactions not yet sealed into a block
+
+Each block is stored as one record:
+    [payload length: 4 bytes][crc32: 4 bytes][header length: 4 bytes][header JSON][transactions JSON]
+
+Segments are memory-mapped and blocks are handed out as LazyBlock views, so
+only the header of a block is decoded until its transactions are accessed.
+
+One process owns the ledger and appends to it; other processes may open it
+read-only and call refresh() to pick up blocks appended since.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .blockchain import Block, ENCODING_JSON
+
+
+RECORD_HEADER = struct.Struct('>III')
+
+
+def encode_block_record(block_data: Dict) -> bytes:
+    """Encode a block dictionary as one segment record."""
+    header = {k: v for k, v in block_data.items() if k != "transactions"}
+    header_bytes = json.dumps(header, sort_keys=True, separators=(',', ':')).encode()
+    body_bytes = json.dumps(block_data["transactions"], sort_keys=True, separators=(',', ':')).encode()
+    payload = header_bytes + body_bytes
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), len(header_bytes)) + payload
+
+
+def decode_block_record(payload: bytes, header_length: int) -> Dict:
+    """Decode the payload of a segment record into a block dictionary."""
+    block_data = json.loads(payload[:header_length])
+    block_data["transactions"] = json.loads(payload[header_length:])
+    return block_data
+
+
+class LazyBlock(Block):
+    """Block view over a memory-mapped record; transactions are decoded on first access."""
+    
+    def __init__(self, header: Dict, buffer: mmap.mmap, start: int, end: int):
+        self.index = header["index"]
+        self.timestamp = header["timestamp"]
+        self.previous_hash = header["previous_hash"]
+        self.nonce = header["nonce"]
+        self.hash = header["hash"]
+        self.encoding_version = header.get("encoding_version", ENCODING_JSON)
+        self.merkle_root = header.get("merkle_root")
+        self._buffer = buffer
+        self._span = (start, end)
+        self._transactions = None
+    
+    @property
+    def transactions(self) -> List[Dict]:
+        # Read the buffer before the transactions: a concurrent decode sets
+        # the transactions first and only then drops the buffer
+        buffer = self._buffer
+        transactions = self._transactions
+        if transactions is None:
+            start, end = self._span
+            transactions = json.loads(buffer[start:end])
+            self._transactions = transactions
+            self._buffer = None
+        return transactions
+    
+    @transactions.setter
+    def transactions(self, value: List[Dict]):
+        self._transactions = value
+        self._buffer = None
+
+
+class BlockSequence:
+    """
+    List-like view of the blocks in a LedgerStore.
+    
+    Supports len(), indexing (including negative indexes and slices),
+    iteration and append(), so it can stand in for Blockchain.chain.
+    Only a bounded number of recently used blocks are kept resident.
+    Safe to read from several threads while one thread appends.
+    """
+    
+    def __init__(self, store: 'LedgerStore', cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[int, Block]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self.store.block_count
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("block index out of range")
+        
+        with self._cache_lock:
+            block = self._cache.get(key)
+            if block is not None:
+                self._cache.move_to_end(key)
+                return block
+        block = self.store.read_block(key)
+        self._remember(key, block)
+        return block
+    
+    def __iter__(self) -> Iterator[Block]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def append(self, block: Block):
+        """Persist a new block and keep it in the hot cache."""
+        self.store.append_block(block.to_dict())
+        self._remember(block.index, block)
+    
+    def _remember(self, height: int, block: Block):
+        """Add a block to the LRU cache, evicting the least recently used."""
+        with self._cache_lock:
+            self._cache[height] = block
+            self._cache.move_to_end(height)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+class LedgerStore:
+    """
+    Durable append-only ledger.
+    
+    Blocks are appended to segment files that roll over every
+    `blocks_per_segment` blocks. Opening a store only scans the last
+    segment (to drop a torn record left by a crash); sealed segments are
+    located through their offset tables, so startup cost does not grow
+    with the age of the ledger.
+    """
+    
+    SNAPSHOT_FILE = "snapshot.json"
+    JOURNAL_FILE = "pending.jsonl"
+    
+    def __init__(self, data_dir: str, blocks_per_segment: int = 4096, sync: bool = True,
+                 cache_blocks: int = 1024, read_only: bool = False):
+        """
+        Initialize ledger store.
+        
+        Args:
+            data_dir: Directory holding segments, snapshot and journal
+            blocks_per_segment: Number of blocks per segment file
+            sync: fsync every append (durable against power loss)
+            cache_blocks: Number of decoded blocks kept resident
+            read_only: Open without repairing or writing anything (for readers
+                       of a ledger owned by another process)
+        """
+        self.data_dir = Path(data_dir)
+        self.read_only = read_only
+        if not read_only:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.blocks_per_segment = blocks_per_segment
+        self.sync = sync
+        
+        # Sorted list of (first_height, path)
+        self.segments: List[Tuple[int, Path]] = sorted(
+            (int(p.stem.split('-')[1]), p) for p in self.data_dir.glob("segment-*.log")
+        )
+        self._first_heights = [first for first, _ in self.segments]
+        self._offsets: Dict[Path, array] = {}     # Offset tables, loaded on demand
+        self._maps: Dict[Path, mmap.mmap] = {}    # Memory maps of segments
+        self._tail_size = 0                       # Bytes of the tail segment scanned
+        self._journal = None                      # Append handle of the journal, kept open
+        if self.segments:
+            self._recover_tail()
+        self.blocks = BlockSequence(self, cache_size=cache_blocks)
+    
+    # ============== BLOCKS ==============
+    
+    @property
+    def block_count(self) -> int:
+        """Number of blocks stored."""
+        if not self.segments:
+            return 0
+        return self.segments[-1][0] + len(self._offsets[self.segments[-1][1]])
+    
+    def append_block(self, block_data: Dict):
+        """Append a block to the tail segment."""
+        if self.read_only:
+            raise PermissionError("Ledger store is opened read-only")
+        if not self.segments or len(self._offsets[self.segments[-1][1]]) >= self.blocks_per_segment:
+            first_height = self.block_count
+            path = self.data_dir / f"segment-{first_height:012d}.log"
+            # Publish the empty offset table first so concurrent readers
+            # never see a segment without one
+            self._offsets[path] = array('Q')
+            self.segments.append((first_height, path))
+            self._first_heights.append(first_height)
+        
+        path = self.segments[-1][1]
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(encode_block_record(block_data))
+            self._sync(f)
+        self._offsets[path].append(offset)
+        with open(path.with_suffix('.idx'), 'ab') as f:
+            f.write(self._pack_offsets(array('Q', [offset])))
+            self._sync(f)
+    
+    def read_block(self, height: int) -> LazyBlock:
+        """Return a lazy view of the block at the given height."""
+        i = bisect.bisect_right(self._first_heights, height) - 1
+        first_height, path = self.segments[i]
+        offset = self._load_offsets(path)[height - first_height]
+        
+        buffer = self._map(path, offset + RECORD_HEADER.size)
+        length, _, header_length = RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + RECORD_HEADER.size
+        buffer = self._map(path, start + length)
+        header = json.loads(buffer[start:start + header_length])
+        return LazyBlock(header, buffer, start + header_length, start + length)
+    
+    def iter_blocks(self, start_height: int = 0) -> Iterator[Dict]:
+        """Yield stored blocks as dictionaries, starting at the given height."""
+        for height in range(start_height, self.block_count):
+            yield self.read_block(height).to_dict()
+    
+    def is_stale(self) -> bool:
+        """True if the owning process appended data since the last refresh (read-only stores)."""
+        if not self.read_only or not self.segments:
+            return False
+        first_height, path = self.segments[-1]
+        if path.stat().st_size > self._tail_size:
+            return True
+        return (self.block_count > first_height
+                and (self.data_dir / f"segment-{self.block_count:012d}.log").exists())
+    
+    def refresh(self) -> int:
+        """
+        Pick up blocks appended by the owning process since the last refresh.
+        
+        Only read-only stores need this (a writer already knows its own
+        blocks). Not safe to call concurrently with readers of this store.
+        
+        Returns:
+            int: Number of blocks now visible
+        """
+        if not self.read_only:
+            return self.block_count
+        while self.segments:
+            path = self.segments[-1][1]
+            if path.stat().st_size > self._tail_size:
+                offsets, self._tail_size = self._scan_offsets(path, self._tail_size)
+                self._offsets[path].extend(offsets)
+            
+            # The writer names a new segment after the height of its first block
+            next_path = self.data_dir / f"segment-{self.block_count:012d}.log"
+            if next_path == path or not next_path.exists():
+                break
+            self._offsets[next_path] = array('Q')
+            self.segments.append((self.block_count, next_path))
+            self._first_heights.append(self.segments[-1][0])
+            self._tail_size = 0
+        return self.block_count
+    
+    def close(self):
+        """Release memory maps and the journal handle."""
+        self._close_journal()
+        for buffer in self._maps.values():
+            buffer.close()
+        self._maps = {}
+    
+    def _map(self, path: Path, needed: int) -> mmap.mmap:
+        """Return a memory map of a segment covering at least `needed` bytes."""
+        buffer = self._maps.get(path)
+        if buffer is None or len(buffer) < needed:
+            # The tail segment grows; remap it (old views keep their own map alive)
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[path] = buffer
+        return buffer
+    
+    def _load_offsets(self, path: Path) -> array:
+        """Load the offset table of a segment, rebuilding it if missing."""
+        offsets = self._offsets.get(path)
+        if offsets is None:
+            idx_path = path.with_suffix('.idx')
+            if idx_path.exists():
+                offsets = array('Q')
+                offsets.frombytes(idx_path.read_bytes())
+                if sys.byteorder == 'big':
+                    offsets.byteswap()
+            else:
+                offsets = self._scan_offsets(path)[0]
+                if not self.read_only:
+                    idx_path.write_bytes(self._pack_offsets(offsets))
+            self._offsets[path] = offsets
+        return offsets
+    
+    def _scan_offsets(self, path: Path, start: int = 0) -> Tuple[array, int]:
+        """
+        Scan a segment from byte `start` and return (record offsets, size of valid data).
+        
+        Only an incomplete or corrupt *last* record counts as a torn write
+        (or, for a reader, one still being written). A corrupt record
+        followed by more data is kept, so tampering is reported by hash
+        verification instead of silently cutting the ledger.
+        """
+        offsets = array('Q')
+        size = start
+        file_size = path.stat().st_size
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while True:
+                prefix = f.read(RECORD_HEADER.size)
+                if len(prefix) < RECORD_HEADER.size:
+                    break
+                length, crc, _ = RECORD_HEADER.unpack(prefix)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                end = size + RECORD_HEADER.size + length
+                if zlib.crc32(payload) != crc and end == file_size:
+                    break
+                offsets.append(size)
+                size = end
+        return offsets, size
+    
+    def _recover_tail(self):
+        """Scan the tail segment, truncate a torn last record and rewrite its offset table."""
+        path = self.segments[-1][1]
+        offsets, valid_size = self._scan_offsets(path)
+        self._offsets[path] = offsets
+        self._tail_size = valid_size
+        if self.read_only:
+            return
+        if path.stat().st_size != valid_size:
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+        path.with_suffix('.idx').write_bytes(self._pack_offsets(offsets))
+    
+    @staticmethod
+    def _pack_offsets(offsets: array) -> bytes:
+        """Serialize offsets as little-endian 8-byte integers."""
+        if sys.byteorder == 'big':
+            offsets = array('Q', offsets)
+            offsets.byteswap()
+        return offsets.tobytes()
+    
+    # ============== SNAPSHOTS ==============
+    
+    def write_snapshot(self, snapshot: Dict):
+        """Atomically replace the registry snapshot."""
+        path = self.data_dir / self.SNAPSHOT_FILE
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+            self._sync(f)
+        os.replace(temp_path, path)
+    
+    def load_snapshot(self) -> Optional[Dict]:
+        """Load the latest registry snapshot, if any."""
+        path = self.data_dir / self.SNAPSHOT_FILE
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+    
+    # ============== PENDING JOURNAL ==============
+    
+    def journal_transaction(self, transaction: Dict):
+        """Record a transaction that has not been sealed into a block yet."""
+        self.journal_transactions([transaction])
+    
+    def journal_transactions(self, transactions: List[Dict]):
+        """Record several unsealed transactions with one write and one sync."""
+        if not transactions:
+            return
+        if self._journal is None:
+            self._journal = open(self.data_dir / self.JOURNAL_FILE, 'a')
+        self._journal.write("".join(json.dumps(tx, sort_keys=True) + "\n" for tx in transactions))
+        self._journal.flush()
+        self._sync(self._journal)
+    
+    def clear_journal(self, remaining: List[Dict] = ()):
+        """
+        Drop journaled transactions once they are sealed.
+        
+        Args:
+            remaining: Transactions recorded while the block was being mined;
+                       the journal is atomically replaced by just these
+        """
+        path = self.data_dir / self.JOURNAL_FILE
+        self._close_journal()
+        if remaining:
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                for transaction in remaining:
+                    f.write(json.dumps(transaction, sort_keys=True) + "\n")
+                self._sync(f)
+            os.replace(temp_path, path)
+        elif path.exists():
+            with open(path, 'w') as f:
+                self._sync(f)
+    
+    def _close_journal(self):
+        """Close the journal handle (it is reopened on the next append)."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    def load_journal(self) -> List[Dict]:
+        """Load journaled transactions, ignoring a torn last line."""
+        path = self.data_dir / self.JOURNAL_FILE
+        if not path.exists():
+            return []
+        transactions = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    transactions.append(json.loads(line))
+                except ValueError:
+                    break
+        return transactions
+    
+    def _sync(self, f):
+        """Flush a file to stable storage if syncing is enabled."""
+        if self.sync:
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,88 @@
+"""
+Merkle Tree Module - Forensic Chain
+Merkle roots and compact inclusion proofs over block transactions.
+
+Leaves and inner nodes are domain-separated (0x00 / 0x01 prefixes) so a
+leaf can never be passed off as an inner node. On a level with an odd
+number of nodes the last node is promoted unchanged to the next level.
+"""
+import hashlib
+from typing import Dict, List
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash a leaf (canonical transaction bytes)."""
+    return hashlib.sha256(b'\x00' + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Hash two child nodes."""
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def merkle_root(leaves: List[bytes]) -> str:
+    """
+    Calculate the Merkle root of a list of leaf hashes.
+    
+    Args:
+        leaves: Leaf hashes (see leaf_hash)
+    
+    Returns:
+        str: Hex root (hash of nothing for an empty list)
+    """
+    if not leaves:
+        return hashlib.sha256(b'').hexdigest()
+    level = leaves
+    while len(level) > 1:
+        level = [
+            node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+    return level[0].hex()
+
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Dict]:
+    """
+    Build an inclusion proof for the leaf at `index`.
+    
+    Returns:
+        List[Dict]: Sibling hashes from leaf to root, each as
+                    {"hash": hex, "position": "left" | "right"}
+    """
+    proof = []
+    level = leaves
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                "hash": level[sibling].hex(),
+                "position": "left" if sibling < index else "right"
+            })
+        level = [
+            node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: bytes, proof: List[Dict], root: str) -> bool:
+    """
+    Verify that a leaf hash is included under a Merkle root.
+    
+    Args:
+        leaf: Leaf hash (see leaf_hash)
+        proof: Proof as returned by merkle_proof
+        root: Expected hex root
+    
+    Returns:
+        bool: True if the proof leads to the root
+    """
+    current = leaf
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            current = node_hash(sibling, current)
+        else:
+            current = node_hash(current, sibling)
+    return current.hex() == root
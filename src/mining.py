@@ -0,0 +1,120 @@
+"""
+Mining Module - Forensic Chain
+Optional multi-process Proof of Work engine for higher mining difficulty.
+
+The nonce space is split into batches that are searched in parallel by a
+process pool. As soon as one worker finds a valid nonce, the others are
+told to stop and queued batches are cancelled.
+
+Every search is tagged with the generation of the block it belongs to;
+finishing a block advances the shared generation, so batches of an
+earlier block stop even while the next block is being mined.
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+
+from .blockchain import Block, encode_nonce
+
+
+# Set in each worker process by _init_worker
+_generation = None
+
+
+def _init_worker(generation):
+    """Store the shared search generation in the worker process."""
+    global _generation
+    _generation = generation
+
+
+def _search_nonces(prefix: bytes, suffix: bytes, encoding_version: int,
+                   start: int, count: int, target: str,
+                   generation: int = None) -> Optional[Tuple[int, str]]:
+    """
+    Search nonces in [start, start + count) for a hash with the target prefix.
+    
+    Stops early once the shared generation moves past `generation`.
+    
+    Returns:
+        Optional[Tuple[int, str]]: (nonce, hash) if found, else None
+    """
+    primed = hashlib.sha256(prefix)
+    for nonce in range(start, start + count):
+        if nonce & 0xFFF == 0 and _generation is not None and _generation.value != generation:
+            return None
+        attempt = primed.copy()
+        attempt.update(encode_nonce(encoding_version, nonce))
+        attempt.update(suffix)
+        digest = attempt.hexdigest()
+        if digest.startswith(target):
+            return nonce, digest
+    return None
+
+
+class ParallelMiner:
+    """Proof of Work engine that searches the nonce space across processes."""
+    
+    def __init__(self, workers: int = None, batch_size: int = 50000):
+        """
+        Initialize parallel miner.
+        
+        Args:
+            workers: Number of worker processes (default: CPU count)
+            batch_size: Nonces searched per task; smaller batches stop faster
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self._generation = multiprocessing.Value('Q', 0)
+        self._in_flight = set()    # Batches of the last block, possibly still stopping
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._generation,)
+        )
+    
+    def mine(self, block: Block, difficulty: int) -> Block:
+        """Find a nonce for the block and set its nonce and hash."""
+        target = "0" * difficulty
+        if block.hash.startswith(target):
+            return block
+        
+        prefix, suffix = block.mining_parts()
+        generation = self._generation.value
+        next_start = block.nonce + 1
+        in_flight = set()
+        result = None
+        
+        try:
+            # Keep every worker busy with one queued batch behind the running one
+            while result is None:
+                while len(in_flight) < self.workers * 2:
+                    in_flight.add(self._executor.submit(
+                        _search_nonces, prefix, suffix, block.encoding_version,
+                        next_start, self.batch_size, target, generation
+                    ))
+                    next_start += self.batch_size
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                found = [f.result() for f in done if f.result() is not None]
+                if found:
+                    result = min(found)
+        finally:
+            # Stop running batches of this block for good and drop queued ones
+            self._stop_searches()
+            for future in in_flight:
+                future.cancel()
+            self._in_flight = in_flight
+        
+        block.nonce, block.hash = result
+        return block
+    
+    def shutdown(self):
+        """Stop worker processes."""
+        self._stop_searches()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _stop_searches(self):
+        """Advance the generation, so every batch searching so far stops."""
+        with self._generation.get_lock():
+            self._generation.value += 1
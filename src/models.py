@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from enum import Enum
 
+from .tree_hash import hash_file
+
 
 class ParticipantRole(Enum):
     """Roles of participants in the system."""
@@ -35,6 +37,16 @@ class Participant:
             "organization": self.organization,
             "created_at": self.created_at
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Participant':
+        return cls(
+            participant_id=data["participant_id"],
+            name=data["name"],
+            role=ParticipantRole(data["role"]),
+            organization=data["organization"],
+            created_at=data["created_at"]
+        )
 
 
 @dataclass
@@ -52,6 +64,10 @@ class TransferRecord:
             "timestamp": self.timestamp,
             "reason": self.reason
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TransferRecord':
+        return cls(**data)
 
 
 @dataclass
@@ -83,6 +99,13 @@ class Evidence:
             "transfer_history": [t.to_dict() for t in self.transfer_history],
             "metadata": self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Evidence':
+        return cls(**{
+            **data,
+            "transfer_history": [TransferRecord.from_dict(t) for t in data["transfer_history"]]
+        })
 
 
 def generate_evidence_id(file_content: bytes) -> str:
@@ -92,8 +115,4 @@ def generate_evidence_id(file_content: bytes) -> str:
 
 def generate_file_hash(file_path: str) -> str:
     """Calculate SHA256 hash of file."""
-    sha256 = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    return hash_file(file_path)
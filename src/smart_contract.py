@@ -2,19 +2,350 @@
 Smart Contract Module - Forensic Chain
 Implements 4 main functions: Create, Transfer, Delete, Display evidence.
 """
+import functools
+import inspect
+import json
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from .blockchain import Blockchain
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .audit import AuditReport, audit_chain
+from .blockchain import Blockchain, SealPolicy, is_encodable
+from .concurrency import RWLock, read_locked, write_locked
+from .ledger_store import LedgerStore
+from .mining import ParallelMiner
 from .models import Evidence, Participant, TransferRecord, ParticipantRole
 
 
+def sealing(flush: bool = False):
+    """
+    Run a custody operation holding `self._lock` exclusively, then seal.
+    
+    Sealing (Proof of Work) runs after the lock is released, so queries and
+    the next operation's validation do not wait behind mining. Operations
+    nested in another one (commit_group) leave sealing to the outermost.
+    
+    Args:
+        flush: Seal everything pending instead of following the seal policy
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._lock.write():
+                result = method(self, *args, **kwargs)
+            if not self._lock.write_held():
+                if flush:
+                    self._seal_pending()
+                else:
+                    self._seal_if_due()
+            return result
+        return wrapper
+    return decorator
+
+
 class ForensicContract:
-    """Smart Contract managing digital evidence on blockchain."""
+    """
+    Smart Contract managing digital evidence on blockchain.
+    
+    Safe to share between threads: queries hold a shared read lock and run
+    in parallel, state-changing operations hold it exclusively while they
+    validate and record transactions. Blocks are mined afterwards through
+    the blockchain's single append path, without the registry lock.
+    """
+    
+    # Fields required to create evidence
+    CREATE_FIELDS = ['evidence_id', 'description', 'creator_id', 'file_hash', 'file_location', 'case_id']
+    
+    # Custody operations that can be committed together (see commit_group)
+    GROUP_OPERATIONS = ('register_participant', 'create_evidence', 'transfer_evidence', 'delete_evidence')
     
-    def __init__(self):
-        self.blockchain = Blockchain(difficulty=2)
+    def __init__(self, seal_policy: SealPolicy = None, data_dir: str = None,
+                 snapshot_interval: int = 1000, difficulty: int = 2,
+                 mining_workers: int = 0, read_only: bool = False):
+        """
+        Initialize contract.
+        
+        Args:
+            seal_policy: When to seal pending transactions into a block
+                         (default: one block per transaction)
+            data_dir: Directory of the durable ledger; None keeps everything in memory
+            snapshot_interval: Number of sealed blocks between registry snapshots
+            difficulty: Proof of Work difficulty
+            mining_workers: Worker processes for parallel mining (0 = mine in-process)
+            read_only: Open `data_dir` as a replica of a ledger owned by another
+                       process (sealed state only; see refresh)
+        """
+        self.store = LedgerStore(data_dir, read_only=read_only) if data_dir else None
+        if read_only and (self.store is None or not self.store.block_count):
+            raise FileNotFoundError(f"No ledger found in '{data_dir}'")
+        self.snapshot_interval = snapshot_interval
+        self.miner = ParallelMiner(workers=mining_workers) if mining_workers > 0 else None
+        self.blockchain = Blockchain(difficulty=difficulty, seal_policy=seal_policy,
+                                     store=self.store, miner=self.miner)
         self.evidence_registry: Dict[str, Evidence] = {}   # Evidence registry
         self.participant_registry: Dict[str, Participant] = {}  # Participant registry
+        
+        # Secondary indexes: case_id / owner_id -> evidence IDs (dicts used as
+        # insertion-ordered sets), split by active status
+        self._active_by_case: Dict[str, Dict[str, None]] = {}
+        self._inactive_by_case: Dict[str, Dict[str, None]] = {}
+        self._active_by_owner: Dict[str, Dict[str, None]] = {}
+        self._inactive_by_owner: Dict[str, Dict[str, None]] = {}
+        
+        # Creation order of evidence, for stable cursor pagination
+        self._evidence_order: List[str] = []
+        self._evidence_position: Dict[str, int] = {}
+        self._snapshot_height = 0
+        self._replayed_height = 0    # Blocks applied to the registries
+        self._audit_thread: Optional[threading.Thread] = None
+        self.audit_status: Dict = {"state": "idle"}
+        self._lock = RWLock()
+        if self.store is not None:
+            self._load_from_store()
+        
+        # Enforce the latency limit even when no further writes arrive
+        self._sealer_stop = threading.Event()
+        self._sealer: Optional[threading.Thread] = None
+        if self.blockchain.seal_policy.max_latency is not None and not read_only:
+            self._sealer = threading.Thread(target=self._seal_on_deadline,
+                                            name="latency-sealer", daemon=True)
+            self._sealer.start()
+    
+    # ============== STATE & PERSISTENCE ==============
+    
+    def _apply_transaction(self, tx: Dict):
+        """
+        Apply a recorded transaction to the registries.
+        
+        Used both right after a transaction is recorded and when replaying
+        the ledger on startup, so registry state is always derived from the
+        transaction log.
+        """
+        tx_type = tx.get("type")
+        if tx_type == "REGISTER_PARTICIPANT":
+            self.participant_registry[tx["participant_id"]] = Participant(
+                participant_id=tx["participant_id"],
+                name=tx["name"],
+                role=ParticipantRole(tx["role"]),
+                organization=tx.get("organization", ""),
+                created_at=tx["timestamp"]
+            )
+        elif tx_type == "CREATE_EVIDENCE":
+            # Creator is initial owner
+            evidence = Evidence(
+                evidence_id=tx["evidence_id"],
+                description=tx["description"],
+                creator_id=tx["creator_id"],
+                current_owner_id=tx["creator_id"],
+                file_hash=tx["file_hash"],
+                file_location=tx.get("file_location", ""),
+                case_id=tx["case_id"],
+                created_at=tx["timestamp"],
+                metadata=self._stored_metadata(tx.get("metadata"))
+            )
+            self.evidence_registry[evidence.evidence_id] = evidence
+            self._index_evidence(evidence)
+            self._append_to_order(evidence.evidence_id)
+        elif tx_type == "TRANSFER_EVIDENCE":
+            evidence = self.evidence_registry[tx["evidence_id"]]
+            self._unindex_evidence(evidence)
+            evidence.transfer_history.append(TransferRecord(
+                from_owner=tx["from_owner"],
+                to_owner=tx["to_owner"],
+                timestamp=tx["timestamp"],
+                reason=tx["reason"]
+            ))
+            evidence.current_owner_id = tx["to_owner"]
+            self._index_evidence(evidence)
+        elif tx_type == "DELETE_EVIDENCE":
+            evidence = self.evidence_registry[tx["evidence_id"]]
+            self._unindex_evidence(evidence)
+            evidence.is_active = False
+            self._index_evidence(evidence)
+    
+    @staticmethod
+    def _stored_metadata(metadata) -> Dict:
+        """Metadata of a recorded creation (non-objects were accepted by older versions)."""
+        if metadata is None:
+            return {}
+        return dict(metadata) if isinstance(metadata, dict) else {"value": metadata}
+    
+    def _append_to_order(self, evidence_id: str):
+        """Record evidence at the end of the creation order."""
+        self._evidence_position[evidence_id] = len(self._evidence_order)
+        self._evidence_order.append(evidence_id)
+    
+    def _index_evidence(self, evidence: Evidence):
+        """Add evidence to the case and owner indexes for its current state."""
+        by_case = self._active_by_case if evidence.is_active else self._inactive_by_case
+        by_owner = self._active_by_owner if evidence.is_active else self._inactive_by_owner
+        by_case.setdefault(evidence.case_id, {})[evidence.evidence_id] = None
+        by_owner.setdefault(evidence.current_owner_id, {})[evidence.evidence_id] = None
+    
+    def _unindex_evidence(self, evidence: Evidence):
+        """Remove evidence from the case and owner indexes for its current state."""
+        by_case = self._active_by_case if evidence.is_active else self._inactive_by_case
+        by_owner = self._active_by_owner if evidence.is_active else self._inactive_by_owner
+        for index, key in ((by_case, evidence.case_id), (by_owner, evidence.current_owner_id)):
+            bucket = index.get(key, {})
+            bucket.pop(evidence.evidence_id, None)
+            if not bucket:
+                index.pop(key, None)
+    
+    def _record(self, tx: Dict) -> str:
+        """Add a transaction to the blockchain, apply it and return its ID."""
+        tx_id = self.blockchain.add_transaction(tx)
+        self._apply_transaction(tx)
+        return tx_id
+    
+    def _seal_if_due(self):
+        """Seal pending transactions according to the sealing policy."""
+        if self.blockchain.seal_if_due() is not None:
+            self._maybe_snapshot()
+    
+    def _seal_on_deadline(self):
+        """Latency sealer: seal pending transactions once they reach max_latency."""
+        max_latency = self.blockchain.seal_policy.max_latency
+        while True:
+            # A transaction arriving while we sleep is due max_latency after
+            # it arrived, so waking up every max_latency never seals late
+            wait = self.blockchain.seconds_until_due()
+            if self._sealer_stop.wait(max_latency if wait is None else wait):
+                return
+            try:
+                self._seal_if_due()
+            except Exception:
+                # Left pending for the next write, flush or round
+                self._sealer_stop.wait(max_latency)
+    
+    def _seal_pending(self):
+        """Seal all pending transactions now."""
+        block = self.blockchain.mine_pending_transactions()
+        if block is not None:
+            self._maybe_snapshot()
+        return block
+    
+    def _load_from_store(self):
+        """Restore registries from the latest snapshot and replay the tail."""
+        snapshot = self.store.load_snapshot()
+        if snapshot:
+            self.participant_registry = {
+                p["participant_id"]: Participant.from_dict(p) for p in snapshot["participants"]
+            }
+            self.evidence_registry = {
+                e["evidence_id"]: Evidence.from_dict(e) for e in snapshot["evidence"]
+            }
+            for evidence in self.evidence_registry.values():
+                self._index_evidence(evidence)
+                self._append_to_order(evidence.evidence_id)
+            self._snapshot_height = snapshot["height"]
+            self.blockchain.restore_index(snapshot.get("tx_index", {}), snapshot["height"])
+            if self.store.read_only:
+                # The owner may have sealed past our view of the ledger
+                # before writing this snapshot
+                self.store.refresh()
+            # The verification checkpoint is not restored: the ledger files
+            # may have been changed while no process watched them, so the
+            # first check after startup covers the whole chain again
+        
+        for block in self.blockchain.chain[self._snapshot_height:]:
+            for tx in block.transactions:
+                self._apply_transaction(tx)
+        self._replayed_height = len(self.blockchain.chain)
+        for tx in self.blockchain.pending_transactions:
+            self._apply_transaction(tx)
+    
+    def refresh(self) -> int:
+        """
+        Replay blocks sealed by the owning process since the last refresh.
+        
+        Only does work for read-only replicas. When nothing changed this is
+        a stat() or two and takes no lock, so it can run before every request.
+        
+        Returns:
+            int: Number of blocks applied
+        """
+        if self.store is None or not self.store.is_stale():
+            return 0
+        with self._lock.write():
+            self.store.refresh()
+            height = self._replayed_height
+            for block in self.blockchain.chain[height:]:
+                for tx in block.transactions:
+                    self._apply_transaction(tx)
+            self._replayed_height = len(self.blockchain.chain)
+            return self._replayed_height - height
+    
+    def _maybe_snapshot(self):
+        """Write a registry snapshot every `snapshot_interval` sealed blocks."""
+        if (self.store is not None
+                and len(self.blockchain.chain) - self._snapshot_height >= self.snapshot_interval):
+            self.snapshot()
+    
+    @write_locked
+    def snapshot(self):
+        """
+        Write a registry snapshot of the sealed state.
+        
+        Only taken when no transactions are pending, so the registries match
+        exactly the blocks up to the snapshot height.
+        """
+        if self.store is None or self.store.read_only or self.blockchain.pending_transactions:
+            return
+        self.store.write_snapshot({
+            "height": len(self.blockchain.chain),
+            "tx_index": self.blockchain.export_index(),
+            "participants": [p.to_dict() for p in self.participant_registry.values()],
+            "evidence": [e.to_dict() for e in self.evidence_registry.values()]
+        })
+        self._snapshot_height = len(self.blockchain.chain)
+    
+    def close(self):
+        """Seal pending transactions, write a final snapshot and release resources."""
+        if self._sealer is not None:
+            # Before taking the lock: the sealer may be waiting for it to snapshot
+            self._sealer_stop.set()
+            self._sealer.join()
+        with self._lock.write():
+            if self.store is not None:
+                self.blockchain.mine_pending_transactions()
+                self.snapshot()
+                self.store.close()
+            if self.miner is not None:
+                self.miner.shutdown()
+    
+    # ============== INPUT VALIDATION ==============
+    
+    @staticmethod
+    def _validate_fields(text: Dict[str, object], metadata=None) -> Tuple[bool, str]:
+        """
+        Check argument types before anything is recorded.
+        
+        A transaction is journaled before it is applied, so whatever passes
+        here must apply to the registries and seal cleanly; otherwise a
+        journaled transaction would break the next seal or replay.
+        
+        Args:
+            text: Fields that must be strings, by name
+            metadata: Optional metadata, which must be a JSON object
+        
+        Returns:
+            Tuple[bool, str]: (Valid?, Message)
+        """
+        for name, value in text.items():
+            if not isinstance(value, str):
+                return False, f"Field '{name}' must be a string"
+        if metadata is not None:
+            if not isinstance(metadata, dict):
+                return False, "Field 'metadata' must be an object"
+            try:
+                json.dumps(metadata, sort_keys=True, allow_nan=False)
+            except (TypeError, ValueError):
+                return False, "Field 'metadata' must contain only JSON values with string keys"
+            if not all(isinstance(key, str) for key in metadata):
+                return False, "Field 'metadata' must contain only JSON values with string keys"
+        if not is_encodable({"text": text, "metadata": metadata}):
+            return False, "Text fields must be valid UTF-8"
+        return True, "Valid"
     
     # ============== ACCESS CONTROL ==============
     
@@ -25,7 +356,7 @@ class ForensicContract:
         Args:
             participant_id: ID of participant
             required_roles: List of roles that are allowed
-            
+        
         Returns:
             Tuple[bool, str]: (Has permission?, Message)
         """
@@ -40,39 +371,51 @@ class ForensicContract:
     
     # ============== PARTICIPANT MANAGEMENT ==============
     
+    @sealing()
     def register_participant(self, participant_id: str, name: str, 
                             role: str, organization: str) -> Tuple[bool, str]:
         """Register new participant in the system."""
+        valid, msg = self._validate_fields({"participant_id": participant_id, "name": name,
+                                            "role": role, "organization": organization})
+        if not valid:
+            return False, msg
         if participant_id in self.participant_registry:
             return False, f"Participant with ID '{participant_id}' already exists"
         
         try:
-            participant = Participant(
-                participant_id=participant_id,
-                name=name,
-                role=ParticipantRole(role),
-                organization=organization
-            )
-            self.participant_registry[participant_id] = participant
-            
-            # Record registration transaction
-            self.blockchain.add_transaction({
-                "type": "REGISTER_PARTICIPANT",
-                "participant_id": participant_id,
-                "name": name,
-                "role": role
-            })
-            
-            return True, f"Successfully registered participant: {name}"
+            ParticipantRole(role)
         except ValueError:
             return False, f"Role '{role}' is invalid"
+        
+        # Record registration transaction
+        self._record({
+            "type": "REGISTER_PARTICIPANT",
+            "participant_id": participant_id,
+            "name": name,
+            "role": role,
+            "organization": organization
+        })
+        
+        return True, f"Successfully registered participant: {name}"
     
+    @read_locked
     def get_participant(self, participant_id: str) -> Optional[Participant]:
         """Get participant information."""
         return self.participant_registry.get(participant_id)
     
+    @read_locked
+    def list_participants(self) -> List[Participant]:
+        """List all participants in registration order."""
+        return list(self.participant_registry.values())
+    
+    @read_locked
+    def participant_count(self) -> int:
+        """Get the number of registered participants."""
+        return len(self.participant_registry)
+    
     # ============== 1. EVIDENCE CREATION ==============
     
+    @sealing()
     def create_evidence(self, evidence_id: str, description: str, 
                        creator_id: str, file_hash: str, 
                        file_location: str, case_id: str,
@@ -92,6 +435,32 @@ class ForensicContract:
         Returns:
             Tuple[bool, str]: (Success?, Message)
         """
+        valid, msg = self._validate_creation_fields({
+            "evidence_id": evidence_id,
+            "description": description,
+            "creator_id": creator_id,
+            "file_hash": file_hash,
+            "file_location": file_location,
+            "case_id": case_id,
+            "metadata": metadata
+        })
+        if valid:
+            valid, msg = self._validate_creation(evidence_id, creator_id)
+        if not valid:
+            return False, msg
+        
+        tx_id = self._record_creation(evidence_id, description, creator_id, file_hash,
+                                      file_location, case_id, metadata)
+        
+        return True, f"Evidence created successfully. Transaction ID: {tx_id}"
+    
+    def _validate_creation_fields(self, item: Dict) -> Tuple[bool, str]:
+        """Check the field types of a creation (a batch item or the create_evidence arguments)."""
+        return self._validate_fields({field: item[field] for field in self.CREATE_FIELDS},
+                                     item.get("metadata"))
+    
+    def _validate_creation(self, evidence_id: str, creator_id: str) -> Tuple[bool, str]:
+        """Check that evidence can be created by the given creator."""
         # Check if ID already exists
         if evidence_id in self.evidence_registry:
             return False, f"Evidence with ID '{evidence_id}' already exists in system"
@@ -101,45 +470,98 @@ class ForensicContract:
             return False, f"Participant with ID '{creator_id}' not found"
         
         # Check permission - only investigators and forensic experts can create evidence
-        has_permission, msg = self._check_permission(
+        return self._check_permission(
             creator_id, 
             [ParticipantRole.INVESTIGATOR, ParticipantRole.FORENSIC_EXPERT, ParticipantRole.ADMIN]
         )
-        if not has_permission:
-            return False, msg
-        
-        # Create new evidence - creator is initial owner
-        evidence = Evidence(
-            evidence_id=evidence_id,
-            description=description,
-            creator_id=creator_id,
-            current_owner_id=creator_id,  # Initial owner = Creator
-            file_hash=file_hash,
-            file_location=file_location,
-            case_id=case_id,
-            metadata=metadata or {}
-        )
-        
-        # Save to registry
-        self.evidence_registry[evidence_id] = evidence
-        
-        # Record creation transaction on blockchain
-        tx_id = self.blockchain.add_transaction({
+    
+    def _record_creation(self, evidence_id: str, description: str, creator_id: str,
+                         file_hash: str, file_location: str, case_id: str,
+                         metadata: dict = None) -> str:
+        """Record a creation transaction on blockchain - creator is initial owner."""
+        return self._record({
             "type": "CREATE_EVIDENCE",
             "evidence_id": evidence_id,
             "creator_id": creator_id,
             "file_hash": file_hash,
+            "file_location": file_location,
             "case_id": case_id,
-            "description": description
+            "description": description,
+            # Stored as it will read back from the journal (e.g. tuples as lists)
+            "metadata": json.loads(json.dumps(metadata)) if metadata else {}
         })
+    
+    @sealing(flush=True)
+    def create_evidence_batch(self, items: List[Dict],
+                              atomic: bool = True) -> Tuple[bool, str, List[Dict]]:
+        """
+        Create many evidence records at once (e.g. intake of a seized device).
         
-        # Mine block immediately to record
-        self.blockchain.mine_pending_transactions()
+        All items are validated in one pass; recorded items are sealed
+        together into a single block.
         
-        return True, f"Evidence created successfully. Transaction ID: {tx_id}"
+        Args:
+            items: Evidence items, each with the create_evidence arguments
+            atomic: All-or-nothing - record nothing if any item is invalid
+        
+        Returns:
+            Tuple[bool, str, List[Dict]]: (All recorded?, Message, Per-item results)
+        """
+        if not isinstance(items, list):
+            return False, "Items must be a list of evidence objects", []
+        
+        results = []
+        batch_ids = set()
+        for position, item in enumerate(items):
+            # Every field is checked here, so an atomic batch records all or nothing
+            evidence_id = item.get("evidence_id") if isinstance(item, dict) else None
+            if not isinstance(item, dict):
+                valid, msg = False, "Item must be an object"
+            else:
+                missing = [f for f in self.CREATE_FIELDS if f not in item]
+                if missing:
+                    valid, msg = False, f"Missing required fields: {missing}"
+                else:
+                    valid, msg = self._validate_creation_fields(item)
+            if valid:
+                if evidence_id in batch_ids:
+                    valid, msg = False, f"Evidence with ID '{evidence_id}' appears twice in batch"
+                else:
+                    valid, msg = self._validate_creation(evidence_id, item["creator_id"])
+                batch_ids.add(evidence_id)
+            results.append({
+                "index": position,
+                "evidence_id": evidence_id,
+                "success": valid,
+                "message": msg,
+                "transaction_id": None
+            })
+        
+        failed = sum(1 for r in results if not r["success"])
+        if atomic and failed:
+            for result in results:
+                if result["success"]:
+                    result.update(success=False, message="Not recorded - batch rejected")
+            return False, f"Batch rejected: {failed} of {len(items)} items invalid", results
+        
+        with self.blockchain.atomic():
+            for item, result in zip(items, results):
+                if not result["success"]:
+                    continue
+                tx_id = self._record_creation(
+                    item["evidence_id"], item["description"], item["creator_id"],
+                    item["file_hash"], item["file_location"], item["case_id"],
+                    item.get("metadata")
+                )
+                result.update(message=f"Evidence created successfully. Transaction ID: {tx_id}",
+                              transaction_id=tx_id)
+        
+        recorded = len(items) - failed
+        return failed == 0, f"Recorded {recorded} of {len(items)} evidence items", results
     
     # ============== 2. EVIDENCE TRANSFER ==============
     
+    @sealing()
     def transfer_evidence(self, evidence_id: str, from_owner_id: str,
                          to_owner_id: str, reason: str) -> Tuple[bool, str]:
         """
@@ -154,12 +576,31 @@ class ForensicContract:
         Returns:
             Tuple[bool, str]: (Success?, Message)
         """
+        valid, msg = self._validate_fields({"evidence_id": evidence_id, "from_owner_id": from_owner_id,
+                                            "to_owner_id": to_owner_id, "reason": reason})
+        if valid:
+            valid, msg = self._validate_transfer(evidence_id, from_owner_id)
+        if not valid:
+            return False, msg
+        
+        # Check if recipient exists
+        if to_owner_id not in self.participant_registry:
+            return False, f"Recipient with ID '{to_owner_id}' not found"
+        
+        tx_id = self._record_transfer(evidence_id, from_owner_id, to_owner_id, reason)
+        
+        from_name = self.participant_registry[from_owner_id].name
+        to_name = self.participant_registry[to_owner_id].name
+        
+        return True, f"Transfer successful from '{from_name}' to '{to_name}'. Transaction ID: {tx_id}"
+    
+    def _validate_transfer(self, evidence_id: str, from_owner_id: str) -> Tuple[bool, str]:
+        """Check that evidence can be transferred away from the given owner."""
         # Check if evidence exists
-        if evidence_id not in self.evidence_registry:
+        evidence = self.evidence_registry.get(evidence_id)
+        if evidence is None:
             return False, f"Evidence with ID '{evidence_id}' not found"
         
-        evidence = self.evidence_registry[evidence_id]
-        
         # Check if evidence is still active
         if not evidence.is_active:
             return False, "Evidence has been deleted/deactivated"
@@ -168,41 +609,111 @@ class ForensicContract:
         if evidence.current_owner_id != from_owner_id:
             return False, f"User '{from_owner_id}' is not the current owner"
         
-        # Check if recipient exists
-        if to_owner_id not in self.participant_registry:
-            return False, f"Recipient with ID '{to_owner_id}' not found"
-        
-        # Record transfer history
-        transfer_record = TransferRecord(
-            from_owner=from_owner_id,
-            to_owner=to_owner_id,
-            timestamp=datetime.now().isoformat(),
-            reason=reason
-        )
-        evidence.transfer_history.append(transfer_record)
-        
-        # Update new owner
-        evidence.current_owner_id = to_owner_id
-        
-        # Record transaction on blockchain
-        tx_id = self.blockchain.add_transaction({
+        return True, "Valid"
+    
+    def _record_transfer(self, evidence_id: str, from_owner_id: str,
+                         to_owner_id: str, reason: str) -> str:
+        """Record a transfer transaction on blockchain (updates owner and transfer history)."""
+        return self._record({
             "type": "TRANSFER_EVIDENCE",
             "evidence_id": evidence_id,
             "from_owner": from_owner_id,
             "to_owner": to_owner_id,
             "reason": reason
         })
+    
+    @sealing(flush=True)
+    def transfer_evidence_batch(self, from_owner_id: str, to_owner_id: str, reason: str,
+                                case_id: str = None, evidence_ids: List[str] = None,
+                                atomic: bool = True) -> Tuple[bool, str, List[Dict]]:
+        """
+        Transfer many evidence items from one owner to another (e.g. case hand-off).
         
-        # Mine block
-        self.blockchain.mine_pending_transactions()
+        Either transfers all active evidence of `case_id` currently owned by
+        `from_owner_id`, or an explicit list of `evidence_ids`. Participants
+        are checked once for the whole batch and all transfers are sealed
+        together into a single block.
+        
+        Args:
+            from_owner_id: Current owner ID
+            to_owner_id: Recipient ID
+            reason: Transfer reason
+            case_id: Transfer all of this case's active evidence held by from_owner_id
+            evidence_ids: Explicit list of evidence IDs (instead of case_id)
+            atomic: All-or-nothing - transfer nothing if any item is invalid
+        
+        Returns:
+            Tuple[bool, str, List[Dict]]: (All transferred?, Message, Per-item results)
+        """
+        if (case_id is None) == (evidence_ids is None):
+            return False, "Provide either case_id or evidence_ids", []
+        text = {"from_owner_id": from_owner_id, "to_owner_id": to_owner_id, "reason": reason}
+        if case_id is not None:
+            text["case_id"] = case_id
+        valid, msg = self._validate_fields(text)
+        if not valid:
+            return False, msg, []
+        if evidence_ids is not None and not isinstance(evidence_ids, list):
+            return False, "evidence_ids must be a list of evidence IDs", []
+        
+        # Check the participant pair once
+        if from_owner_id not in self.participant_registry:
+            return False, f"User '{from_owner_id}' not found", []
+        if to_owner_id not in self.participant_registry:
+            return False, f"Recipient with ID '{to_owner_id}' not found", []
+        
+        if case_id is not None:
+            # Intersect the case and owner indexes, walking the smaller one
+            in_case = self._active_by_case.get(case_id, {})
+            owned = self._active_by_owner.get(from_owner_id, {})
+            smaller, larger = (in_case, owned) if len(in_case) <= len(owned) else (owned, in_case)
+            evidence_ids = [evidence_id for evidence_id in smaller if evidence_id in larger]
+            if not evidence_ids:
+                return False, f"No active evidence of case '{case_id}' held by '{from_owner_id}'", []
+        
+        results = []
+        batch_ids = set()
+        for evidence_id in evidence_ids:
+            if not isinstance(evidence_id, str):
+                valid, msg = False, "Evidence ID must be a string"
+            elif evidence_id in batch_ids:
+                valid, msg = False, f"Evidence with ID '{evidence_id}' appears twice in batch"
+            else:
+                valid, msg = self._validate_transfer(evidence_id, from_owner_id)
+                batch_ids.add(evidence_id)
+            results.append({
+                "evidence_id": evidence_id,
+                "success": valid,
+                "message": msg,
+                "transaction_id": None
+            })
+        
+        failed = sum(1 for r in results if not r["success"])
+        if atomic and failed:
+            for result in results:
+                if result["success"]:
+                    result.update(success=False, message="Not transferred - batch rejected")
+            return False, f"Batch rejected: {failed} of {len(results)} items invalid", results
+        
+        with self.blockchain.atomic():
+            for result in results:
+                if not result["success"]:
+                    continue
+                tx_id = self._record_transfer(result["evidence_id"], from_owner_id,
+                                              to_owner_id, reason)
+                result.update(message=f"Transfer successful. Transaction ID: {tx_id}",
+                              transaction_id=tx_id)
         
         from_name = self.participant_registry[from_owner_id].name
         to_name = self.participant_registry[to_owner_id].name
-        
-        return True, f"Transfer successful from '{from_name}' to '{to_name}'. Transaction ID: {tx_id}"
+        transferred = len(results) - failed
+        return (failed == 0,
+                f"Transferred {transferred} of {len(results)} items from '{from_name}' to '{to_name}'",
+                results)
     
     # ============== 3. EVIDENCE DELETION ==============
     
+    @sealing()
     def delete_evidence(self, evidence_id: str, requester_id: str, 
                        reason: str) -> Tuple[bool, str]:
         """
@@ -222,6 +733,11 @@ class ForensicContract:
         Returns:
             Tuple[bool, str]: (Success?, Message)
         """
+        valid, msg = self._validate_fields({"evidence_id": evidence_id, "requester_id": requester_id,
+                                            "reason": reason})
+        if not valid:
+            return False, msg
+        
         # Check if evidence exists
         if evidence_id not in self.evidence_registry:
             return False, f"Evidence with ID '{evidence_id}' not found"
@@ -246,31 +762,57 @@ class ForensicContract:
         if not (is_creator or is_admin):
             return False, "Permission denied. Only evidence creator or admin can delete evidence"
         
-        # If not creator (i.e., admin), only allow soft delete
-        if not is_creator and is_admin:
-            # Admin can only soft delete
-            evidence.is_active = False
-        elif is_creator:
-            # Creator can fully delete (soft delete - history preserved on blockchain)
-            evidence.is_active = False
-        else:
-            return False, "Permission denied"
-        
-        # Record transaction on blockchain
-        tx_id = self.blockchain.add_transaction({
+        # Creator and admin both soft delete - history preserved on blockchain
+        tx_id = self._record({
             "type": "DELETE_EVIDENCE",
             "evidence_id": evidence_id,
             "deleted_by": requester_id,
             "reason": reason
         })
         
-        # Mine block
-        self.blockchain.mine_pending_transactions()
-        
         return True, f"Evidence deactivated. History is still preserved on blockchain. Transaction ID: {tx_id}"
     
+    # ============== GROUP COMMIT ==============
+    
+    @sealing(flush=True)
+    def commit_group(self, operations: List[Tuple[str, Dict]]) -> List[Tuple[bool, str, Optional[str]]]:
+        """
+        Run several custody operations in order and seal them as one block.
+        
+        Each operation is validated against the registries as updated by the
+        operations before it, exactly as if it had been called on its own.
+        
+        Args:
+            operations: (operation name from GROUP_OPERATIONS, keyword arguments) pairs
+        
+        Returns:
+            List[Tuple[bool, str, Optional[str]]]: (Success?, Message, Transaction ID)
+                                                   per operation
+        """
+        results = []
+        with self.blockchain.atomic():
+            for operation, kwargs in operations:
+                if operation not in self.GROUP_OPERATIONS:
+                    results.append((False, f"Unknown operation '{operation}'", None))
+                    continue
+                method = getattr(self, operation)
+                try:
+                    inspect.signature(method).bind(**kwargs)
+                except TypeError as e:
+                    results.append((False, f"Invalid arguments for {operation}: {e}", None))
+                    continue
+                
+                pending_before = len(self.blockchain.pending_transactions)
+                success, msg = method(**kwargs)
+                tx_id = None
+                if success and len(self.blockchain.pending_transactions) > pending_before:
+                    tx_id = self.blockchain.pending_transactions[-1]["transaction_id"]
+                results.append((success, msg, tx_id))
+        return results
+    
     # ============== 4. EVIDENCE DISPLAY ==============
     
+    @read_locked
     def get_evidence(self, evidence_id: str) -> Optional[Dict]:
         """Get detailed information of evidence."""
         evidence = self.evidence_registry.get(evidence_id)
@@ -278,10 +820,17 @@ class ForensicContract:
             return None
         return evidence.to_dict()
     
+    @read_locked
     def get_evidence_history(self, evidence_id: str) -> List[Dict]:
         """Get complete transaction history of evidence from blockchain."""
         return self.blockchain.get_transaction_history(evidence_id)
     
+    @read_locked
+    def get_evidence_proofs(self, evidence_id: str) -> List[Dict]:
+        """Get Merkle inclusion proofs for the evidence's sealed transactions."""
+        return self.blockchain.get_inclusion_proofs(evidence_id)
+    
+    @read_locked
     def list_all_evidence(self, active_only: bool = True) -> List[Dict]:
         """List all evidence in the system."""
         result = []
@@ -291,22 +840,74 @@ class ForensicContract:
             result.append(evidence.to_dict())
         return result
     
-    def get_evidence_by_case(self, case_id: str) -> List[Dict]:
+    def iter_evidence(self, active_only: bool = True) -> Iterator[Evidence]:
+        """
+        Yield evidence one at a time in creation order.
+        
+        Takes no lock, so a long-running export does not hold up writes;
+        evidence created meanwhile is picked up at the end.
+        """
+        position = 0
+        while position < len(self._evidence_order):
+            evidence = self.evidence_registry[self._evidence_order[position]]
+            position += 1
+            if active_only and not evidence.is_active:
+                continue
+            yield evidence
+    
+    @read_locked
+    def list_evidence_page(self, limit: int = 100, after: str = None,
+                           active_only: bool = True) -> Tuple[List[Dict], Optional[str]]:
+        """
+        List evidence in creation order, one page at a time.
+        
+        Args:
+            limit: Maximum number of items to return
+            after: Cursor - evidence ID of the last item of the previous page
+            active_only: Skip deactivated evidence
+        
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (Items, cursor of the next page or None)
+        
+        Raises:
+            ValueError: If `after` is not the ID of any evidence
+        """
+        if after is None:
+            start = 0
+        elif after in self._evidence_position:
+            start = self._evidence_position[after] + 1
+        else:
+            # Restarting from the first page would repeat items to the client
+            raise ValueError(f"Unknown cursor '{after}'")
+        items = []
+        for position in range(start, len(self._evidence_order)):
+            evidence = self.evidence_registry[self._evidence_order[position]]
+            if active_only and not evidence.is_active:
+                continue
+            if len(items) == limit:
+                return items, items[-1]["evidence_id"]
+            items.append(evidence.to_dict())
+        return items, None
+    
+    @read_locked
+    def get_evidence_by_case(self, case_id: str, active_only: bool = True) -> List[Dict]:
         """Get all evidence of a case."""
-        return [
-            e.to_dict() for e in self.evidence_registry.values()
-            if e.case_id == case_id and e.is_active
-        ]
+        ids = list(self._active_by_case.get(case_id, {}))
+        if not active_only:
+            ids += list(self._inactive_by_case.get(case_id, {}))
+        return [self.evidence_registry[evidence_id].to_dict() for evidence_id in ids]
     
-    def get_evidence_by_owner(self, owner_id: str) -> List[Dict]:
+    @read_locked
+    def get_evidence_by_owner(self, owner_id: str, active_only: bool = True) -> List[Dict]:
         """Get all evidence owned by a participant."""
-        return [
-            e.to_dict() for e in self.evidence_registry.values()
-            if e.current_owner_id == owner_id and e.is_active
-        ]
+        ids = list(self._active_by_owner.get(owner_id, {}))
+        if not active_only:
+            ids += list(self._inactive_by_owner.get(owner_id, {}))
+        return [self.evidence_registry[evidence_id].to_dict() for evidence_id in ids]
     
     # ============== INTEGRITY VERIFICATION ==============
     
+    @read_locked
     def verify_evidence_integrity(self, evidence_id: str, current_file_hash: str) -> Tuple[bool, str]:
         """
         Verify evidence integrity by comparing hash.
@@ -327,19 +928,101 @@ class ForensicContract:
         else:
             return False, "✗ WARNING: File has been modified from original!"
     
-    def verify_blockchain(self) -> Tuple[bool, str]:
-        """Verify blockchain integrity."""
-        if self.blockchain.is_chain_valid():
+    @read_locked
+    def verify_blockchain(self, full_audit: bool = False) -> Tuple[bool, str]:
+        """
+        Verify blockchain integrity.
+        
+        Args:
+            full_audit: Re-hash the whole chain from genesis (court-facing
+                        verification) instead of only blocks above the checkpoint
+        
+        Returns:
+            Tuple[bool, str]: (Valid?, Message)
+        """
+        if self.blockchain.is_chain_valid(full=full_audit):
             return True, "✓ Blockchain valid - No signs of tampering"
         else:
             return False, "✗ WARNING: Blockchain has been modified!"
     
+    def audit_blockchain(self, workers: int = None,
+                         progress: Callable[[int, int], None] = None) -> AuditReport:
+        """
+        Full audit that re-hashes the whole chain across CPU cores.
+        
+        Runs without holding the contract lock; blocks sealed while the
+        audit runs are left for the next audit.
+        
+        Args:
+            workers: Worker processes (default: CPU count)
+            progress: Called as progress(blocks_done, blocks_total)
+        
+        Returns:
+            AuditReport: Validity, first bad height and throughput
+        """
+        data_dir = str(self.store.data_dir) if self.store is not None else None
+        report = audit_chain(self.blockchain.chain, data_dir=data_dir,
+                             workers=workers, progress=progress)
+        
+        # Move the incremental verification checkpoint with the audit result
+        if report.is_valid:
+            self.blockchain.move_checkpoint(report.blocks_checked, valid=True)
+        else:
+            self.blockchain.move_checkpoint(report.first_bad_height - 1, valid=False)
+        return report
+    
+    @write_locked
+    def start_audit(self, workers: int = None) -> Tuple[bool, str]:
+        """Start a full parallel audit in the background (see get_audit_status)."""
+        if self._audit_thread is not None and self._audit_thread.is_alive():
+            return False, "An audit is already running"
+        
+        self.audit_status = {
+            "state": "running",
+            "started_at": datetime.now().isoformat(),
+            "blocks_done": 0,
+            "blocks_total": len(self.blockchain.chain) - 1,
+            "report": None
+        }
+        
+        def progress(done, total):
+            self.audit_status["blocks_done"] = done
+        
+        def run():
+            try:
+                report = self.audit_blockchain(workers=workers, progress=progress)
+                self.audit_status.update(state="finished", report=report.to_dict())
+            except Exception as e:
+                self.audit_status.update(state="failed", error=str(e))
+        
+        self._audit_thread = threading.Thread(target=run, name="chain-audit", daemon=True)
+        self._audit_thread.start()
+        return True, "Audit started"
+    
+    def get_audit_status(self) -> Dict:
+        """Get progress and result of the latest background audit."""
+        return dict(self.audit_status)
+    
+    def flush(self) -> Tuple[bool, str]:
+        """Seal all pending transactions into a block now."""
+        block = self._seal_pending()
+        if block is None:
+            return True, "No pending transactions to seal"
+        return True, f"Sealed {len(block.transactions)} transactions into block #{block.index}"
+    
+    @read_locked
     def get_blockchain_info(self) -> Dict:
         """Get blockchain overview information."""
         return {
             "total_blocks": len(self.blockchain.chain),
             "is_valid": self.blockchain.is_chain_valid(),
+            "verified_height": self.blockchain.verified_height,
             "pending_transactions": len(self.blockchain.pending_transactions),
             "difficulty": self.blockchain.difficulty,
+            "mining": self.blockchain.get_mining_stats(),
+            "seal_policy": {
+                "max_transactions": self.blockchain.seal_policy.max_transactions,
+                "max_latency": self.blockchain.seal_policy.max_latency
+            },
             "latest_block_hash": self.blockchain.get_latest_block().hash
         }
@@ -0,0 +1,179 @@
+"""
+Tree Hash Module - Forensic Chain
+Chunked Merkle digest of evidence files, hashed in parallel.
+
+A flat SHA-256 is one sequential pass over the file on one core. The tree
+digest splits the file into fixed-size chunks, hashes the chunks on a
+thread pool (hashlib releases the GIL while hashing), and combines the
+chunk hashes into a Merkle root with merkle.merkle_root. The per-chunk
+hashes localize tampering to a chunk, and any chunk can be checked on its
+own against the recorded digest.
+
+Files received as a stream are digested while they are written
+(TreeBuilder), so storing them never reads them back.
+
+Files are read with readinto() into buffers that are reused for every
+read, so hashing runs in constant memory without allocating per chunk.
+(Memory maps are avoided here: a file truncated while it is mapped and
+hashed would crash the process.)
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from .merkle import merkle_root
+
+# Default chunk size of the tree digest
+TREE_CHUNK_SIZE = 4 * 1024 * 1024
+
+TREE_ALGORITHM = "sha256-merkle"
+
+
+def chunk_leaf(data: bytes) -> bytes:
+    """Leaf hash of one chunk (same as merkle.leaf_hash, without copying the chunk)."""
+    leaf = hashlib.sha256(b'\x00')
+    leaf.update(data)
+    return leaf.digest()
+
+
+def read_blocks(file: BinaryIO, block_size: int = 1024 * 1024) -> Iterator[memoryview]:
+    """
+    Read a file through one reused buffer.
+    
+    Yields:
+        memoryview: The next block; only valid until the next one is read
+    """
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    while True:
+        size = file.readinto(buffer)
+        if not size:
+            return
+        yield view[:size]
+
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Calculate the flat SHA-256 of a file (hex)."""
+    sha256 = hashlib.sha256()
+    # Unbuffered: readinto() fills our buffer straight from the OS
+    with open(file_path, 'rb', buffering=0) as f:
+        for block in read_blocks(f, block_size):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def chunk_count(file_size: int, chunk_size: int = TREE_CHUNK_SIZE) -> int:
+    """Number of chunks in a file of `file_size` bytes."""
+    return -(-file_size // chunk_size)
+
+
+def hash_chunks(file_path: str, chunk_size: int = TREE_CHUNK_SIZE,
+                indexes: Optional[Iterable[int]] = None, workers: int = None) -> List[bytes]:
+    """
+    Hash chunks of a file in parallel.
+    
+    Args:
+        file_path: File to hash
+        chunk_size: Chunk size in bytes
+        indexes: Chunks to hash (default: all of them)
+        workers: Hashing threads (default: one per CPU)
+    
+    Returns:
+        List[bytes]: Leaf hash of each requested chunk, in request order
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    buffers = threading.local()    # One reused chunk buffer per hashing thread
+    
+    def hash_chunk(index: int) -> bytes:
+        if not hasattr(os, 'preadv'):
+            return chunk_leaf(os.pread(fd, chunk_size, index * chunk_size))
+        buffer = getattr(buffers, "buffer", None)
+        if buffer is None:
+            buffer = buffers.buffer = bytearray(chunk_size)
+        size = os.preadv(fd, [buffer], index * chunk_size)
+        with memoryview(buffer)[:size] as chunk:
+            return chunk_leaf(chunk)
+    
+    try:
+        if indexes is None:
+            indexes = range(chunk_count(os.fstat(fd).st_size, chunk_size))
+        indexes = list(indexes)
+        if len(indexes) <= 1:
+            return [hash_chunk(i) for i in indexes]
+        
+        # Reads take an explicit offset, so the threads can share one descriptor
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            return list(pool.map(hash_chunk, indexes))
+    finally:
+        os.close(fd)
+
+
+def tree_digest(file_path: str, chunk_size: int = TREE_CHUNK_SIZE, workers: int = None) -> Dict:
+    """
+    Calculate the chunked Merkle digest of a file.
+    
+    Args:
+        file_path: File to hash
+        chunk_size: Chunk size in bytes
+        workers: Hashing threads (default: one per CPU)
+    
+    Returns:
+        Dict: algorithm, chunk_size, file_size, root and the hex hash of every chunk
+    """
+    leaves = hash_chunks(file_path, chunk_size, workers=workers)
+    return _digest(leaves, chunk_size, os.path.getsize(file_path))
+
+
+def _digest(leaves: List[bytes], chunk_size: int, file_size: int) -> Dict:
+    return {
+        "algorithm": TREE_ALGORITHM,
+        "chunk_size": chunk_size,
+        "file_size": file_size,
+        "root": merkle_root(leaves),
+        "chunks": [leaf.hex() for leaf in leaves]
+    }
+
+
+class TreeBuilder:
+    """Chunked Merkle digest of a file, built from its data as it is written."""
+    
+    def __init__(self, chunk_size: int = TREE_CHUNK_SIZE):
+        """
+        Initialize builder.
+        
+        Args:
+            chunk_size: Chunk size in bytes
+        """
+        self.chunk_size = chunk_size
+        self.file_size = 0
+        self.leaves: List[bytes] = []               # Leaf hashes of the complete chunks
+        self._chunk = hashlib.sha256(b'\x00')       # Leaf hash of the chunk being filled
+    
+    def update(self, data: bytes):
+        """Append data to the file."""
+        with memoryview(data) as view:
+            while view:
+                take = min(len(view), self.chunk_size - self.file_size % self.chunk_size)
+                self._chunk.update(view[:take])
+                self.file_size += take
+                view = view[take:]
+                if not self.file_size % self.chunk_size:
+                    self.leaves.append(self._chunk.digest())
+                    self._chunk = hashlib.sha256(b'\x00')
+    
+    def copy(self) -> 'TreeBuilder':
+        """Independent copy of the builder (to roll back to)."""
+        builder = TreeBuilder(self.chunk_size)
+        builder.file_size = self.file_size
+        builder.leaves = list(self.leaves)
+        builder._chunk = self._chunk.copy()
+        return builder
+    
+    def digest(self) -> Dict:
+        """Digest of the data so far (same as tree_digest of the file)."""
+        leaves = self.leaves
+        if self.file_size % self.chunk_size:
+            leaves = leaves + [self._chunk.digest()]
+        return _digest(leaves, self.chunk_size, self.file_size)
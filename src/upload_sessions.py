@@ -0,0 +1,393 @@
+"""
+Upload Sessions Module - Forensic Chain
+Resumable chunked uploads of large evidence files.
+
+A client creates a session, sends the file as chunks at increasing
+offsets, asks for the session status after a dropped connection to learn
+where to resume, and finalizes the session to store the file. Chunks are
+appended to a partial file in the store's temp directory while the file's
+SHA-256 is built incrementally, so finalizing never reads the file back.
+
+Each chunk may carry its own SHA-256; a chunk that does not match is
+rolled back and must be sent again. Sessions are recorded next to their
+partial file, so they survive a server restart and can be continued by
+any process sharing the store (the partial file is then re-hashed once).
+Sessions that receive nothing for a day (see UploadSessions.ttl) are
+deleted with their partial file.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from .evidence_store import EvidenceStore, EvidenceWriter
+
+
+class ChunkRejected(Exception):
+    """A chunk that cannot be appended to its upload (it is rolled back)."""
+
+
+class ChunkReceiver:
+    """
+    One chunk being appended to an upload (see UploadSession.begin_chunk).
+    
+    The caller feeds the chunk with write() as it arrives and ends it with
+    commit() or abort(); the upload accepts no other chunk meanwhile.
+    """
+    
+    def __init__(self, session: 'UploadSession', chunk_sha256: Optional[str] = None):
+        self.session = session
+        self.chunk_sha256 = chunk_sha256
+        self.hash = hashlib.sha256()
+        self._mark = session.writer.mark()
+        self._open = True
+    
+    @property
+    def size(self) -> int:
+        """Bytes of the chunk received so far."""
+        return self.session.offset - self._mark[0]
+    
+    def write(self, data: bytes):
+        """
+        Append part of the chunk.
+        
+        Raises:
+            ChunkRejected: If the data would exceed the announced file size
+                           (the chunk is rolled back before anything is written)
+        """
+        total_size = self.session.total_size
+        if total_size is not None and self.session.offset + len(data) > total_size:
+            self.abort()
+            raise ChunkRejected(f"Chunk exceeds the announced size of {total_size} bytes")
+        self.hash.update(data)
+        self.session.writer.write(data)
+    
+    def commit(self) -> str:
+        """
+        Keep the chunk, after checking its hash.
+        
+        Returns:
+            str: Success message
+        
+        Raises:
+            ChunkRejected: If the chunk does not match its SHA-256
+        """
+        if self.chunk_sha256 and self.hash.hexdigest() != self.chunk_sha256.lower():
+            self.abort()
+            raise ChunkRejected("Chunk hash mismatch - chunk discarded")
+        try:
+            self.session.writer.flush()
+        except BaseException:
+            self.abort()
+            raise
+        self._open = False
+        self.session.lock.release()
+        return f"Received {self.size} bytes"
+    
+    def abort(self):
+        """Drop the chunk (e.g. the connection dropped mid-chunk); safe to call twice."""
+        if self._open:
+            self._open = False
+            try:
+                self.session.writer.rollback(self._mark)
+            finally:
+                self.session.lock.release()
+
+
+class UploadSession:
+    """One resumable upload: a partial file and its running SHA-256."""
+    
+    def __init__(self, store: EvidenceStore, upload_id: str, evidence_id: str, case_id: str,
+                 filename: str = "", total_size: Optional[int] = None, created_at: str = None):
+        """
+        Initialize upload session (resumes its partial file if there is one).
+        
+        Args:
+            store: Store the file is uploaded into
+            upload_id: Session identifier
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename
+            total_size: Announced file size in bytes (None = unknown)
+            created_at: Creation time (ISO format)
+        """
+        self.upload_id = upload_id
+        self.evidence_id = evidence_id
+        self.case_id = case_id
+        self.filename = filename
+        self.total_size = total_size
+        self.created_at = created_at or datetime.now().isoformat()
+        self.writer = EvidenceWriter(store, evidence_id, case_id, filename,
+                                     temp_path=store.base_path / "temp" / f"upload-{upload_id}.part")
+        self.lock = threading.Lock()    # One chunk at a time
+    
+    @property
+    def offset(self) -> int:
+        """Bytes received so far (where the next chunk starts)."""
+        return self.writer.bytes_written
+    
+    def begin_chunk(self, offset: int, chunk_sha256: Optional[str] = None,
+                    size: Optional[int] = None) -> ChunkReceiver:
+        """
+        Start receiving one chunk of the file.
+        
+        Args:
+            offset: Position of the chunk in the file; must be the current offset
+            chunk_sha256: Expected SHA-256 of the chunk (optional)
+            size: Chunk size, if known up front (e.g. from Content-Length)
+        
+        Returns:
+            ChunkReceiver: Receiver to feed the chunk to
+        
+        Raises:
+            ChunkRejected: If the chunk cannot be appended here
+        """
+        if not self.lock.acquire(blocking=False):
+            raise ChunkRejected("Another chunk of this upload is being received")
+        try:
+            if offset != self.offset:
+                raise ChunkRejected(f"Chunk offset {offset} does not match upload offset {self.offset}")
+            if self.total_size is not None and size is not None and offset + size > self.total_size:
+                raise ChunkRejected(f"Chunk exceeds the announced size of {self.total_size} bytes")
+            return ChunkReceiver(self, chunk_sha256)
+        except BaseException:
+            self.lock.release()
+            raise
+    
+    def write_chunk(self, offset: int, chunks: Iterable[bytes],
+                    chunk_sha256: Optional[str] = None, size: Optional[int] = None) -> Tuple[bool, str]:
+        """
+        Append one chunk of the file.
+        
+        Args:
+            offset: Position of the chunk in the file; must be the current offset
+            chunks: Chunk data, in pieces as it arrives
+            chunk_sha256: Expected SHA-256 of the chunk (optional)
+            size: Chunk size, if known up front
+        
+        Returns:
+            Tuple[bool, str]: (Success?, Message)
+        """
+        try:
+            receiver = self.begin_chunk(offset, chunk_sha256, size)
+            try:
+                for data in chunks:
+                    receiver.write(data)
+            except BaseException:
+                # Connection dropped mid-chunk: resume from the last whole chunk
+                receiver.abort()
+                raise
+            return True, receiver.commit()
+        except ChunkRejected as e:
+            return False, str(e)
+    
+    def to_dict(self) -> Dict:
+        """Session status."""
+        return {
+            "upload_id": self.upload_id,
+            "evidence_id": self.evidence_id,
+            "case_id": self.case_id,
+            "filename": self.filename,
+            "offset": self.offset,
+            "total_size": self.total_size,
+            "created_at": self.created_at
+        }
+
+
+class UploadSessions:
+    """Registry of the resumable uploads into one evidence store."""
+    
+    # Default lifetime of an upload that receives nothing (seconds)
+    DEFAULT_TTL = 24 * 60 * 60
+    
+    # Abandoned uploads are looked for at most this often (seconds)
+    EXPIRY_INTERVAL = 60
+    
+    def __init__(self, store: EvidenceStore, ttl: float = DEFAULT_TTL):
+        """
+        Initialize registry.
+        
+        Args:
+            store: Store the files are uploaded into
+            ttl: Seconds without a chunk after which an upload is deleted
+        """
+        self.store = store
+        self.ttl = ttl
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+        self._last_expiry = None
+    
+    def create(self, evidence_id: str, case_id: str, filename: str = "",
+               total_size: Optional[int] = None) -> UploadSession:
+        """
+        Start a new upload.
+        
+        Args:
+            evidence_id: Unique evidence identifier
+            case_id: Related case ID
+            filename: Original filename
+            total_size: Announced file size in bytes (None = unknown)
+        
+        Returns:
+            UploadSession: The new session
+        """
+        now = time.monotonic()
+        if self._last_expiry is None or now - self._last_expiry >= self.EXPIRY_INTERVAL:
+            self._last_expiry = now
+            self.expire()
+        
+        session = UploadSession(self.store, uuid.uuid4().hex, evidence_id, case_id,
+                                filename=filename, total_size=total_size)
+        with open(self._session_path(session.upload_id), 'w') as f:
+            json.dump({
+                "evidence_id": evidence_id,
+                "case_id": case_id,
+                "filename": filename,
+                "total_size": total_size,
+                "created_at": session.created_at
+            }, f, indent=2)
+        with self._lock:
+            self._sessions[session.upload_id] = session
+        return session
+    
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """
+        Find an upload, resuming it from disk if this process does not hold it.
+        
+        Args:
+            upload_id: Session identifier
+        
+        Returns:
+            Optional[UploadSession]: The session, or None if unknown
+        """
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id or ""):
+            return None
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            # Another process may have appended to the partial file since
+            if session is not None and (session.lock.locked()
+                                        or self._partial_size(session) == session.offset):
+                return session
+            
+            session_path = self._session_path(upload_id)
+            if not session_path.exists():
+                self._sessions.pop(upload_id, None)
+                return None
+            with open(session_path) as f:
+                info = json.load(f)
+            if session is not None:
+                session.writer.close()
+            session = UploadSession(self.store, upload_id, **info)
+            self._sessions[upload_id] = session
+            return session
+    
+    def finalize(self, upload_id: str, file_hash: Optional[str] = None) -> Tuple[bool, str, str]:
+        """
+        Store a completely uploaded file.
+        
+        Args:
+            upload_id: Session identifier
+            file_hash: Expected SHA-256 of the whole file (optional)
+        
+        Returns:
+            Tuple[bool, str, str]: (Success?, Storage path, File hash or error message)
+        """
+        session = self.get(upload_id)
+        if session is None:
+            return False, "", "Upload not found"
+        with session.lock:
+            if session.total_size is not None and session.offset != session.total_size:
+                return False, "", f"Upload incomplete: {session.offset} of {session.total_size} bytes"
+            if file_hash and session.writer.sha256.hexdigest() != file_hash.lower():
+                self._discard(session)
+                return False, "", "File hash mismatch - upload discarded"
+            
+            result = session.writer.finish()
+            self._forget(upload_id)
+            return result
+    
+    def abort(self, upload_id: str) -> bool:
+        """
+        Cancel an upload and delete its partial file.
+        
+        Returns:
+            bool: False if the upload was not found
+        """
+        session = self.get(upload_id)
+        if session is None:
+            return False
+        with session.lock:
+            self._discard(session)
+        return True
+    
+    def expire(self) -> int:
+        """
+        Delete uploads that received nothing for `ttl` seconds, with their partial files.
+        
+        Runs when an upload is created (at most every EXPIRY_INTERVAL
+        seconds); call it directly to clean up on a schedule.
+        
+        Returns:
+            int: Number of uploads deleted
+        """
+        deadline = time.time() - self.ttl
+        temp_dir = self.store.base_path / "temp"
+        upload_ids = {path.name[len("upload-"):].split('.')[0]
+                      for pattern in ("upload-*.json", "upload-*.part")
+                      for path in temp_dir.glob(pattern)}
+        expired = 0
+        for upload_id in upload_ids:
+            with self._lock:
+                session = self._sessions.get(upload_id)
+            # Skip uploads receiving a chunk right now
+            if session is not None and not session.lock.acquire(blocking=False):
+                continue
+            try:
+                paths = [self._session_path(upload_id), temp_dir / f"upload-{upload_id}.part"]
+                if max(self._mtime(path) for path in paths) >= deadline:
+                    continue
+                if session is not None:
+                    session.writer.close()
+                with self._lock:
+                    self._sessions.pop(upload_id, None)
+                for path in paths:
+                    if path.exists():
+                        os.remove(path)
+                expired += 1
+            finally:
+                if session is not None:
+                    session.lock.release()
+        return expired
+    
+    @staticmethod
+    def _mtime(path) -> float:
+        try:
+            return os.path.getmtime(path)
+        except FileNotFoundError:
+            return 0.0
+    
+    def _discard(self, session: UploadSession):
+        session.writer.abort()
+        self._forget(session.upload_id)
+    
+    def _forget(self, upload_id: str):
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+        session_path = self._session_path(upload_id)
+        if session_path.exists():
+            os.remove(session_path)
+    
+    def _session_path(self, upload_id: str):
+        return self.store.base_path / "temp" / f"upload-{upload_id}.json"
+    
+    @staticmethod
+    def _partial_size(session: UploadSession) -> int:
+        try:
+            return os.path.getsize(session.writer.temp_path)
+        except FileNotFoundError:
+            return -1
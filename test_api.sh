@@ -222,8 +222,8 @@ test_blockchain() {
     print_step "7.2" "Verify Blockchain Integrity"
     curl -s -X GET $BASE_URL/api/blockchain/verify | jq '.'
     
-    print_step "7.3" "Get Full Blockchain"
-    curl -s -X GET $BASE_URL/api/blockchain | jq '.data | length' | \
+    print_step "7.3" "Count Blocks"
+    curl -s -X GET $BASE_URL/api/blockchain/info | jq '.data.total_blocks' | \
         xargs -I {} echo "Total blocks in blockchain: {}"
 }
 
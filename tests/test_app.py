@@ -0,0 +1,67 @@
+"""
+WSGI API Tests - Forensic Chain
+Evidence upload route of api/app.py through the Flask test client.
+"""
+import hashlib
+import importlib
+import io
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+from src.evidence_store import EvidenceStore
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("wsgi")
+    with pytest.MonkeyPatch.context() as mp:
+        # The API runtime is built from the environment when it is imported
+        mp.chdir(workdir)
+        mp.setenv("FORENSIC_CHAIN_DIFFICULTY", "1")
+        mp.delenv("FORENSIC_CHAIN_DATA_DIR", raising=False)
+        mp.delenv("FORENSIC_CHAIN_LEDGER_SOCKET", raising=False)
+        app = importlib.import_module("api.app")
+        mp.setattr(app, "evidence_store", EvidenceStore(str(workdir / "store")))
+        yield app.app.test_client()
+
+
+def upload_url(evidence_id):
+    return f"/api/store/upload?evidence_id={evidence_id}&case_id=CASE-WSGI&filename=disk.img"
+
+
+def test_raw_upload(client):
+    data = b"raw disk image" * 1000
+    response = client.post(upload_url("EVD-WSGI-RAW"), data=data,
+                           content_type="application/octet-stream")
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.get_json()["data"]["file_hash"] == hashlib.sha256(data).hexdigest()
+
+
+def test_raw_upload_without_content_length(client):
+    data = b"chunked transfer encoding" * 100
+    # As passed on by servers that de-chunk the body (werkzeug, gunicorn)
+    response = client.post(upload_url("EVD-WSGI-CHUNKED"), input_stream=io.BytesIO(data),
+                           content_type="application/octet-stream",
+                           headers={"Transfer-Encoding": "chunked"},
+                           environ_overrides={"wsgi.input_terminated": True})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.get_json()["data"]["file_hash"] == hashlib.sha256(data).hexdigest()
+
+
+def test_empty_raw_upload_is_refused(client):
+    response = client.post(upload_url("EVD-WSGI-EMPTY"), data=b"",
+                           content_type="application/octet-stream")
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "No file provided"
+
+
+def test_multipart_upload(client):
+    data = b"multipart evidence" * 100
+    response = client.post("/api/store/upload", data={
+        "file": (io.BytesIO(data), "photo.jpg"), "evidence_id": "EVD-WSGI-FORM", "case_id": "CASE-WSGI"
+    })
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.get_json()["data"]["file_hash"] == hashlib.sha256(data).hexdigest()
@@ -0,0 +1,198 @@
+"""
+ASGI API Tests - Forensic Chain
+Routes of api/asgi.py through the Starlette test client.
+"""
+import hashlib
+import importlib
+import json
+
+import pytest
+
+pytest.importorskip("starlette.testclient")
+from starlette.testclient import TestClient
+
+from src.evidence_store import EvidenceStore
+from src.upload_sessions import UploadSessions
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("asgi")
+    with pytest.MonkeyPatch.context() as mp:
+        # The API runtime is built from the environment when it is imported
+        mp.chdir(workdir)
+        mp.setenv("FORENSIC_CHAIN_DIFFICULTY", "1")
+        mp.delenv("FORENSIC_CHAIN_DATA_DIR", raising=False)
+        mp.delenv("FORENSIC_CHAIN_LEDGER_SOCKET", raising=False)
+        asgi = importlib.import_module("api.asgi")
+        store = EvidenceStore(str(workdir / "store"))
+        mp.setattr(asgi, "evidence_store", store)
+        mp.setattr(asgi, "upload_sessions", UploadSessions(store))
+        with TestClient(asgi.app) as test_client:
+            yield test_client
+
+
+@pytest.fixture(scope="module")
+def investigator(client):
+    response = client.post("/api/participants", json={
+        "participant_id": "INV-API", "name": "Investigator", "role": "investigator",
+        "organization": "Police"
+    })
+    assert response.status_code == 200, response.text
+    return "INV-API"
+
+
+def create_evidence(client, creator_id, evidence_id, case_id="CASE-API"):
+    response = client.post("/api/evidence", json={
+        "evidence_id": evidence_id, "description": "Disk image", "creator_id": creator_id,
+        "file_hash": "ab" * 32, "file_location": "/evidence/disk.img", "case_id": case_id
+    })
+    assert response.status_code == 200, response.text
+
+
+# ============== PARTICIPANTS ==============
+
+def test_participants(client, investigator):
+    listed = client.get("/api/participants").json()
+    assert investigator in [p["participant_id"] for p in listed["data"]]
+    assert client.get(f"/api/participants/{investigator}").json()["data"]["name"] == "Investigator"
+    assert client.get("/api/participants/NOBODY").status_code == 404
+    
+    response = client.post("/api/participants", json={"participant_id": "P-2"})
+    assert response.status_code == 400
+    assert client.post("/api/participants", content=b"[1, 2]").status_code == 400
+    assert client.get("/api/health").json()["data"]["total_participants"] == len(listed["data"])
+
+
+# ============== EVIDENCE ==============
+
+def test_evidence_pages_follow_the_cursor(client, investigator):
+    ids = [f"EVD-PAGE-{i}" for i in range(5)]
+    for evidence_id in ids:
+        create_evidence(client, investigator, evidence_id, case_id="CASE-PAGE")
+    
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "after": cursor}
+        page = client.get("/api/evidence", params=params).json()
+        seen += [e["evidence_id"] for e in page["data"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [evidence_id for evidence_id in seen if evidence_id.startswith("EVD-PAGE-")] == ids
+    assert len(seen) == len(set(seen))
+    
+    response = client.get("/api/evidence", params={"after": "EVD-404"})
+    assert response.status_code == 400
+    case = client.get("/api/cases/CASE-PAGE/evidence").json()["data"]
+    assert sorted(e["evidence_id"] for e in case) == ids
+
+
+# ============== UPLOADS ==============
+
+def test_raw_upload(client):
+    data = b"raw disk image" * 1000
+    response = client.post("/api/store/upload", content=data,
+                           params={"evidence_id": "EVD-RAW", "case_id": "CASE-UP", "filename": "disk.img"})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["file_hash"] == hashlib.sha256(data).hexdigest()
+
+
+def test_raw_upload_without_content_length(client):
+    data = [b"chunked ", b"transfer ", b"encoding"]
+    # A generator body is sent with chunked transfer encoding
+    response = client.post("/api/store/upload", content=(chunk for chunk in data),
+                           params={"evidence_id": "EVD-CHUNKED", "case_id": "CASE-UP"})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["file_hash"] == hashlib.sha256(b"".join(data)).hexdigest()
+
+
+def test_empty_raw_upload_is_refused(client):
+    response = client.post("/api/store/upload", content=b"",
+                           params={"evidence_id": "EVD-EMPTY", "case_id": "CASE-UP"})
+    assert response.status_code == 400
+    assert response.json()["message"] == "No file provided"
+
+
+def test_multipart_upload(client):
+    data = b"multipart evidence" * 100
+    response = client.post("/api/store/upload", files={"file": ("photo.jpg", data)},
+                           data={"evidence_id": "EVD-FORM", "case_id": "CASE-UP"})
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["file_hash"] == hashlib.sha256(data).hexdigest()
+    
+    response = client.post("/api/store/upload", files={"other": ("photo.jpg", data)},
+                           data={"evidence_id": "EVD-FORM-2", "case_id": "CASE-UP"})
+    assert response.status_code == 400
+
+
+def test_chunked_upload_session(client):
+    parts = [b"a" * 1000, b"b" * 1000, b"c" * 500]
+    whole = b"".join(parts)
+    response = client.post("/api/store/uploads", json={
+        "evidence_id": "EVD-SESSION", "case_id": "CASE-UP", "filename": "big.img",
+        "total_size": len(whole)
+    })
+    assert response.status_code == 201, response.text
+    url = f"/api/store/uploads/{response.json()['data']['upload_id']}"
+    
+    offset = 0
+    for part in parts:
+        bad = client.put(url, params={"offset": offset}, content=part,
+                         headers={"X-Chunk-SHA256": "00" * 32})
+        assert bad.status_code == 400
+        response = client.put(url, params={"offset": offset}, content=part,
+                              headers={"X-Chunk-SHA256": hashlib.sha256(part).hexdigest()})
+        assert response.status_code == 200, response.text
+        offset += len(part)
+    
+    assert client.put(url, params={"offset": 0}, content=b"again").status_code == 409
+    assert client.put(url, params={"offset": offset}, content=b"extra").status_code == 400
+    assert client.get(url).json()["data"]["offset"] == len(whole)
+    
+    response = client.post(f"{url}/finalize", json={"file_hash": hashlib.sha256(whole).hexdigest()})
+    assert response.status_code == 200, response.text
+    assert client.get(url).status_code == 404
+
+
+# ============== VERIFICATION ==============
+
+def test_verify_stored_file(client):
+    data = b"x" * 5000
+    stored = client.post("/api/store/upload", content=data,
+                         params={"evidence_id": "EVD-VERIFY", "case_id": "CASE-UP"}).json()["data"]
+    url = "/api/store/verify/EVD-VERIFY"
+    
+    body = {"storage_path": stored["storage_path"], "expected_hash": stored["file_hash"]}
+    assert client.post(url, json=body).json()["success"]
+    assert not client.post(url, json={**body, "expected_hash": "00" * 32}).json()["success"]
+    for check in ({"mode": "full"}, {"mode": "ranges", "ranges": [[0, 100]]},
+                  {"mode": "sample", "sample_size": 3}):
+        response = client.post(url, json={**body, **check})
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["mismatched_chunks"] == []
+    assert client.post(url, json={**body, "mode": "ranges", "ranges": "all"}).status_code == 400
+
+
+def test_verify_evidence_hash(client, investigator):
+    create_evidence(client, investigator, "EVD-HASH")
+    url = "/api/evidence/EVD-HASH/verify"
+    assert client.post(url, json={"file_hash": "ab" * 32}).json()["success"]
+    assert not client.post(url, json={"file_hash": "cd" * 32}).json()["success"]
+    assert client.post(url, json={}).status_code == 400
+
+
+# ============== EXPORT ==============
+
+def test_export_ledger(client, investigator):
+    create_evidence(client, investigator, "EVD-EXPORT")
+    records = [json.loads(line) for line in client.get("/api/export/ledger").text.splitlines()]
+    header = records[0]["data"]
+    blocks = [r["data"] for r in records if r["kind"] == "block"]
+    assert records[0]["kind"] == "export"
+    assert [b["index"] for b in blocks] == list(range(header["chain_height"]))
+    assert "EVD-EXPORT" in [r["data"]["evidence_id"] for r in records if r["kind"] == "evidence"]
+    assert investigator in [r["data"]["participant_id"] for r in records if r["kind"] == "participant"]
+    
+    resumed = client.get("/api/export/blockchain", params={"from_height": 2}).text.splitlines()
+    assert [json.loads(line)["data"] for line in resumed] == blocks[2:]
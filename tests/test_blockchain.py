@@ -0,0 +1,224 @@
+"""
+Blockchain Tests - Forensic Chain
+Sealing, history index, verification checkpoint and mining of Blockchain.
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from src.blockchain import (Block, Blockchain, ENCODING_BINARY, ENCODING_JSON, ENCODING_MERKLE,
+                            SealPolicy, encode_nonce)
+from src.audit import audit_chain
+from src.mining import ParallelMiner
+
+ENCODINGS = [ENCODING_JSON, ENCODING_BINARY, ENCODING_MERKLE]
+
+
+def record(chain, evidence_id, step, tx_type="TRANSFER_EVIDENCE"):
+    return chain.add_transaction({"type": tx_type, "evidence_id": evidence_id, "step": step})
+
+
+def scan_history(chain, evidence_id):
+    """History the slow way: every transaction of every block."""
+    return [(block.index, tx["step"]) for block in chain.chain
+            for tx in block.transactions if tx.get("evidence_id") == evidence_id]
+
+
+# ============== HISTORY INDEX ==============
+
+def test_history_index_matches_group_sealed_blocks():
+    chain = Blockchain(difficulty=1, seal_policy=SealPolicy(max_transactions=3))
+    for step in range(10):
+        record(chain, f"EVD-{step % 4}", step)
+        chain.seal_if_due()
+    
+    assert [len(block.transactions) for block in chain.chain[1:]] == [3, 3, 3]
+    assert len(chain.pending_transactions) == 1
+    for evidence_id in ("EVD-0", "EVD-1", "EVD-2", "EVD-3"):
+        history = chain.get_transaction_history(evidence_id)
+        sealed = [(h["block_index"], h["step"]) for h in history if h["block_index"] is not None]
+        assert sealed == scan_history(chain, evidence_id)
+        
+        for entry in chain.get_inclusion_proofs(evidence_id):
+            assert chain.chain[entry["block_index"]].transactions[entry["tx_offset"]] == entry["transaction"]
+            assert Blockchain.verify_inclusion_proof(entry["transaction"], entry["proof"],
+                                                     entry["merkle_root"])
+    
+    # The pending transaction (step 9) is listed last, unsealed
+    assert chain.get_transaction_history("EVD-1")[-1]["step"] == 9
+    assert chain.get_transaction_history("EVD-1")[-1]["block_index"] is None
+
+
+def test_restored_history_index_catches_up():
+    chain = Blockchain(difficulty=1, seal_policy=SealPolicy(max_transactions=2))
+    for step in range(6):
+        record(chain, "EVD-1", step)
+        chain.seal_if_due()
+    snapshot, height = json.loads(json.dumps(chain.export_index())), len(chain.chain)
+    for step in range(6, 10):
+        record(chain, "EVD-1", step)
+        chain.seal_if_due()
+    expected = chain.get_transaction_history("EVD-1")
+    
+    # As after loading a snapshot taken at `height`
+    chain.restore_index(snapshot, height)
+    assert chain.get_transaction_history("EVD-1") == expected
+    chain.rebuild_index()
+    assert chain.get_transaction_history("EVD-1") == expected
+
+
+# ============== VERIFICATION CHECKPOINT ==============
+
+def sealed_chain(blocks):
+    chain = Blockchain(difficulty=1)
+    for step in range(blocks):
+        record(chain, "EVD-1", step)
+        chain.mine_pending_transactions()
+    return chain
+
+
+def test_checkpoint_advances_with_the_chain():
+    chain = sealed_chain(3)
+    assert chain.verified_height == 0
+    assert chain.is_chain_valid()
+    assert chain.verified_height == 3
+    
+    record(chain, "EVD-1", 3)
+    chain.mine_pending_transactions()
+    assert chain.verified_height == 3
+    assert chain.is_chain_valid()
+    assert chain.verified_height == 4
+
+
+def test_tamper_below_checkpoint_needs_full_audit():
+    chain = sealed_chain(4)
+    assert chain.is_chain_valid()
+    
+    chain.chain[2].transactions[0]["step"] = 99
+    assert chain.is_chain_valid()
+    assert not chain.is_chain_valid(full=True)
+    assert chain.verified_height == 1
+
+
+def test_tamper_above_checkpoint_lowers_it():
+    chain = sealed_chain(2)
+    assert chain.is_chain_valid()
+    for step in range(2, 4):
+        record(chain, "EVD-1", step)
+        chain.mine_pending_transactions()
+    
+    chain.chain[4].transactions[0]["step"] = 99
+    assert not chain.is_chain_valid()
+    assert chain.verified_height == 2
+    assert not chain.is_chain_valid()
+
+
+# ============== MINING ==============
+
+def unmined_block(encoding_version):
+    transactions = [{"type": "CREATE_EVIDENCE", "evidence_id": f"EVD-{i}", "note": "caf\u00e9"}
+                    for i in range(3)]
+    return Block(7, transactions, "ab" * 32, timestamp="2024-01-01T00:00:00",
+                 encoding_version=encoding_version)
+
+
+@pytest.mark.parametrize("encoding_version", ENCODINGS)
+def test_mining_parts_hash_like_the_block(encoding_version):
+    block = unmined_block(encoding_version)
+    prefix, suffix = block.mining_parts()
+    for nonce in (0, 1, 12345, 2 ** 40):
+        block.nonce = nonce
+        expected = hashlib.sha256(prefix + encode_nonce(encoding_version, nonce) + suffix).hexdigest()
+        assert expected == block.calculate_hash()
+
+
+@pytest.mark.parametrize("encoding_version", ENCODINGS)
+def test_mined_hash_is_the_block_hash(encoding_version):
+    block = unmined_block(encoding_version)
+    block.mine(3)
+    assert block.hash.startswith("000")
+    assert block.hash == block.calculate_hash()
+
+
+@pytest.mark.parametrize("encoding_version", ENCODINGS)
+def test_parallel_miner_matches_block_mine(encoding_version):
+    serial = unmined_block(encoding_version)
+    serial.mine(3)
+    
+    block = unmined_block(encoding_version)
+    miner = ParallelMiner(workers=2, batch_size=256)
+    try:
+        miner.mine(block, 3)
+    finally:
+        miner.shutdown()
+    assert block.hash.startswith("000")
+    assert block.hash == block.calculate_hash()
+    # Block.mine finds the lowest nonce; the workers cannot find a lower one
+    assert block.nonce >= serial.nonce
+    if block.nonce == serial.nonce:
+        assert block.hash == serial.hash
+
+
+# Difficulty-6 nonce of unmined_block(ENCODING_MERKLE); the next one is 17325682
+KNOWN_NONCE = 8673734
+
+
+def test_batches_of_a_mined_block_stop_while_the_next_is_mined():
+    miner = ParallelMiner(workers=1, batch_size=1 << 22)
+    try:
+        # Resume just below a known nonce: the first batch finds it at once,
+        # the batch queued behind it holds no nonce and would run to its end
+        block = unmined_block(ENCODING_MERKLE)
+        block.nonce = KNOWN_NONCE - 1
+        miner.mine(block, 6)
+        assert block.nonce == KNOWN_NONCE
+        assert block.hash == block.calculate_hash()
+        stale = set(miner._in_flight)
+        
+        started = time.monotonic()
+        block = unmined_block(ENCODING_BINARY)
+        miner.mine(block, 3)
+        assert time.monotonic() - started < 2
+        assert block.hash == block.calculate_hash()
+        
+        _, not_done = wait(stale | miner._in_flight, timeout=10)
+        assert not not_done
+    finally:
+        miner.shutdown()
+
+
+# ============== PARALLEL AUDIT ==============
+
+def test_audit_of_valid_chain():
+    chain = sealed_chain(9)
+    report = audit_chain(chain.chain, workers=2, ranges_per_worker=2)
+    assert report.is_valid
+    assert report.first_bad_height is None
+    assert report.blocks_checked == 9
+
+
+@pytest.mark.parametrize("bad_height", [1, 4, 5, 9])
+def test_audit_reports_first_bad_height(bad_height):
+    chain = sealed_chain(9)
+    chain.chain[bad_height].transactions[0]["step"] = 99
+    chain.chain[7].transactions[0]["step"] = 99
+    report = audit_chain(chain.chain, workers=2, ranges_per_worker=2)
+    assert not report.is_valid
+    assert report.first_bad_height == min(bad_height, 7)
+
+
+def test_audit_reports_broken_link():
+    chain = sealed_chain(9)
+    # Re-mined after the change, so only the link from block 6 breaks
+    block = chain.chain[5]
+    block.transactions[0]["step"] = 99
+    block.merkle_root = block.calculate_merkle_root()
+    block.nonce = 0
+    block.hash = block.calculate_hash()
+    block.mine(chain.difficulty)
+    report = audit_chain(chain.chain, workers=2, ranges_per_worker=2)
+    assert not report.is_valid
+    assert report.first_bad_height == 6
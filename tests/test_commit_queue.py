@@ -0,0 +1,131 @@
+"""
+Commit Queue Tests - Forensic Chain
+Group commit, per-operation results and shutdown of CommitQueue.
+"""
+import threading
+
+import pytest
+
+from src.commit_queue import CommitQueue
+from src.smart_contract import ForensicContract
+
+
+@pytest.fixture
+def contract():
+    contract = ForensicContract(difficulty=1)
+    ok, msg = contract.register_participant("INV-1", "Investigator", "investigator", "Police")
+    assert ok, msg
+    return contract
+
+
+def creation(evidence_id, creator_id="INV-1"):
+    return dict(evidence_id=evidence_id, description="Laptop image", creator_id=creator_id,
+                file_hash="ab" * 32, file_location="/evidence/laptop.img", case_id="CASE-1")
+
+
+# ============== GROUP COMMIT ==============
+
+def test_concurrent_submissions_share_one_block(contract):
+    writers = 8
+    # The group closes when every writer has submitted, long before max_wait
+    commit_queue = CommitQueue(contract, max_group_size=writers, max_wait=30)
+    height = len(contract.blockchain.chain)
+    futures = [None] * writers
+    start = threading.Barrier(writers, timeout=5)
+    
+    def writer(i):
+        start.wait()
+        futures[i] = commit_queue.submit("create_evidence", **creation(f"EVD-{i}"))
+    
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    results = [future.result(timeout=10) for future in futures]
+    commit_queue.close()
+    
+    assert all(result.success for result in results)
+    assert len(contract.blockchain.chain) == height + 1
+    sealed = contract.blockchain.chain[-1].transactions
+    assert sorted(tx["transaction_id"] for tx in sealed) == sorted(r.transaction_id for r in results)
+    assert commit_queue.get_stats()["groups_committed"] == 1
+    assert commit_queue.get_stats()["operations_committed"] == writers
+
+
+# ============== PER-OPERATION RESULTS ==============
+
+def test_rejected_operation_fails_alone(contract):
+    commit_queue = CommitQueue(contract, max_group_size=3, max_wait=30)
+    futures = [
+        commit_queue.submit("create_evidence", **creation("EVD-1")),
+        commit_queue.submit("create_evidence", **creation("EVD-2", creator_id="NOBODY")),
+        commit_queue.submit("create_evidence", **creation("EVD-3")),
+    ]
+    results = [future.result(timeout=10) for future in futures]
+    commit_queue.close()
+    
+    assert [result.success for result in results] == [True, False, True]
+    assert results[1].transaction_id is None
+    assert "EVD-2" not in contract.evidence_registry
+    assert [tx["evidence_id"] for tx in contract.blockchain.chain[-1].transactions] == ["EVD-1", "EVD-3"]
+
+
+def test_invalid_arguments_are_reported_per_operation(contract):
+    commit_queue = CommitQueue(contract, max_group_size=2, max_wait=30)
+    bad = commit_queue.submit("create_evidence", evidence_id="EVD-1")
+    good = commit_queue.submit("create_evidence", **creation("EVD-2"))
+    assert not bad.result(timeout=10).success
+    assert "Invalid arguments" in bad.result().message
+    assert good.result(timeout=10).success
+    
+    with pytest.raises(ValueError):
+        commit_queue.submit("mine_everything")
+    commit_queue.close()
+
+
+def test_failed_commit_fails_every_operation_of_the_group(contract, monkeypatch):
+    def broken_commit(operations):
+        raise OSError("disk full")
+    monkeypatch.setattr(contract, "commit_group", broken_commit)
+    
+    commit_queue = CommitQueue(contract, max_group_size=2, max_wait=30)
+    futures = [commit_queue.submit("create_evidence", **creation(f"EVD-{i}")) for i in range(2)]
+    for future in futures:
+        with pytest.raises(OSError, match="disk full"):
+            future.result(timeout=10)
+    
+    # The commit thread survives and keeps committing
+    monkeypatch.undo()
+    later = commit_queue.submit("create_evidence", **creation("EVD-3"))
+    commit_queue.close()
+    assert later.result().success
+    assert commit_queue.get_stats()["groups_committed"] == 1
+
+
+# ============== SHUTDOWN ==============
+
+def test_close_commits_what_is_queued(contract):
+    # A group that would wait far longer for more operations
+    commit_queue = CommitQueue(contract, max_group_size=100, max_wait=30)
+    futures = [commit_queue.submit("create_evidence", **creation(f"EVD-{i}")) for i in range(5)]
+    commit_queue.close()
+    
+    assert all(future.done() and future.result().success for future in futures)
+    assert not commit_queue._thread.is_alive()
+    assert sorted(contract.evidence_registry) == [f"EVD-{i}" for i in range(5)]
+    
+    with pytest.raises(RuntimeError):
+        commit_queue.submit("create_evidence", **creation("EVD-LATE"))
+    commit_queue.close()    # Closing again is a no-op
+
+
+def test_cancelled_operation_is_skipped(contract):
+    commit_queue = CommitQueue(contract, max_group_size=100, max_wait=30)
+    cancelled = commit_queue.submit("create_evidence", **creation("EVD-1"))
+    kept = commit_queue.submit("create_evidence", **creation("EVD-2"))
+    cancelled.cancel()
+    commit_queue.close()
+    
+    assert kept.result().success
+    assert "EVD-2" in contract.evidence_registry
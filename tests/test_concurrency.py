@@ -0,0 +1,88 @@
+"""
+Concurrency Tests - Forensic Chain
+Reader-writer semantics of RWLock.
+"""
+import threading
+
+import pytest
+
+from src.concurrency import RWLock
+
+
+def in_thread(function):
+    thread = threading.Thread(target=function, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    both_inside = threading.Barrier(2, timeout=5)
+    
+    def reader():
+        with lock.read():
+            both_inside.wait()
+    
+    threads = [in_thread(reader) for _ in range(2)]
+    for thread in threads:
+        thread.join(5)
+    assert not both_inside.broken
+
+
+def test_writer_excludes_readers():
+    lock = RWLock()
+    events = []
+    lock.acquire_write()
+    
+    def reader():
+        with lock.read():
+            events.append("read")
+    
+    thread = in_thread(reader)
+    thread.join(0.2)
+    assert thread.is_alive()
+    events.append("written")
+    lock.release_write()
+    thread.join(5)
+    assert events == ["written", "read"]
+
+
+def test_waiting_writer_keeps_new_readers_out():
+    lock = RWLock()
+    events = []
+    lock.acquire_read()
+    
+    def writer():
+        with lock.write():
+            events.append("write")
+    
+    def reader():
+        with lock.read():
+            events.append("read")
+    
+    writing = in_thread(writer)
+    writing.join(0.2)
+    reading = in_thread(reader)
+    reading.join(0.2)
+    # The writer waits for the first reader, the second reader for the writer
+    assert writing.is_alive() and reading.is_alive()
+    lock.release_read()
+    writing.join(5)
+    reading.join(5)
+    assert events == ["write", "read"]
+
+
+def test_lock_is_reentrant_but_not_upgradable():
+    lock = RWLock()
+    with lock.write():
+        with lock.read():
+            with lock.write():
+                assert lock.write_held()
+        assert lock.write_held()
+    assert not lock.write_held()
+    
+    with lock.read():
+        with lock.read():
+            pass
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
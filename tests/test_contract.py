@@ -0,0 +1,515 @@
+"""
+Contract Tests - Forensic Chain
+Validation, persistence and replay of ForensicContract.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import zlib
+
+import pytest
+
+from src.blockchain import SealPolicy
+from src.export import iter_ledger_ndjson
+from src.ledger_store import RECORD_HEADER
+from src.smart_contract import ForensicContract
+
+
+def open_contract(data_dir, **kwargs):
+    return ForensicContract(data_dir=str(data_dir), difficulty=1, **kwargs)
+
+
+def register_investigator(contract, participant_id="INV-1"):
+    ok, msg = contract.register_participant(participant_id, "Investigator", "investigator", "Police")
+    assert ok, msg
+
+
+def create(contract, evidence_id, **overrides):
+    fields = dict(evidence_id=evidence_id, description="Laptop image", creator_id="INV-1",
+                  file_hash="ab" * 32, file_location="/evidence/laptop.img", case_id="CASE-1")
+    fields.update(overrides)
+    return contract.create_evidence(**fields)
+
+
+# ============== UNENCODABLE TEXT ==============
+
+def test_lone_surrogate_does_not_jam_sealing(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    height = len(contract.blockchain.chain)
+    
+    ok, msg = create(contract, "EVD-BAD", description=json.loads('"\\ud800"'))
+    assert not ok and "UTF-8" in msg
+    assert "EVD-BAD" not in contract.evidence_registry
+    assert not contract.blockchain.pending_transactions
+    ok, msg = create(contract, "EVD-1")
+    assert ok, msg
+    assert len(contract.blockchain.chain) == height + 1
+    contract.close()
+    
+    reopened = open_contract(tmp_path)
+    assert reopened.flush()[0]
+    assert create(reopened, "EVD-2")[0]
+    assert reopened.verify_blockchain()[0]
+    reopened.close()
+
+
+def test_unencodable_journal_entry_is_dropped_on_load(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    contract.close()
+    
+    # Left behind by a version that journaled it before failing to seal
+    with open(os.path.join(tmp_path, contract.store.JOURNAL_FILE), 'a') as f:
+        f.write(json.dumps({
+            "type": "CREATE_EVIDENCE", "evidence_id": "EVD-BAD", "creator_id": "INV-1",
+            "file_hash": "ab" * 32, "file_location": "", "case_id": "CASE-1",
+            "description": "\ud800", "metadata": {},
+            "transaction_id": "0" * 16, "timestamp": "2026-01-01T00:00:00"
+        }) + "\n")
+    
+    reopened = open_contract(tmp_path)
+    assert "EVD-BAD" not in reopened.evidence_registry
+    assert create(reopened, "EVD-1")[0]
+    assert reopened.flush()[0]
+    reopened.close()
+
+
+# ============== INPUT VALIDATION ==============
+
+@pytest.mark.parametrize("overrides", [
+    {"metadata": "not an object"},
+    {"metadata": ["list"]},
+    {"metadata": {1: "non-string key"}},
+    {"metadata": {"size": float("nan")}},
+    {"metadata": {"raw": b"bytes"}},
+    {"description": None},
+    {"case_id": 7},
+    {"creator_id": ["INV-1"]},
+])
+def test_invalid_fields_are_rejected_before_journaling(tmp_path, overrides):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    journal = os.path.join(tmp_path, contract.store.JOURNAL_FILE)
+    journal_size = os.path.getsize(journal) if os.path.exists(journal) else 0
+    
+    ok, msg = create(contract, "EVD-X", **overrides)
+    assert not ok, msg
+    assert not contract.blockchain.pending_transactions
+    assert (os.path.getsize(journal) if os.path.exists(journal) else 0) == journal_size
+    contract.close()
+
+
+def test_rejected_fields_do_not_break_replay(tmp_path):
+    contract = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100))
+    register_investigator(contract)
+    assert not create(contract, "EVD-BAD", metadata="oops")[0]
+    assert not contract.transfer_evidence("EVD-1", "INV-1", {"to": "x"}, "reason")[0]
+    assert not contract.delete_evidence(["EVD-1"], "INV-1", "reason")[0]
+    assert create(contract, "EVD-1", metadata={"tags": ("disk", "image")})[0]
+    expected = contract.get_evidence("EVD-1")
+    assert expected["metadata"] == {"tags": ["disk", "image"]}
+    # Leave the transactions in the journal and no snapshot behind
+    contract.store.close()
+    
+    reopened = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100))
+    assert reopened.get_evidence("EVD-1") == expected
+    assert "EVD-BAD" not in reopened.evidence_registry
+    assert reopened.flush()[0]
+    assert reopened.verify_blockchain(full_audit=True)[0]
+    reopened.close()
+
+
+# ============== VERIFICATION CHECKPOINT ==============
+
+def tamper_block(data_dir, old: bytes, new: bytes):
+    """Rewrite a sealed record in place, keeping its checksum valid."""
+    assert len(old) == len(new)
+    for path in glob.glob(os.path.join(data_dir, "segment-*.log")):
+        with open(path, 'r+b') as f:
+            data = bytearray(f.read())
+            offset = 0
+            while offset < len(data):
+                length, _, header_length = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                payload = data[start:start + length]
+                if old in payload:
+                    payload = payload.replace(old, new)
+                    data[offset:start + length] = RECORD_HEADER.pack(
+                        length, zlib.crc32(payload), header_length) + payload
+                    f.seek(0)
+                    f.write(data)
+                    return
+                offset = start + length
+    raise AssertionError("record not found")
+
+
+def test_checkpoint_is_not_trusted_across_restart(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    assert create(contract, "EVD-1")[0]
+    assert create(contract, "EVD-2")[0]
+    assert contract.verify_blockchain()[0]
+    assert contract.blockchain.verified_height == len(contract.blockchain.chain) - 1
+    contract.close()
+    
+    # Changed while no process had the ledger open
+    tamper_block(tmp_path, b"/evidence/laptop.img", b"/evidence/laptop.iso")
+    
+    reopened = open_contract(tmp_path)
+    assert reopened.blockchain.verified_height == 0
+    assert not reopened.verify_blockchain()[0]
+    reopened.close()
+
+
+# ============== PARALLEL AUDIT ==============
+
+def test_audit_reads_first_bad_height_from_the_ledger(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    for i in range(6):
+        assert create(contract, f"EVD-{i}", file_location=f"/evidence/disk-{i}.img")[0]
+    bad_height = contract.get_evidence_history("EVD-3")[0]["block_index"]
+    assert contract.audit_blockchain(workers=2).is_valid
+    assert contract.blockchain.verified_height == len(contract.blockchain.chain) - 1
+    contract.close()
+    
+    tamper_block(tmp_path, b"/evidence/disk-3.img", b"/evidence/disk-X.img")
+    
+    reopened = open_contract(tmp_path)
+    report = reopened.audit_blockchain(workers=2)
+    assert not report.is_valid
+    assert report.first_bad_height == bad_height
+    reopened.close()
+
+
+# ============== CONCURRENT READERS ==============
+
+def test_readers_see_consistent_registries_while_writing(tmp_path):
+    contract = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=25))
+    register_investigator(contract)
+    done = threading.Event()
+    errors = []
+    
+    def reader():
+        try:
+            seen = 0
+            while not done.is_set():
+                participants = contract.list_participants()
+                assert len(participants) >= seen
+                seen = len(participants)
+                assert contract.participant_count() >= seen
+                in_case = contract.get_evidence_by_case("CASE-1")
+                assert len(in_case) == len({e["evidence_id"] for e in in_case})
+                contract.list_all_evidence()
+        except Exception as e:
+            errors.append(e)
+    
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    try:
+        for i in range(100):
+            assert contract.register_participant(f"EXP-{i}", "Expert", "forensic_expert", "Lab")[0]
+            assert create(contract, f"EVD-{i}")[0]
+    finally:
+        done.set()
+        for thread in readers:
+            thread.join(10)
+    
+    assert not errors
+    assert contract.participant_count() == 101
+    assert len(contract.get_evidence_by_case("CASE-1")) == 100
+    contract.close()
+
+
+# ============== SEALING OUTSIDE THE REGISTRY LOCK ==============
+
+class GatedMiner:
+    """Mining engine that holds every block until released."""
+    workers = 1
+    
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def mine(self, block, difficulty):
+        self.started.set()
+        assert self.release.wait(10)
+        block.mine(difficulty)
+
+
+def finishes(function, *args, timeout=5):
+    thread = threading.Thread(target=function, args=args, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_reads_and_writes_do_not_wait_for_mining(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    height = len(contract.blockchain.chain)
+    miner = contract.blockchain.miner = GatedMiner()
+    
+    first = threading.Thread(target=create, args=(contract, "EVD-1"))
+    first.start()
+    assert miner.started.wait(10)
+    
+    # The block of EVD-1 is being mined
+    assert finishes(contract.get_evidence, "EVD-1")
+    assert finishes(contract.get_blockchain_info)
+    second = threading.Thread(target=create, args=(contract, "EVD-2"))
+    second.start()
+    deadline = time.monotonic() + 5
+    while contract.get_evidence("EVD-2") is None:
+        assert time.monotonic() < deadline, "write waited for mining"
+        time.sleep(0.01)
+    
+    miner.release.set()
+    first.join(10)
+    second.join(10)
+    assert not contract.blockchain.pending_transactions
+    assert len(contract.blockchain.chain) == height + 2
+    assert contract.verify_blockchain(full_audit=True)[0]
+    contract.close()
+
+
+def test_transactions_recorded_while_mining_stay_journaled(tmp_path):
+    contract = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100))
+    register_investigator(contract)
+    assert contract.flush()[0]
+    assert create(contract, "EVD-1")[0]
+    miner = contract.blockchain.miner = GatedMiner()
+    
+    flush = threading.Thread(target=contract.flush)
+    flush.start()
+    assert miner.started.wait(10)
+    assert create(contract, "EVD-2")[0]
+    miner.release.set()
+    flush.join(10)
+    
+    pending = [tx["evidence_id"] for tx in contract.blockchain.pending_transactions]
+    assert pending == ["EVD-2"]
+    assert [tx["evidence_id"] for tx in contract.store.load_journal()] == ["EVD-2"]
+    # Crash before EVD-2 is sealed
+    contract.store.close()
+    
+    reopened = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100))
+    assert reopened.get_evidence("EVD-2") is not None
+    assert reopened.flush()[0]
+    assert [tx["evidence_id"] for tx in reopened.blockchain.get_latest_block().transactions] == ["EVD-2"]
+    reopened.close()
+
+
+# ============== BATCH VALIDATION ==============
+
+def batch_item(evidence_id, **overrides):
+    item = dict(evidence_id=evidence_id, description="Phone image", creator_id="INV-1",
+                file_hash="cd" * 32, file_location="/evidence/phone.img", case_id="CASE-1")
+    item.update(overrides)
+    return item
+
+
+@pytest.mark.parametrize("bad_item", [
+    batch_item("EVD-3", metadata="not an object"),
+    batch_item("EVD-3", description=["list"]),
+    batch_item(["EVD-3"]),
+    "EVD-3",
+    None,
+])
+def test_atomic_batch_records_nothing_if_any_item_is_invalid(tmp_path, bad_item):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    height = len(contract.blockchain.chain)
+    
+    ok, msg, results = contract.create_evidence_batch(
+        [batch_item("EVD-1"), batch_item("EVD-2"), bad_item])
+    
+    assert not ok
+    assert [r["success"] for r in results] == [False, False, False]
+    assert "Not recorded" in results[0]["message"]
+    assert "Not recorded" not in results[2]["message"]
+    assert not contract.evidence_registry
+    assert len(contract.blockchain.chain) == height
+    contract.close()
+
+
+def test_non_atomic_batch_reports_malformed_items(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    
+    ok, msg, results = contract.create_evidence_batch(
+        [batch_item("EVD-1"), 42, batch_item("EVD-2", metadata=[])], atomic=False)
+    
+    assert not ok
+    assert [r["success"] for r in results] == [True, False, False]
+    assert list(contract.evidence_registry) == ["EVD-1"]
+    assert contract.create_evidence_batch({"items": []})[:2] == (
+        False, "Items must be a list of evidence objects")
+    contract.close()
+
+
+def test_transfer_batch_requires_a_list_of_string_ids(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    register_investigator(contract, "INV-2")
+    assert create(contract, "EVD-1")[0]
+    assert create(contract, "E")[0]
+    
+    ok, msg, results = contract.transfer_evidence_batch("INV-1", "INV-2", "Hand-off",
+                                                        evidence_ids="EVD-1")
+    assert not ok and results == []
+    assert contract.get_evidence("E")["current_owner_id"] == "INV-1"
+    
+    ok, msg, results = contract.transfer_evidence_batch(
+        "INV-1", "INV-2", "Hand-off", evidence_ids=["EVD-1", ["E"], {"id": "E"}, 7], atomic=False)
+    assert not ok
+    assert [r["success"] for r in results] == [True, False, False, False]
+    assert all(r["message"] == "Evidence ID must be a string" for r in results[1:])
+    assert contract.get_evidence("EVD-1")["current_owner_id"] == "INV-2"
+    assert contract.get_evidence("E")["current_owner_id"] == "INV-1"
+    contract.close()
+
+
+def test_batch_is_journaled_with_one_write(tmp_path, monkeypatch):
+    contract = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=1000))
+    register_investigator(contract, "INV-1")
+    register_investigator(contract, "INV-2")
+    writes = []
+    monkeypatch.setattr(contract.store, "journal_transactions", writes.append)
+    
+    items = [batch_item(f"EVD-{i}") for i in range(20)]
+    assert contract.create_evidence_batch(items)[0]
+    assert contract.transfer_evidence_batch("INV-1", "INV-2", "Lab analysis", case_id="CASE-1")[0]
+    results = contract.commit_group([
+        ("delete_evidence", dict(evidence_id=f"EVD-{i}", requester_id="INV-1", reason="Duplicate"))
+        for i in range(3)
+    ])
+    assert all(success for success, _, _ in results)
+    assert [len(transactions) for transactions in writes] == [20, 20, 3]
+    contract.close()
+
+
+# ============== SECONDARY INDEXES ==============
+
+def assert_indexes_match_registry(contract):
+    """Case and owner lookups agree with a scan of the registry."""
+    registry = contract.list_all_evidence(active_only=False)
+    for key, lookup in (("case_id", contract.get_evidence_by_case),
+                        ("current_owner_id", contract.get_evidence_by_owner)):
+        for value in {e[key] for e in registry}:
+            for active_only in (True, False):
+                expected = sorted(e["evidence_id"] for e in registry if e[key] == value
+                                  and (e["is_active"] or not active_only))
+                assert sorted(e["evidence_id"] for e in lookup(value, active_only)) == expected
+
+
+def test_indexes_follow_transfers_and_deletes(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract, "INV-1")
+    register_investigator(contract, "INV-2")
+    for i in range(6):
+        assert create(contract, f"EVD-{i}", case_id=f"CASE-{i % 2}")[0]
+    
+    assert contract.transfer_evidence("EVD-0", "INV-1", "INV-2", "Lab analysis")[0]
+    assert contract.transfer_evidence_batch("INV-1", "INV-2", "Case hand-off", case_id="CASE-1")[0]
+    assert contract.delete_evidence("EVD-2", "INV-1", "Duplicate")[0]
+    assert contract.delete_evidence("EVD-3", "INV-1", "Duplicate")[0]
+    assert_indexes_match_registry(contract)
+    assert [e["evidence_id"] for e in contract.get_evidence_by_owner("INV-1")] == ["EVD-4"]
+    contract.close()
+    
+    reopened = open_contract(tmp_path)
+    assert_indexes_match_registry(reopened)
+    assert reopened.transfer_evidence("EVD-4", "INV-1", "INV-2", "Lab analysis")[0]
+    assert reopened.get_evidence_by_owner("INV-1") == []
+    assert_indexes_match_registry(reopened)
+    reopened.close()
+
+
+# ============== LATENCY SEALING ==============
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_max_latency_seals_without_further_writes(tmp_path):
+    policy = SealPolicy(max_transactions=100, max_latency=0.2)
+    contract = open_contract(tmp_path, seal_policy=policy)
+    register_investigator(contract)
+    assert wait_until(lambda: not contract.blockchain.pending_transactions)
+    height = len(contract.blockchain.chain)
+    
+    started = time.monotonic()
+    assert create(contract, "EVD-1")[0]
+    assert contract.blockchain.pending_transactions
+    assert wait_until(lambda: not contract.blockchain.pending_transactions)
+    assert time.monotonic() - started >= 0.2
+    assert len(contract.blockchain.chain) == height + 1
+    contract.close()
+    assert not contract._sealer.is_alive()
+
+
+def test_journaled_transactions_are_sealed_on_time_after_restart(tmp_path):
+    contract = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100))
+    register_investigator(contract)
+    contract.store.close()
+    
+    reopened = open_contract(tmp_path, seal_policy=SealPolicy(max_transactions=100, max_latency=0.1))
+    assert reopened.blockchain.pending_transactions
+    assert wait_until(lambda: not reopened.blockchain.pending_transactions)
+    assert reopened.get_participant("INV-1") is not None
+    reopened.close()
+
+
+# ============== PAGINATION ==============
+
+def test_unknown_evidence_cursor_is_rejected(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    for i in range(3):
+        assert create(contract, f"EVD-{i}")[0]
+    
+    first, cursor = contract.list_evidence_page(limit=2)
+    rest, end = contract.list_evidence_page(limit=2, after=cursor)
+    assert [e["evidence_id"] for e in first + rest] == ["EVD-0", "EVD-1", "EVD-2"]
+    assert end is None
+    with pytest.raises(ValueError):
+        contract.list_evidence_page(limit=2, after="EVD-404")
+    contract.close()
+
+
+# ============== EXPORT ==============
+
+def export(contract, start_height=0):
+    records = [json.loads(line) for line in iter_ledger_ndjson(contract, start_height)]
+    header, blocks = records[0], [r["data"] for r in records if r["kind"] == "block"]
+    assert header["kind"] == "export"
+    return header["data"], blocks
+
+
+def test_export_resumes_from_a_height(tmp_path):
+    contract = open_contract(tmp_path)
+    register_investigator(contract)
+    for i in range(3):
+        assert create(contract, f"EVD-{i}")[0]
+    header, first = export(contract)
+    assert header["start_height"] == 0
+    assert [b["index"] for b in first] == list(range(header["chain_height"]))
+    
+    for i in range(3, 6):
+        assert create(contract, f"EVD-{i}")[0]
+    resume_at = header["chain_height"]
+    header, rest = export(contract, resume_at)
+    assert header["start_height"] == resume_at
+    assert [b["index"] for b in rest] == list(range(resume_at, header["chain_height"]))
+    assert first + rest == contract.blockchain.to_dict()
+    contract.close()
@@ -0,0 +1,293 @@
+"""
+Evidence Store Tests - Forensic Chain
+Content-addressed storage, intake and integrity checks of EvidenceStore.
+"""
+import errno
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src import evidence_store
+from src.evidence_store import EvidenceStore
+from src.tree_hash import TreeBuilder, tree_digest
+from src.upload_sessions import ChunkRejected, UploadSessions
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EvidenceStore(str(tmp_path / "store"), tree_chunk_size=64 * 1024, hash_workers=2)
+
+
+def store_bytes(store, data, evidence_id="EVD-1", case_id="CASE-1"):
+    ok, path, file_hash = store.store_evidence_stream(io.BytesIO(data), evidence_id, case_id, "disk.img")
+    assert ok, file_hash
+    return path, file_hash
+
+
+# ============== CONTENT ADDRESSING ==============
+
+def test_identical_content_is_stored_once(store):
+    data = os.urandom(200 * 1024)
+    path1, file_hash = store_bytes(store, data, "EVD-1", "CASE-A")
+    path2, _ = store_bytes(store, data, "EVD-2", "CASE-B")
+    ok, path3, _ = store.attach_existing(file_hash, "EVD-3", "CASE-C", "disk.img")
+    
+    assert ok
+    stats = store.get_storage_stats()
+    assert stats["total_size_bytes"] == len(data)
+    assert stats["attached_size_bytes"] == 3 * len(data)
+    
+    for path in (path1, path2, path3):
+        assert store.delete_evidence_file(path)[0]
+    assert not store.has_content(file_hash)
+
+
+def test_intake_leaves_the_shared_object_untouched(store, tmp_path):
+    source = tmp_path / "disk.img"
+    source.write_bytes(os.urandom(1000))
+    ok, _, file_hash = store.store_evidence(str(source), "EVD-1", "CASE-A")
+    assert ok
+    object_stat = store._object_path(file_hash).stat()
+    assert object_stat.st_mode & 0o777 == 0o444
+    
+    # The same bytes again, from a writable file with other times
+    os.chmod(source, 0o666)
+    os.utime(source, (1_000_000_000, 1_000_000_000))
+    ok, _, _ = store.store_evidence(str(source), "EVD-2", "CASE-B")
+    assert ok
+    after = store._object_path(file_hash).stat()
+    assert after.st_mode & 0o777 == 0o444
+    assert after.st_mtime_ns == object_stat.st_mtime_ns
+    assert after.st_nlink == 3
+
+
+def test_intake_fails_without_hard_links(store, monkeypatch):
+    def no_links(source, destination):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(os, "link", no_links)
+    
+    ok, path, msg = store.store_evidence_stream(io.BytesIO(b"data"), "EVD-1", "CASE-1", "disk.img")
+    assert not ok and path == ""
+    assert "hard links" in msg
+    assert not list((Path(store.base_path) / "active").rglob("*.img"))
+    assert not list((Path(store.base_path) / "temp").iterdir())
+
+
+@pytest.mark.parametrize("file_hash", [
+    "./" * 22 + "../../secret/key.pem",
+    "../" * 21 + "a",
+    "A" * 63 + "/",
+    "g" * 64,
+    "",
+])
+def test_attach_rejects_paths_posing_as_hashes(store, tmp_path, file_hash):
+    secret = tmp_path / "secret" / "key.pem"
+    secret.parent.mkdir()
+    secret.write_bytes(b"private key")
+    
+    ok, storage_path, msg = store.attach_existing(file_hash, "EVD-X", "CASE-X")
+    
+    assert not ok and storage_path == ""
+    assert not store.has_content(file_hash)
+    assert store.get_tree_digest(file_hash) is None
+    assert secret.stat().st_nlink == 1
+    assert not list((tmp_path / "secret").glob("*.tree"))
+    assert not list((Path(store.base_path) / "active").rglob("*"))
+
+
+def test_delete_with_tampered_meta_never_touches_outside_files(store, tmp_path):
+    secret = tmp_path / "secret" / "key.pem"
+    secret.parent.mkdir()
+    secret.write_bytes(b"private key")
+    path, _ = store_bytes(store, os.urandom(1000))
+    
+    meta_path = Path(path).with_suffix('.meta')
+    metadata = json.loads(meta_path.read_text())
+    metadata["file_hash"] = "./" * 22 + "../../secret/key.pem"
+    meta_path.write_text(json.dumps(metadata))
+    
+    assert store.delete_evidence_file(path)[0]
+    assert secret.exists()
+
+
+def test_object_path_refuses_non_hex_addresses(store):
+    with pytest.raises(ValueError):
+        store._object_path("./" * 22 + "../../secret/key.pem")
+
+
+# ============== INCREMENTAL TREE DIGEST ==============
+
+@pytest.mark.parametrize("size", [0, 1, 64 * 1024, 64 * 1024 + 1, 5 * 64 * 1024 - 7])
+def test_tree_builder_matches_file_digest(tmp_path, size):
+    data = os.urandom(size)
+    path = tmp_path / "file.bin"
+    path.write_bytes(data)
+    
+    builder = TreeBuilder(64 * 1024)
+    for start in range(0, size, 10000):
+        builder.update(data[start:start + 10000])
+    
+    assert builder.digest() == tree_digest(str(path), 64 * 1024, workers=2)
+
+
+@pytest.fixture
+def no_read_back(monkeypatch):
+    def read_back(*args, **kwargs):
+        raise AssertionError("stored file was read back to digest it")
+    monkeypatch.setattr(evidence_store, "tree_digest", read_back)
+
+
+def test_streamed_file_is_digested_while_written(store, no_read_back):
+    data = os.urandom(300 * 1024)
+    path, file_hash = store_bytes(store, data)
+    
+    assert store.get_tree_digest(file_hash) == tree_digest(path, 64 * 1024)
+    assert store.verify_tree_integrity(path)[0]
+
+
+def test_resumed_upload_is_digested_as_chunks_arrive(store, no_read_back):
+    data = os.urandom(400 * 1024)
+    pieces = [data[i:i + 100 * 1024] for i in range(0, len(data), 100 * 1024)]
+    session = UploadSessions(store).create("EVD-1", "CASE-1", "disk.img", total_size=len(data))
+    assert session.write_chunk(0, [pieces[0]])[0]
+    assert not session.write_chunk(len(pieces[0]), [pieces[1]], chunk_sha256="0" * 64)[0]
+    session.writer.close()
+    
+    # Resumed by another process after a restart
+    sessions = UploadSessions(store)
+    resumed = sessions.get(session.upload_id)
+    offset = resumed.offset
+    for piece in pieces[1:]:
+        assert resumed.write_chunk(offset, [piece])[0]
+        offset += len(piece)
+    ok, path, file_hash = sessions.finalize(session.upload_id)
+    
+    assert ok, file_hash
+    assert store.get_tree_digest(file_hash) == tree_digest(path, 64 * 1024)
+
+
+# ============== TREE VERIFICATION ==============
+
+CHUNK = 64 * 1024
+
+
+def flip_byte(path, offset):
+    os.chmod(path, 0o644)
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        f.seek(offset)
+        f.write(bytes([byte ^ 0xFF]))
+
+
+@pytest.fixture
+def corrupted(store):
+    """Stored file of 6 chunks whose chunk 2 was modified."""
+    path, _ = store_bytes(store, os.urandom(5 * CHUNK + 100))
+    flip_byte(path, 2 * CHUNK + 10)
+    return path
+
+
+@pytest.mark.parametrize("check, checked", [
+    ({}, 6),
+    ({"ranges": [(2 * CHUNK + 10, 2 * CHUNK + 11)]}, 1),
+    ({"ranges": [(0, 100), (CHUNK, 3 * CHUNK)]}, 3),
+    ({"sample": 6}, 6),
+], ids=["full", "one-byte-range", "ranges", "sample"])
+def test_modified_chunk_is_reported(store, corrupted, check, checked):
+    ok, msg, report = store.verify_tree_integrity(corrupted, **check)
+    assert not ok and "1 chunk(s) differ" in msg
+    assert report["mismatched_chunks"] == [2]
+    assert report["chunks_checked"] == checked
+    assert report["chunks_total"] == 6
+
+
+def test_ranges_clear_of_the_modification_verify(store, corrupted):
+    ranges = [(0, 2 * CHUNK), (3 * CHUNK, 5 * CHUNK + 100)]
+    ok, _, report = store.verify_tree_integrity(corrupted, ranges=ranges)
+    assert ok
+    assert report["chunks_checked"] == 5 and report["mismatched_chunks"] == []
+
+
+def test_sample_larger_than_the_file_checks_every_chunk(store, corrupted):
+    ok, _, report = store.verify_tree_integrity(corrupted, sample=100)
+    assert not ok
+    assert report["chunks_checked"] == report["chunks_total"] == 6
+    assert report["mismatched_chunks"] == [2]
+
+
+def test_truncated_file_reports_its_last_chunks(store):
+    path, _ = store_bytes(store, os.urandom(5 * CHUNK + 100))
+    os.chmod(path, 0o644)
+    os.truncate(path, 3 * CHUNK + 5)
+    ok, _, report = store.verify_tree_integrity(path, ranges=[(0, CHUNK)])
+    assert not ok
+    assert report["mismatched_chunks"] == [3, 4, 5]
+
+
+@pytest.mark.parametrize("check", [
+    {"ranges": [(0, 5 * CHUNK + 101)]},
+    {"ranges": [(-1, 10)]},
+    {"ranges": [(10, 10)]},
+    {"sample": 0},
+    {"ranges": [(0, 10)], "sample": 1},
+])
+def test_invalid_checks_are_refused(store, check):
+    path, _ = store_bytes(store, os.urandom(5 * CHUNK + 100))
+    ok, msg, report = store.verify_tree_integrity(path, **check)
+    assert not ok
+    assert report["chunks_checked"] == 0 and report["mismatched_chunks"] == []
+
+
+# ============== UPLOAD SESSIONS ==============
+
+def test_oversized_chunk_is_refused_before_it_is_written(store):
+    session = UploadSessions(store).create("EVD-1", "CASE-1", total_size=100)
+    consumed = []
+    
+    def pieces():
+        for piece in (b"a" * 60, b"b" * 60, b"c" * 60):
+            consumed.append(piece)
+            yield piece
+    
+    ok, msg = session.write_chunk(0, pieces())
+    assert not ok and "exceeds" in msg
+    assert len(consumed) == 2
+    assert session.offset == 0 and os.path.getsize(session.writer.temp_path) == 0
+    
+    ok, msg = session.write_chunk(0, pieces(), size=180)
+    assert not ok and "exceeds" in msg
+    assert len(consumed) == 2
+    assert session.write_chunk(0, [b"x" * 100])[0]
+
+
+def test_one_chunk_at_a_time(store):
+    session = UploadSessions(store).create("EVD-1", "CASE-1")
+    receiver = session.begin_chunk(0)
+    receiver.write(b"data")
+    with pytest.raises(ChunkRejected):
+        session.begin_chunk(0)
+    receiver.abort()
+    receiver.abort()
+    
+    assert session.write_chunk(0, [b"data"]) == (True, "Received 4 bytes")
+
+
+def test_abandoned_uploads_expire(store):
+    uploads = UploadSessions(store, ttl=3600)
+    old = uploads.create("EVD-1", "CASE-1")
+    assert old.write_chunk(0, [b"partial"])[0]
+    fresh = uploads.create("EVD-2", "CASE-1")
+    old_files = list(Path(store.base_path, "temp").glob(f"upload-{old.upload_id}.*"))
+    assert len(old_files) == 2
+    for path in old_files:
+        os.utime(path, (os.path.getmtime(path) - 7200,) * 2)
+    
+    assert uploads.expire() == 1
+    assert not any(path.exists() for path in old_files)
+    assert uploads.get(old.upload_id) is None
+    assert UploadSessions(store).get(old.upload_id) is None
+    assert uploads.get(fresh.upload_id) is fresh
@@ -0,0 +1,158 @@
+"""
+Ledger Server Tests - Forensic Chain
+Forwarding of custody operations from RemoteContract to the ledger owner.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from src.commit_queue import CommitQueue
+from src.ledger_server import LedgerServer, RemoteContract
+from src.smart_contract import ForensicContract
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "group-commit"])
+def owner(request, tmp_path):
+    """Ledger owner serving from a thread; yields (data_dir, socket_path)."""
+    data_dir, socket_path = str(tmp_path / "ledger"), str(tmp_path / "ledger.sock")
+    contract = ForensicContract(data_dir=data_dir, difficulty=1)
+    commit_queue = CommitQueue(contract) if request.param else None
+    server = LedgerServer(contract, socket_path, commit_queue=commit_queue)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield data_dir, socket_path
+    server.shutdown()
+    thread.join(5)
+    if commit_queue is not None:
+        commit_queue.close()
+    contract.close()
+
+
+def register(contract, participant_id):
+    return contract.register_participant(participant_id, "Investigator", "investigator", "Police")
+
+
+def create(contract, evidence_id, creator_id="INV-1"):
+    return contract.create_evidence(evidence_id, "Laptop image", creator_id, "ab" * 32,
+                                    "/evidence/laptop.img", "CASE-1")
+
+
+# ============== ROUND TRIP ==============
+
+def test_operations_round_trip(owner):
+    remote = RemoteContract(*owner)
+    assert register(remote, "INV-1") == (True, "Successfully registered participant: Investigator")
+    assert register(remote, "INV-2")[0]
+    ok, msg = create(remote, "EVD-1")
+    assert ok, msg
+    assert not create(remote, "EVD-1")[0]
+    assert remote.transfer_evidence("EVD-1", "INV-1", "INV-2", "Analysis")[0]
+    
+    # The worker's replica sees its own writes
+    assert remote.get_evidence("EVD-1")["current_owner_id"] == "INV-2"
+    assert [p.participant_id for p in remote.list_participants()] == ["INV-1", "INV-2"]
+    
+    results = remote.commit_group([("create_evidence", {
+        "evidence_id": "EVD-2", "description": "Phone", "creator_id": "INV-1",
+        "file_hash": "cd" * 32, "file_location": "/evidence/phone.img", "case_id": "CASE-1"
+    }), ("delete_evidence", {"evidence_id": "EVD-404", "requester_id": "INV-1", "reason": "Test"})])
+    assert [success for success, _, _ in results] == [True, False]
+    assert remote.flush()[0]
+    assert remote.get_evidence("EVD-2") is not None
+    assert remote.verify_blockchain()[0]
+
+
+def test_workers_share_the_owner(owner):
+    remote, other = RemoteContract(*owner), RemoteContract(*owner)
+    assert register(remote, "INV-1")[0]
+    other.refresh()
+    assert other.get_participant("INV-1") is not None
+    
+    def worker(i):
+        assert create(other, f"EVD-{i}")[0]
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    remote.refresh()
+    assert sorted(e["evidence_id"] for e in remote.list_all_evidence()) == [f"EVD-{i}" for i in range(4)]
+
+
+# ============== ERRORS ==============
+
+def test_malformed_requests_get_an_error_line(owner):
+    _, socket_path = owner
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    reader = sock.makefile('rb')
+    
+    def send(line):
+        sock.sendall(line + b"\n")
+        return json.loads(reader.readline())
+    
+    assert send(b"{not json")["error"].startswith("JSONDecodeError")
+    assert send(b'{"args": {}}')["error"].startswith("KeyError")
+    assert send(b'{"op": "close"}')["error"] == "ValueError: Unknown operation 'close'"
+    assert send(b'{"op": "flush", "args": {"everything": true}}')["error"].startswith("TypeError")
+    # The connection keeps serving after errors
+    assert send(b'{"op": "flush"}') == {"ok": True, "result": [True, "No pending transactions to seal"]}
+    sock.close()
+
+
+def test_errors_propagate_to_the_worker(owner):
+    remote = RemoteContract(*owner)
+    with pytest.raises(RuntimeError, match="Unknown operation"):
+        remote._forward("close", {})
+    with pytest.raises(TypeError):
+        remote.create_evidence("EVD-1", everything=True)    # Refused before it is sent
+    assert register(remote, "INV-1")[0]
+
+
+# ============== OWNER RESTART ==============
+
+def start_owner(data_dir, socket_path):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.ledger_server", "--data-dir", data_dir,
+         "--socket", socket_path, "--difficulty", "1"],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True
+    )
+    assert process.stdout.readline().startswith("Serving ledger")
+    return process
+
+
+def stop_owner(process):
+    process.send_signal(signal.SIGINT)
+    assert process.wait(10) == 0
+
+
+def test_worker_reconnects_after_the_owner_restarts(tmp_path):
+    data_dir, socket_path = str(tmp_path / "ledger"), str(tmp_path / "ledger.sock")
+    process = start_owner(data_dir, socket_path)
+    try:
+        remote = RemoteContract(data_dir, socket_path)
+        assert register(remote, "INV-1")[0]
+        stop_owner(process)
+        with pytest.raises(ConnectionError):
+            create(remote, "EVD-1")
+        
+        process = start_owner(data_dir, socket_path)
+        assert create(remote, "EVD-1")[0]
+        assert create(remote, "EVD-2")[0]
+        
+        # A connection left over from before the restart is replaced as well
+        stop_owner(process)
+        process = start_owner(data_dir, socket_path)
+        assert create(remote, "EVD-3")[0]
+        assert sorted(e["evidence_id"] for e in remote.list_all_evidence()) == ["EVD-1", "EVD-2", "EVD-3"]
+    finally:
+        if process.poll() is None:
+            stop_owner(process)
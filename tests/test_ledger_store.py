@@ -0,0 +1,112 @@
+"""
+Ledger Store Tests - Forensic Chain
+Segment and offset-table recovery of LedgerStore after a crash.
+"""
+import os
+
+from src.blockchain import Block
+from src.ledger_store import LedgerStore
+
+
+def fill(data_dir, blocks, blocks_per_segment=4):
+    """Append `blocks` linked blocks and return them as dictionaries."""
+    store = LedgerStore(str(data_dir), blocks_per_segment=blocks_per_segment, sync=False)
+    stored, previous_hash = [], "0"
+    for height in range(blocks):
+        block = Block(height, [{"type": "TEST", "evidence_id": f"EVD-{height}"}], previous_hash)
+        store.append_block(block.to_dict())
+        stored.append(block.to_dict())
+        previous_hash = block.hash
+    store.close()
+    return stored
+
+
+def tail_segment(data_dir):
+    return sorted(data_dir.glob("segment-*.log"))[-1]
+
+
+def reopen(data_dir):
+    return LedgerStore(str(data_dir), blocks_per_segment=4, sync=False)
+
+
+def test_blocks_roll_over_into_segments(tmp_path):
+    stored = fill(tmp_path, 10)
+    assert len(list(tmp_path.glob("segment-*.log"))) == 3
+    
+    store = reopen(tmp_path)
+    assert store.block_count == 10
+    assert list(store.iter_blocks()) == stored
+    assert store.read_block(5).to_dict() == stored[5]
+    store.close()
+
+
+# ============== TORN TAIL ==============
+
+def test_torn_last_record_is_dropped(tmp_path):
+    stored = fill(tmp_path, 10)
+    tail = tail_segment(tmp_path)
+    with open(tail, 'r+b') as f:
+        f.truncate(os.path.getsize(tail) - 5)
+    
+    store = reopen(tmp_path)
+    assert store.block_count == 9
+    assert list(store.iter_blocks()) == stored[:9]
+    
+    # The next append continues at the dropped height
+    store.append_block(stored[9])
+    store.close()
+    assert list(reopen(tmp_path).iter_blocks()) == stored
+
+
+def test_torn_tail_offset_table_is_rebuilt(tmp_path):
+    stored = fill(tmp_path, 10)
+    tail = tail_segment(tmp_path)
+    with open(tail, 'r+b') as f:
+        f.truncate(os.path.getsize(tail) - 5)
+    # Offset table ahead of the segment (the crash hit between the two writes)
+    tail.with_suffix('.idx').write_bytes(os.urandom(24))
+    
+    store = reopen(tmp_path)
+    assert store.block_count == 9
+    assert [store.read_block(h).to_dict() for h in range(9)] == stored[:9]
+    store.close()
+    
+    assert os.path.getsize(tail.with_suffix('.idx')) == 8
+
+
+def test_missing_offset_table_of_sealed_segment_is_rebuilt(tmp_path):
+    stored = fill(tmp_path, 10)
+    idx_path = sorted(tmp_path.glob("segment-*.idx"))[0]
+    os.remove(idx_path)
+    
+    store = reopen(tmp_path)
+    assert [store.read_block(h).to_dict() for h in range(10)] == stored
+    store.close()
+    assert os.path.getsize(idx_path) == 4 * 8
+
+
+# ============== PENDING JOURNAL ==============
+
+def test_journal_batch_is_one_sync(tmp_path, monkeypatch):
+    store = LedgerStore(str(tmp_path))
+    syncs = []
+    monkeypatch.setattr(os, "fsync", syncs.append)
+    store.journal_transactions([{"step": step} for step in range(50)])
+    assert len(syncs) == 1
+    assert store.load_journal() == [{"step": step} for step in range(50)]
+    store.close()
+
+
+def test_journal_appends_after_it_is_cleared(tmp_path):
+    store = LedgerStore(str(tmp_path), sync=False)
+    store.journal_transaction({"step": 0})
+    store.journal_transaction({"step": 1})
+    # Replaced by the transactions left over after a seal
+    store.clear_journal([{"step": 1}])
+    store.journal_transaction({"step": 2})
+    assert store.load_journal() == [{"step": 1}, {"step": 2}]
+    
+    store.clear_journal()
+    store.journal_transactions([{"step": 3}, {"step": 4}])
+    store.close()
+    assert reopen(tmp_path).load_journal() == [{"step": 3}, {"step": 4}]
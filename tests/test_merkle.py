@@ -0,0 +1,130 @@
+"""
+Merkle Tests - Forensic Chain
+Merkle roots and inclusion proofs, on their own and over sealed blocks.
+"""
+import hashlib
+
+import pytest
+
+from src.blockchain import Blockchain, SealPolicy
+from src.merkle import leaf_hash, merkle_proof, merkle_root, node_hash, verify_merkle_proof
+
+
+def leaves(count):
+    return [leaf_hash(f"tx-{i}".encode()) for i in range(count)]
+
+
+def tampered(proof, step):
+    """Copy of a proof with one sibling hash changed."""
+    proof = [dict(entry) for entry in proof]
+    proof[step]["hash"] = hashlib.sha256(b"forged").hexdigest()
+    return proof
+
+
+# ============== ROOTS ==============
+
+def test_root_of_no_leaves_is_the_hash_of_nothing():
+    assert merkle_root([]) == hashlib.sha256(b'').hexdigest()
+
+
+def test_root_of_a_single_leaf_is_the_leaf():
+    leaf = leaf_hash(b"only")
+    assert merkle_root([leaf]) == leaf.hex()
+    assert merkle_proof([leaf], 0) == []
+    assert verify_merkle_proof(leaf, [], leaf.hex())
+
+
+def test_odd_node_is_promoted():
+    a, b, c = leaves(3)
+    assert merkle_root([a, b, c]) == node_hash(node_hash(a, b), c).hex()
+    a, b, c, d, e = leaves(5)
+    expected = node_hash(node_hash(node_hash(a, b), node_hash(c, d)), e)
+    assert merkle_root([a, b, c, d, e]) == expected.hex()
+
+
+def test_leaves_and_nodes_are_domain_separated():
+    a, b = b"a" * 32, b"b" * 32
+    assert leaf_hash(a + b) != node_hash(a, b)
+
+
+# ============== PROOFS ==============
+
+@pytest.mark.parametrize("count", [2, 3, 4, 5, 7, 8, 9, 16, 33])
+def test_every_leaf_has_a_valid_proof(count):
+    tree = leaves(count)
+    root = merkle_root(tree)
+    for index, leaf in enumerate(tree):
+        proof = merkle_proof(tree, index)
+        assert len(proof) <= (count - 1).bit_length()
+        assert verify_merkle_proof(leaf, proof, root)
+
+
+@pytest.mark.parametrize("count", [2, 3, 5, 9])
+def test_tampered_proofs_are_rejected(count):
+    tree = leaves(count)
+    root = merkle_root(tree)
+    for index, leaf in enumerate(tree):
+        proof = merkle_proof(tree, index)
+        for step in range(len(proof)):
+            assert not verify_merkle_proof(leaf, tampered(proof, step), root)
+        swapped = [{**entry, "position": "left" if entry["position"] == "right" else "right"}
+                   for entry in proof]
+        assert not verify_merkle_proof(leaf, swapped, root)
+        # The proof of one leaf does not prove another
+        other = tree[(index + 1) % count]
+        assert not verify_merkle_proof(other, proof, root)
+
+
+def test_wrong_root_is_rejected():
+    tree = leaves(5)
+    proof = merkle_proof(tree, 2)
+    assert verify_merkle_proof(tree[2], proof, merkle_root(tree))
+    assert not verify_merkle_proof(tree[2], proof, merkle_root(leaves(6)))
+    assert not verify_merkle_proof(tree[2], proof, "00" * 32)
+
+
+# ============== BLOCK INCLUSION PROOFS ==============
+
+def chain_with_blocks(*sizes):
+    """Chain with one sealed block per size, holding that many transactions of EVD-1."""
+    chain = Blockchain(difficulty=1, seal_policy=SealPolicy(max_transactions=max(sizes)))
+    step = 0
+    for size in sizes:
+        for _ in range(size):
+            chain.add_transaction({"type": "TRANSFER_EVIDENCE", "evidence_id": "EVD-1", "step": step})
+            step += 1
+        chain.mine_pending_transactions()
+    return chain
+
+
+def test_inclusion_proofs_of_odd_and_single_transaction_blocks():
+    chain = chain_with_blocks(5, 1, 3)
+    proofs = chain.get_inclusion_proofs("EVD-1")
+    assert [entry["transaction"]["step"] for entry in proofs] == list(range(9))
+    for entry in proofs:
+        block = chain.chain[entry["block_index"]]
+        assert entry["merkle_root"] == block.merkle_root
+        assert entry["block_hash"] == block.hash
+        assert Blockchain.verify_inclusion_proof(entry["transaction"], entry["proof"], entry["merkle_root"])
+    assert proofs[5]["proof"] == []
+
+
+def test_inclusion_proofs_detect_tampering():
+    chain = chain_with_blocks(5, 3)
+    proofs = chain.get_inclusion_proofs("EVD-1")
+    other_root = chain.chain[2].merkle_root
+    for entry in proofs[:5]:
+        transaction, proof, root = entry["transaction"], entry["proof"], entry["merkle_root"]
+        assert not Blockchain.verify_inclusion_proof({**transaction, "step": 99}, proof, root)
+        assert not Blockchain.verify_inclusion_proof(transaction, tampered(proof, 0), root)
+        assert not Blockchain.verify_inclusion_proof(transaction, proof, other_root)
+
+
+def test_block_without_merkle_root_has_no_proof():
+    chain = chain_with_blocks(2, 2)
+    chain.chain[1].merkle_root = None    # As sealed before Merkle roots
+    proofs = chain.get_inclusion_proofs("EVD-1")
+    assert [entry["proof"] is None for entry in proofs] == [True, True, False, False]
+    assert Blockchain.verify_inclusion_proof(proofs[2]["transaction"], proofs[2]["proof"],
+                                             proofs[2]["merkle_root"])
+    assert chain.get_inclusion_proofs("EVD-404") == []
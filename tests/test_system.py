@@ -3,13 +3,23 @@
 Test Script - Forensic Chain
 Script to test all system functionalities.
 """
+import asyncio
+import io
 import sys
 import os
+import tempfile
+import threading
 
 # Add root directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.async_contract import AsyncContract
+from src.blockchain import SealPolicy
+from src.commit_queue import CommitQueue
+from src.evidence_store import EvidenceStore
+from src.ledger_server import LedgerServer, RemoteContract
 from src.smart_contract import ForensicContract
+from src.upload_sessions import UploadSessions
 import hashlib
 
 
@@ -235,6 +245,14 @@ def main():
     for tx in history:
         print(f"      - Block #{tx['block_index']}: {tx['type']}")
     
+    # Verify Merkle inclusion proofs for the same history
+    proofs = contract.get_evidence_proofs(evidence_ids[0])
+    all_included = all(
+        contract.blockchain.verify_inclusion_proof(p["transaction"], p["proof"], p["merkle_root"])
+        for p in proofs
+    )
+    print_result(all_included, f"Merkle inclusion proofs verified ({len(proofs)} transactions)")
+    
     # ============== TEST 8: ACCESS CONTROL ==============
     print_header("8. ACCESS CONTROL VERIFICATION")
     
@@ -270,6 +288,253 @@ def main():
     )
     print_result(not success, f"Judge cannot create evidence: {msg[:50]}...")
     
+    # ============== TEST 9: BLOCK SEALING POLICY ==============
+    print_header("9. BLOCK SEALING POLICY")
+    
+    batched = ForensicContract(seal_policy=SealPolicy(max_transactions=10))
+    batched.register_participant("INV001", "John Smith", "investigator", "Metro Police Department")
+    for i in range(5):
+        batched.create_evidence(f"BULK{i:03d}", "Bulk item", "INV001", f"hash{i}", "/bulk", "CASE-BULK")
+    print_result(len(batched.blockchain.chain) == 1,
+                 f"6 transactions pending, no block sealed yet ({len(batched.blockchain.pending_transactions)} pending)")
+    
+    history = batched.get_evidence_history("BULK000")
+    print_result(history and history[0]["block_index"] is None, "Pending transaction visible in history")
+    
+    success, msg = batched.flush()
+    print_result(success and len(batched.blockchain.chain) == 2, msg)
+    
+    # ============== TEST 10: BULK INTAKE ==============
+    print_header("10. BULK EVIDENCE INTAKE")
+    
+    items = [
+        {
+            "evidence_id": f"DEVICE-IMG-{i:03d}",
+            "description": f"Extracted file {i} from seized laptop",
+            "creator_id": "FOR001",
+            "file_hash": hashlib.sha256(f"device file {i}".encode()).hexdigest(),
+            "file_location": f"/evidence_store/device/{i}.bin",
+            "case_id": "CASE-2026-002"
+        }
+        for i in range(50)
+    ]
+    blocks_before = len(contract.blockchain.chain)
+    success, msg, results = contract.create_evidence_batch(items)
+    print_result(success and len(contract.blockchain.chain) == blocks_before + 1,
+                 f"{msg} in {len(contract.blockchain.chain) - blocks_before} block")
+    
+    # All-or-nothing: one invalid item rejects the whole batch
+    bad_items = [dict(items[0], evidence_id="DEVICE-NEW-001"), dict(items[1])]
+    success, msg, results = contract.create_evidence_batch(bad_items, atomic=True)
+    print_result(not success and contract.get_evidence("DEVICE-NEW-001") is None, msg)
+    
+    # ============== TEST 11: BULK TRANSFER ==============
+    print_header("11. BULK TRANSFER (CASE HAND-OFF)")
+    
+    blocks_before = len(contract.blockchain.chain)
+    success, msg, results = contract.transfer_evidence_batch(
+        "FOR001", "PRO001", "Case hand-off to prosecution", case_id="CASE-2026-002"
+    )
+    print_result(success and len(contract.blockchain.chain) == blocks_before + 1,
+                 f"{msg} in {len(contract.blockchain.chain) - blocks_before} block")
+    print_result(len(contract.get_evidence_by_owner("PRO001")) >= len(items),
+                 f"Prosecutor now holds {len(contract.get_evidence_by_owner('PRO001'))} evidence items")
+    
+    # ============== TEST 12: CONCURRENT ACCESS ==============
+    print_header("12. CONCURRENT ACCESS")
+    
+    errors = []
+    
+    def create_many(worker):
+        try:
+            for i in range(20):
+                success, msg = contract.create_evidence(
+                    f"THREAD-{worker}-{i}", "Concurrent intake", "INV001",
+                    hashlib.sha256(f"thread {worker} {i}".encode()).hexdigest(),
+                    f"/evidence_store/thread/{worker}-{i}.bin", "CASE-2026-003"
+                )
+                if not success:
+                    errors.append(msg)
+                contract.list_evidence_page(limit=10)
+                contract.get_blockchain_info()
+        except Exception as e:
+            errors.append(repr(e))
+    
+    threads = [threading.Thread(target=create_many, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    valid, _ = contract.verify_blockchain(full_audit=True)
+    created = len(contract.get_evidence_by_case("CASE-2026-003"))
+    print_result(not errors and valid and created == 80,
+                 f"4 threads created {created} evidence items, chain valid: {valid}")
+    
+    # ============== TEST 13: GROUP COMMIT ==============
+    print_header("13. GROUP COMMIT")
+    
+    commit_queue = CommitQueue(contract, max_group_size=64, max_wait=0.05)
+    blocks_before = len(contract.blockchain.chain)
+    futures = [
+        commit_queue.submit(
+            "create_evidence", evidence_id=f"QUEUE-{i:03d}", description="Queued intake",
+            creator_id="INV001", file_hash=hashlib.sha256(f"queued {i}".encode()).hexdigest(),
+            file_location=f"/evidence_store/queue/{i}.bin", case_id="CASE-2026-004"
+        )
+        for i in range(32)
+    ]
+    duplicate = commit_queue.submit(
+        "create_evidence", evidence_id="QUEUE-000", description="Duplicate", creator_id="INV001",
+        file_hash="0" * 64, file_location="/dup", case_id="CASE-2026-004"
+    )
+    results = [future.result() for future in futures]
+    commit_queue.close()
+    print_result(all(r.success and r.transaction_id for r in results),
+                 f"{len(results)} queued operations committed in "
+                 f"{len(contract.blockchain.chain) - blocks_before} block(s)")
+    print_result(not duplicate.result().success, duplicate.result().message)
+    
+    # ============== TEST 14: SHARED LEDGER (MULTI-PROCESS MODE) ==============
+    print_header("14. SHARED LEDGER (MULTI-PROCESS MODE)")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "ledger")
+        owner = ForensicContract(data_dir=data_dir, difficulty=1)
+        owner.register_participant("INV001", "John Smith", "investigator", "Metro Police Department")
+        server = LedgerServer(owner, os.path.join(tmp, "ledger.sock"))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        worker = RemoteContract(data_dir, server.socket_path)
+        success, msg = worker.create_evidence(
+            "SHARED-001", "Forwarded write", "INV001",
+            hashlib.sha256(b"shared").hexdigest(), "/evidence_store/shared.bin", "CASE-2026-005"
+        )
+        print_result(success and worker.get_evidence("SHARED-001") is not None,
+                     f"Worker forwarded write and reads it back: {msg}")
+        
+        owner.create_evidence("SHARED-002", "Owner write", "INV001", "0" * 64, "/x", "CASE-2026-005")
+        worker.refresh()
+        print_result(len(worker.get_evidence_by_case("CASE-2026-005")) == 2,
+                     "Replica picked up blocks sealed by the owner")
+        
+        server.shutdown()
+        worker.close()
+        owner.close()
+    
+    # ============== TEST 15: ASYNC FACADE ==============
+    print_header("15. ASYNC CONTRACT FACADE")
+    
+    async_contract = AsyncContract(contract)
+    
+    async def concurrent_reads():
+        return await asyncio.gather(*[
+            async_contract.get_evidence(f"QUEUE-{i:03d}") for i in range(32)
+        ])
+    
+    found = asyncio.run(concurrent_reads())
+    async_contract.close()
+    print_result(all(e is not None for e in found),
+                 f"{len(found)} concurrent awaited reads served from the thread pool")
+    
+    # ============== TEST 16: DEDUPLICATING EVIDENCE STORE ==============
+    print_header("16. DEDUPLICATING EVIDENCE STORE")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvidenceStore(tmp)
+        image = os.urandom(256 * 1024)
+        ok1, path1, image_hash = store.store_evidence_stream(io.BytesIO(image), "IMG-1", "CASE-A", "disk.img")
+        ok2, path2, _ = store.store_evidence_stream(io.BytesIO(image), "IMG-2", "CASE-B", "disk.img")
+        ok3, path3, _ = store.attach_existing(image_hash, "IMG-3", "CASE-C", "disk.img")
+        stats = store.get_storage_stats()
+        print_result(ok1 and ok2 and ok3 and stats["total_size_bytes"] == len(image),
+                     f"3 case attachments, {stats['total_size_bytes']} bytes stored "
+                     f"(ratio {stats['deduplication_ratio']})")
+        
+        valid, _ = store.verify_file_integrity(path3, image_hash)
+        print_result(valid, "Attachment by hash verifies against the stored content")
+        
+        for path in (path1, path2, path3):
+            store.delete_evidence_file(path)
+        print_result(not store.has_content(image_hash),
+                     "Content removed once no case references it")
+    
+    # ============== TEST 17: RESUMABLE UPLOADS ==============
+    print_header("17. RESUMABLE CHUNKED UPLOAD")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvidenceStore(tmp)
+        image = os.urandom(3 * 64 * 1024)
+        chunks = [image[i:i + 64 * 1024] for i in range(0, len(image), 64 * 1024)]
+        session = UploadSessions(store).create("IMG-9", "CASE-A", "disk.img", total_size=len(image))
+        session.write_chunk(0, [chunks[0]], hashlib.sha256(chunks[0]).hexdigest())
+        ok, msg = session.write_chunk(session.offset, [chunks[1]], hashlib.sha256(b"corrupted").hexdigest())
+        print_result(not ok and session.offset == len(chunks[0]), f"Corrupted chunk rejected: {msg}")
+        
+        # Server restart: the session is resumed from the store
+        uploads = UploadSessions(store)
+        resumed = uploads.get(session.upload_id)
+        print_result(resumed.offset == len(chunks[0]), f"Upload resumed at offset {resumed.offset}")
+        resumed.write_chunk(resumed.offset, [chunks[1]], hashlib.sha256(chunks[1]).hexdigest())
+        resumed.write_chunk(resumed.offset, [chunks[2]])
+        ok, path, file_hash = uploads.finalize(session.upload_id, hashlib.sha256(image).hexdigest())
+        print_result(ok and store.verify_file_integrity(path, file_hash)[0],
+                     f"Upload finalized: {file_hash[:16]}...")
+    
+    # ============== TEST 18: TREE HASH ==============
+    print_header("18. PARALLEL TREE HASH")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvidenceStore(tmp, tree_chunk_size=64 * 1024, hash_workers=4)
+        image = os.urandom(10 * 64 * 1024 + 100)
+        ok, path, image_hash = store.store_evidence_stream(io.BytesIO(image), "IMG-T", "CASE-T", "disk.img")
+        tree = store.get_tree_digest(image_hash)
+        print_result(ok and len(tree["chunks"]) == 11, f"Tree digest of 11 chunks: {tree['root'][:16]}...")
+        
+        valid, msg, _ = store.verify_tree_integrity(path)
+        print_result(valid, msg)
+        
+        os.chmod(path, 0o644)
+        with open(path, 'r+b') as f:
+            f.seek(7 * 64 * 1024 + 10)
+            f.write(b"tampered")
+        valid, msg, report = store.verify_tree_integrity(path)
+        print_result(not valid and report["mismatched_chunks"] == [7],
+                     f"Tampering localized to chunk {report['mismatched_chunks']}")
+        
+        # ============== TEST 19: PARTIAL VERIFICATION ==============
+        print_header("19. PARTIAL VERIFICATION")
+        
+        valid, msg, report = store.verify_tree_integrity(path, ranges=[(0, 128 * 1024)],
+                                                         expected_hash=image_hash)
+        print_result(valid and report["chunks_checked"] == 2, f"Untouched range: {msg}")
+        
+        valid, msg, report = store.verify_tree_integrity(path, ranges=[(7 * 64 * 1024, 7 * 64 * 1024 + 1)])
+        print_result(not valid and report["mismatched_chunks"] == [7], f"Tampered range: {msg}")
+        
+        valid, msg, report = store.verify_tree_integrity(path, sample=11)
+        print_result(not valid and report["mismatched_chunks"] == [7],
+                     f"Sample of {report['chunks_checked']} chunks finds chunk {report['mismatched_chunks']}")
+    
+    # ============== TEST 20: STREAMING RETRIEVAL ==============
+    print_header("20. STREAMING RETRIEVAL")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvidenceStore(tmp)
+        image = os.urandom(5 * 1024 * 1024 + 17)
+        ok, path, image_hash = store.store_evidence_stream(io.BytesIO(image), "IMG-S", "CASE-S", "disk.img")
+        
+        ok, pieces, msg = store.retrieve_evidence_stream(path, chunk_size=1024 * 1024)
+        streamed = hashlib.sha256()
+        count = 0
+        for piece in pieces:
+            streamed.update(piece)
+            count += 1
+        print_result(ok and streamed.hexdigest() == image_hash, f"{msg} in {count} pieces")
+        
+        with store.open_evidence(path) as view:
+            matches = len(view) == len(image) and view[4096:8192] == image[4096:8192]
+        print_result(matches, "Memory-mapped view reads the stored file without copying it")
+    
     # ============== RESULTS ==============
     print_header("TEST RESULTS")
     print_result(True, "All functionalities working correctly!")